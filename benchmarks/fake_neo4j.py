@@ -0,0 +1,110 @@
+"""
+In-Memory Neo4j Stand-In for Benchmarks
+=======================================
+A minimal driver with the session/transaction interface used by
+SOPGraphIngestion and GraphRAGQuery. Writes are counted (statements and
+rows), not stored. Graph expansion and version reads are answered from a
+CompiledGraph (graphdb/graph_engine.py), so query benchmarks exercise the
+real Python code paths without a database.
+
+Expansion follows the GRAPH_EXPANSION_CYPHER contract: the relationship
+types in the pattern, component neighbors only (nodes whose `labels`, if
+given, include Component), each once, ordered by distance then id, and
+LIMIT $limit only when the statement has that clause.
+"""
+
+import re
+from typing import Dict, Optional
+
+_HOPS = re.compile(r'\*1\.\.(\d+)')
+_REL_TYPES = re.compile(r'\[r:([A-Z_|]+)\*')
+
+
+class FakeResult(list):
+    """List of record dicts with the Result methods the code uses."""
+
+    def single(self):
+        return self[0] if self else None
+
+    def data(self):
+        return list(self)
+
+    def consume(self):
+        return None
+
+
+class FakeTransaction:
+    def __init__(self, driver: 'InMemoryNeo4jDriver'):
+        self._driver = driver
+
+    def run(self, cypher: str, parameters: Optional[Dict] = None, **params) -> FakeResult:
+        return self._driver.execute(cypher, {**(parameters or {}), **params})
+
+
+class FakeSession(FakeTransaction):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, fn, *args, **kwargs):
+        self._driver.transactions += 1
+        return fn(FakeTransaction(self._driver), *args, **kwargs)
+
+    execute_read = execute_write
+
+    def close(self):
+        pass
+
+
+class InMemoryNeo4jDriver:
+    """Counts statements and rows; answers expansion from a CompiledGraph."""
+
+    def __init__(self, graph=None, graph_version: int = 1):
+        self.graph = graph
+        self.graph_version = graph_version
+        self.statements = 0
+        self.transactions = 0
+        self.rows = 0
+
+    def session(self, **kwargs) -> FakeSession:
+        return FakeSession(self)
+
+    def close(self):
+        pass
+
+    def _is_component(self, node_id: str) -> bool:
+        index = self.graph.index.get(node_id)
+        return index is not None and 'Component' in self.graph.nodes[index].get('labels', ('Component',))
+
+    def execute(self, cypher: str, params: Dict) -> FakeResult:
+        self.statements += 1
+
+        if 'GraphMeta' in cypher:
+            if 'SET' in cypher:
+                self.graph_version += 1
+            return FakeResult([{'version': self.graph_version}])
+
+        if 'UNWIND $nodeIds' in cypher and self.graph is not None:
+            match = _HOPS.search(cypher)
+            hops = int(match.group(1)) if match else 2
+            types = _REL_TYPES.search(cypher)
+            edge_types = types.group(1).split('|') if types else None
+            limit = params['limit'] if 'LIMIT $limit' in cypher else None
+            records = FakeResult()
+            for node_id in params['nodeIds']:
+                if not self._is_component(node_id):
+                    continue
+                neighbors = [
+                    neighbor for neighbor in self.graph.k_hop_neighborhood(node_id, hops, edge_types, limit=None)
+                    if self._is_component(neighbor['neighborId'])
+                ]
+                neighbors.sort(key=lambda neighbor: (neighbor['distance'], neighbor['neighborId']))
+                records.extend(neighbors if limit is None else neighbors[:limit])
+            return records
+
+        for key in ('rows', 'ids'):
+            if key in params:
+                self.rows += len(params[key])
+        return FakeResult()
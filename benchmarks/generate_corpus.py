@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Synthetic SOP Corpus Generator
+==============================
+Generates a frontmatter-valid SOP component corpus of configurable size for
+benchmarking ingestion and GraphRAG queries:
+
+    <output>/sop-components/atoms/*.md
+    <output>/sop-components/molecules/*.md
+    <output>/sop-components/organisms/*.md
+    <output>/graph/sop-graph.json
+
+The mix follows the real corpus (about 60% atoms, 30% molecules, 10%
+organisms, plus one SOP per 100 components). Fan-out is realistic: molecules
+are composed of 2-6 atoms, organisms of 2-4 molecules plus 0-3 atoms, and
+SOPs of 1-3 organisms plus 0-2 molecules. Atom reuse is Zipf-skewed, so a few
+atoms are used very widely. `dependencies` only point at earlier components,
+so the dependency graph is a DAG. Output is fully determined by `--seed`.
+
+Usage:
+    python benchmarks/generate_corpus.py --components 10000 --output /tmp/sop-corpus-10k
+"""
+
+import argparse
+import itertools
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+DEPARTMENTS = {
+    'IT': ['password', 'account', 'access', 'server', 'backup', 'network', 'laptop', 'vpn', 'patch', 'ticket'],
+    'HR': ['onboarding', 'benefits', 'payroll', 'leave', 'training', 'review', 'offboarding', 'policy', 'hiring'],
+    'Finance': ['expense', 'invoice', 'budget', 'reconciliation', 'audit', 'payment', 'vendor', 'ledger'],
+    'Security': ['incident', 'badge', 'phishing', 'encryption', 'firewall', 'mfa', 'breach', 'clearance'],
+    'Operations': ['shipment', 'inventory', 'facility', 'maintenance', 'safety', 'procurement', 'schedule'],
+    'Customer Service': ['complaint', 'refund', 'escalation', 'callback', 'satisfaction', 'warranty', 'chat']
+}
+VERBS = ['Submit', 'Approve', 'Review', 'Verify', 'Configure', 'Reset', 'Escalate', 'Document', 'Archive',
+         'Request', 'Validate', 'Reconcile', 'Schedule', 'Notify', 'Record']
+OBJECTS = ['Form', 'Request', 'Checklist', 'Report', 'Workflow', 'Record', 'Approval', 'Notice', 'Log']
+FILLER = ['the', 'team', 'must', 'ensure', 'each', 'step', 'is', 'completed', 'before', 'proceeding', 'with',
+          'manager', 'approval', 'within', 'two', 'business', 'days', 'and', 'recorded', 'in', 'system',
+          'employee', 'owner', 'should', 'confirm', 'details', 'against', 'current', 'requirements', 'all']
+COMPLIANCE = ['SOX', 'GDPR', 'HIPAA', 'PCI-DSS', 'ISO 27001', 'SOC 2']
+COMPLEXITY = ['low', 'medium', 'high']
+
+ATOM_SHARE = 0.6
+MOLECULE_SHARE = 0.3
+SOPS_PER_COMPONENTS = 100
+
+# Atom popularity ~ 1 / rank^ZIPF_EXPONENT
+ZIPF_EXPONENT = 0.8
+
+
+def _sentence(rng: random.Random, topic: List[str]) -> str:
+    words = [rng.choice(FILLER) for _ in range(rng.randint(6, 14))]
+    for _ in range(rng.randint(1, 3)):
+        words.insert(rng.randrange(len(words)), rng.choice(topic))
+    return ' '.join(words).capitalize() + '.'
+
+
+def _markdown(rng: random.Random, title: str, topic: List[str], includes: List[str]) -> str:
+    """Markdown body with a long tail of sizes (a few very long documents)."""
+
+    sections = max(2, min(40, int(rng.lognormvariate(1.3, 0.6))))
+    lines = [f"# {title}", "", "## Overview", "", ' '.join(_sentence(rng, topic) for _ in range(3)), ""]
+
+    for section in range(sections):
+        lines += [f"## {rng.choice(VERBS)} {rng.choice(topic).title()} {section + 1}", ""]
+        if rng.random() < 0.4:
+            lines += [f"{step}. {_sentence(rng, topic)}" for step in range(1, rng.randint(3, 7))]
+        else:
+            for _ in range(rng.randint(1, 3)):
+                lines.append(' '.join(_sentence(rng, topic) for _ in range(rng.randint(2, 5))))
+                lines.append("")
+        lines.append("")
+
+    for child_id in includes:
+        lines.append(f"{{{{include: {child_id}}}}}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def _write_component(directory: Path, metadata: Dict, body: str):
+    front = yaml.safe_dump(metadata, sort_keys=False, default_flow_style=None)
+    (directory / f"{metadata['id']}.md").write_text(f"---\n{front}---\n\n{body}", encoding='utf-8')
+
+
+def _pick(rng: random.Random, population: List[str], cum_weights, k: int) -> List[str]:
+    """k distinct items drawn with the given cumulative weights."""
+
+    picked = list(dict.fromkeys(rng.choices(population, cum_weights=cum_weights, k=k * 2)))
+    return picked[:k]
+
+
+def generate_corpus(output_dir: Path, components: int = 1000, seed: int = 42) -> Dict:
+    """Write a corpus of `components` atoms/molecules/organisms and its graph JSON; returns counts."""
+
+    rng = random.Random(seed)
+    output_dir = Path(output_dir)
+    dirs = {name: output_dir / 'sop-components' / name for name in ('atoms', 'molecules', 'organisms')}
+    for directory in dirs.values():
+        directory.mkdir(parents=True, exist_ok=True)
+    (output_dir / 'graph').mkdir(parents=True, exist_ok=True)
+
+    n_atoms = max(1, int(components * ATOM_SHARE))
+    n_molecules = max(1, int(components * MOLECULE_SHARE))
+    n_organisms = max(1, components - n_atoms - n_molecules)
+    n_sops = max(1, components // SOPS_PER_COMPONENTS)
+
+    departments = list(DEPARTMENTS)
+    nodes = {}
+    edges = []
+    edge_ids = itertools.count(1)
+
+    def add_edge(source: str, target: str, edge_type: str):
+        edges.append({
+            'id': f"edge-{next(edge_ids):07d}",
+            'source': source,
+            'target': target,
+            'type': edge_type,
+            'strength': 'strong'
+        })
+
+    def add_node(node_id: str, node_type: str, title: str, department: str, tags: List[str]):
+        nodes[node_id] = {
+            'id': node_id,
+            'type': node_type,
+            'title': title,
+            'department': department,
+            'tags': tags,
+            'version': '1.0.0',
+            'status': 'active'
+        }
+
+    # Atoms
+    atom_ids = []
+    for i in range(n_atoms):
+        department = rng.choice(departments)
+        topic = DEPARTMENTS[department]
+        subject = rng.choice(topic)
+        atom_id = f"atom-{subject}-{i:07d}"
+        title = f"{rng.choice(VERBS)} {subject.title()} {rng.choice(OBJECTS)}"
+        tags = rng.sample(topic, 3)
+        metadata = {
+            'id': atom_id,
+            'type': 'atom',
+            'version': '1.0.0',
+            'title': title,
+            'department': department,
+            'processCategory': rng.choice(OBJECTS),
+            'complexity': rng.choice(COMPLEXITY),
+            'tags': tags,
+            'keywords': rng.sample(topic, 4),
+            'complianceFrameworks': rng.sample(COMPLIANCE, rng.randint(0, 2)),
+            'owner': f"{department} Team",
+            'reusable': True
+        }
+        _write_component(dirs['atoms'], metadata, _markdown(rng, title, topic, []))
+        add_node(atom_id, 'atom', title, department, tags)
+        atom_ids.append(atom_id)
+
+    # Zipf-skewed atom popularity (shuffled so popularity is unrelated to id order)
+    popular_atoms = atom_ids[:]
+    rng.shuffle(popular_atoms)
+    atom_weights = list(itertools.accumulate(1.0 / (rank + 1) ** ZIPF_EXPONENT for rank in range(n_atoms)))
+
+    def compose(parent_id, parent_type, title, department, topic, children, dependencies, directory, extra):
+        tags = rng.sample(topic, 3)
+        metadata = {
+            'id': parent_id,
+            'type': parent_type,
+            'version': '1.0.0',
+            'title': title,
+            'tags': tags,
+            'owner': f"{department} Team",
+            **extra,
+            'composedOf': children,
+            'dependencies': dependencies
+        }
+        _write_component(directory, metadata, _markdown(rng, title, topic, children))
+        add_node(parent_id, parent_type, title, department, tags)
+        for child_id in children:
+            add_edge(child_id, parent_id, 'component-of')
+        for dep_id in dependencies:
+            add_edge(parent_id, dep_id, 'depends-on')
+
+    # Molecules
+    molecule_ids = []
+    for i in range(n_molecules):
+        department = rng.choice(departments)
+        topic = DEPARTMENTS[department]
+        molecule_id = f"molecule-{rng.choice(topic)}-{i:07d}"
+        children = _pick(rng, popular_atoms, atom_weights, rng.randint(2, 6))
+        dependencies = rng.sample(molecule_ids, min(len(molecule_ids), rng.randint(1, 2))) \
+            if molecule_ids and rng.random() < 0.3 else []
+        title = f"{rng.choice(topic).title()} {rng.choice(OBJECTS)} Procedure"
+        compose(molecule_id, 'molecule', title, department, topic, children, dependencies, dirs['molecules'],
+                {'purpose': _sentence(rng, topic)})
+        molecule_ids.append(molecule_id)
+
+    # Organisms
+    organism_ids = []
+    for i in range(n_organisms):
+        department = rng.choice(departments)
+        topic = DEPARTMENTS[department]
+        organism_id = f"organism-{rng.choice(topic)}-{i:07d}"
+        children = rng.sample(molecule_ids, min(len(molecule_ids), rng.randint(2, 4)))
+        children += _pick(rng, popular_atoms, atom_weights, rng.randint(0, 3))
+        dependencies = [rng.choice(organism_ids)] if organism_ids and rng.random() < 0.2 else []
+        title = f"Complete {rng.choice(topic).title()} Workflow"
+        compose(organism_id, 'organism', title, department, topic, children, dependencies, dirs['organisms'],
+                {'department': department})
+        organism_ids.append(organism_id)
+
+    # SOPs (graph JSON only, as in graph/sop-graph.json)
+    sop_ids = []
+    for i in range(n_sops):
+        department = rng.choice(departments)
+        sop_id = f"sop-{i + 1:05d}"
+        add_node(sop_id, 'sop', f"{department} Standard Operating Procedure {i + 1}", department,
+                 rng.sample(DEPARTMENTS[department], 2))
+        children = rng.sample(organism_ids, min(len(organism_ids), rng.randint(1, 3)))
+        children += rng.sample(molecule_ids, min(len(molecule_ids), rng.randint(0, 2)))
+        for child_id in children:
+            add_edge(child_id, sop_id, 'component-of')
+        if sop_ids and rng.random() < 0.2:
+            add_edge(sop_id, rng.choice(sop_ids), 'depends-on')
+        sop_ids.append(sop_id)
+
+    counts = {
+        'atomCount': n_atoms,
+        'moleculeCount': n_molecules,
+        'organismCount': n_organisms,
+        'sopCount': n_sops,
+        'edgeCount': len(edges)
+    }
+    graph = {
+        'metadata': {
+            'version': '1.0.0',
+            'description': f"Synthetic benchmark corpus ({components} components, seed {seed})",
+            'stats': counts
+        },
+        'nodes': nodes,
+        'edges': edges
+    }
+    with open(output_dir / 'graph' / 'sop-graph.json', 'w', encoding='utf-8') as f:
+        json.dump(graph, f)
+
+    return counts
+
+
+def main():
+    """Generate a benchmark corpus."""
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic SOP component corpus')
+    parser.add_argument('--components', type=int, default=1000,
+                        help='Number of atoms + molecules + organisms (default: 1000)')
+    parser.add_argument('--output', type=Path, required=True, help='Output directory')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    args = parser.parse_args()
+
+    counts = generate_corpus(args.output, args.components, args.seed)
+    print(f"✓ Generated corpus in {args.output}")
+    for name, count in counts.items():
+        print(f"  {name}: {count}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
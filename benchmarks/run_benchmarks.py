@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+GraphRAG Benchmark Suite
+========================
+Reproducible benchmarks for the ingestion stages (parse, clean, embed, write)
+and the query path (vector search, graph expansion, end-to-end hybrid
+search). They run on a synthetic corpus (see generate_corpus.py) against
+in-memory backends: the local hashing embedder (or the fake OpenAI client),
+an in-memory Neo4j stand-in (fake_neo4j.py) and the NumPy vector index.
+No network or database is needed.
+
+Results are written as JSON (one object per stage: items, seconds,
+items/sec, per-operation p50/p99/max latency) so runs can be tracked
+over time and compared against a baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py --components 1000 --output benchmarks/results/1k.json
+    python benchmarks/run_benchmarks.py --corpus /tmp/sop-corpus-100k --limit 20000
+    python benchmarks/run_benchmarks.py --components 1000 --baseline benchmarks/results/1k.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / 'graphdb'))
+
+from embeddings import get_embedding_provider  # noqa: E402
+from fake_neo4j import InMemoryNeo4jDriver  # noqa: E402
+from generate_corpus import DEPARTMENTS, VERBS, generate_corpus  # noqa: E402
+from graph_engine import CompiledGraph  # noqa: E402
+from graphrag_query import GraphRAGQuery  # noqa: E402
+from ingest_sops_to_graph import (  # noqa: E402
+    COMPONENT_TYPES, SOPGraphIngestion, clean_text_for_embedding, parse_frontmatter_file
+)
+from vector_index import LocalVectorIndex  # noqa: E402
+
+RESULTS_SCHEMA_VERSION = 1
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(fraction * len(sorted_values))) - 1]
+
+
+def measure(name: str, operations: List, run: Callable, items_per_op: Callable = lambda op: 1,
+            repeat: int = 3, extra: Optional[Dict] = None) -> Dict:
+    """
+    Time `run(op)` for every operation, `repeat` times.
+
+    The reported wall time is the median over repeats; operation latency
+    percentiles are taken over all repeats.
+    """
+
+    totals = []
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for op in operations:
+            op_started = time.perf_counter()
+            run(op)
+            latencies.append(time.perf_counter() - op_started)
+        totals.append(time.perf_counter() - started)
+
+    items = sum(items_per_op(op) for op in operations)
+    seconds = statistics.median(totals)
+    latencies.sort()
+    result = {
+        'items': items,
+        'operations': len(operations),
+        'seconds': round(seconds, 6),
+        'items_per_sec': round(items / seconds, 1) if seconds else None,
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 4),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 4),
+        'max_ms': round(latencies[-1] * 1000, 4) if latencies else 0.0
+    }
+    result.update(extra or {})
+
+    print(f"  {name:<14} {items:>9} items  {result['seconds']:>9.3f}s  "
+          f"{result['items_per_sec'] or 0:>11.1f}/s  p50 {result['p50_ms']:.3f}ms  p99 {result['p99_ms']:.3f}ms")
+    return result
+
+
+def _queries(count: int, seed: int) -> List[str]:
+    """Deterministic natural-language-ish queries over the corpus vocabulary."""
+
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        topic = DEPARTMENTS[rng.choice(list(DEPARTMENTS))]
+        queries.append(f"How do I {rng.choice(VERBS).lower()} a {rng.choice(topic)} {rng.choice(topic)}?")
+    return queries
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args, corpus_dir: Path) -> Dict:
+    """Run every stage and return the results document."""
+
+    components_dir = corpus_dir / 'sop-components'
+    files = [
+        (component_type, path)
+        for component_type, subdir, _ in COMPONENT_TYPES
+        for path in sorted((components_dir / subdir).glob('*.md'))
+    ]
+    if args.limit:
+        files = files[:args.limit]
+
+    provider = get_embedding_provider(args.embedding_provider, dimension=args.embedding_dimension)
+    results = {}
+
+    print(f"\nBenchmarking {len(files)} components from {corpus_dir}")
+
+    # Ingestion stages
+    parsed = {}
+    results['parse'] = measure(
+        'parse', files, lambda f: parsed.__setitem__(f[1], parse_frontmatter_file(f[1])), repeat=args.repeat
+    )
+    items = [(component_type, path, parsed[path]) for component_type, path in files if parsed.get(path)]
+
+    clean_texts = {}
+    results['clean'] = measure(
+        'clean', items, lambda item: clean_texts.__setitem__(item[1], clean_text_for_embedding(item[2]['full_text'])),
+        repeat=args.repeat
+    )
+
+    texts = [clean_texts[path] for _, path, _ in items]
+    embed_batches = [texts[start:start + args.embed_batch] for start in range(0, len(texts), args.embed_batch)]
+    vectors = []
+    results['embed'] = measure(
+        'embed', embed_batches, lambda batch: vectors.append(provider.embed(batch)),
+        items_per_op=len, repeat=args.repeat
+    )
+    embeddings = [vector for batch in vectors[:len(embed_batches)] for vector in batch]
+
+    driver = InMemoryNeo4jDriver()
+    ingestion = SOPGraphIngestion(driver=driver, embedding_provider=provider, batch_size=args.batch_size)
+    rows_by_type = {}
+    for (component_type, path, data), embedding in zip(items, embeddings):
+        rows_by_type.setdefault(component_type, []).append(
+            ingestion.build_component_row(component_type, data, path, embedding)
+        )
+    write_batches = [
+        (component_type, rows[start:start + args.batch_size])
+        for component_type, rows in rows_by_type.items()
+        for start in range(0, len(rows), args.batch_size)
+    ]
+    results['write'] = measure(
+        'write', write_batches, lambda batch: ingestion.write_component_batch(*batch),
+        items_per_op=lambda batch: len(batch[1]), repeat=args.repeat
+    )
+    results['write']['statements_per_batch'] = round(driver.statements / max(1, len(write_batches) * args.repeat), 2)
+
+    # Query stages
+    index = LocalVectorIndex.build(row['properties'] for rows in rows_by_type.values() for row in rows)
+    graph = CompiledGraph.from_json(corpus_dir / 'graph' / 'sop-graph.json')
+    query_driver = InMemoryNeo4jDriver(graph)
+    graphrag = GraphRAGQuery(
+        driver=query_driver,
+        embedding_provider=provider,
+        vector_index=index,
+        query_cache_size=0,
+        result_cache_size=0
+    )
+
+    queries = _queries(args.queries, args.seed)
+    query_embeddings = provider.embed(queries)
+    hits = [index.search(embedding, top_k=args.top_k) for embedding in query_embeddings]
+
+    results['vector_search'] = measure(
+        'vector_search', query_embeddings, lambda e: index.search(e, top_k=args.top_k), repeat=args.repeat,
+        extra={'index_size': len(index), 'dimension': index.dimension, 'top_k': args.top_k}
+    )
+    results['expansion'] = measure(
+        'expansion', hits, lambda h: graphrag.batch_graph_expansion([hit['id'] for hit in h], hops=2),
+        items_per_op=len, repeat=args.repeat, extra={'graph_nodes': len(graph), 'graph_edges': graph.edge_count()}
+    )
+    results['query_e2e'] = measure(
+        'query_e2e', queries, lambda q: graphrag.hybrid_search(q, top_k=args.top_k, expand_hops=2),
+        repeat=args.repeat
+    )
+    graphrag.close()
+
+    return results
+
+
+def compare(results: Dict, baseline: Dict):
+    """Print throughput changes against a baseline results document."""
+
+    print("\nChange vs baseline (items/sec):")
+    for stage, result in results['results'].items():
+        before = baseline.get('results', {}).get(stage, {}).get('items_per_sec')
+        after = result.get('items_per_sec')
+        if before and after:
+            print(f"  {stage:<14} {before:>11.1f} -> {after:>11.1f}  ({(after - before) / before:+.1%})")
+
+
+def main():
+    """Run the benchmark suite."""
+
+    parser = argparse.ArgumentParser(description='Benchmark GraphRAG ingestion and query stages')
+    parser.add_argument('--components', type=int, default=1000,
+                        help='Corpus size to generate when --corpus is not given (default: 1000)')
+    parser.add_argument('--corpus', type=Path, default=None,
+                        help='Existing corpus directory (generated there first if missing)')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus and query seed (default: 42)')
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Use at most this many component files (for very large corpora)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per stage (default: 3)')
+    parser.add_argument('--queries', type=int, default=200, help='Queries per query stage (default: 200)')
+    parser.add_argument('--top-k', type=int, default=10, help='Results per query (default: 10)')
+    parser.add_argument('--batch-size', type=int, default=500, help='Write batch size (default: 500)')
+    parser.add_argument('--embed-batch', type=int, default=256, help='Texts per embed call (default: 256)')
+    parser.add_argument('--embedding-provider', choices=('local', 'fake'), default='local',
+                        help='Offline embedding backend (default: local)')
+    parser.add_argument('--embedding-dimension', type=int, default=384,
+                        help='Embedding vector size (default: 384)')
+    parser.add_argument('--output', type=Path, default=None, help='Write results JSON here')
+    parser.add_argument('--baseline', type=Path, default=None, help='Compare against a previous results JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='sop-bench-') as tmp:
+        corpus_dir = args.corpus or Path(tmp) / 'corpus'
+        if not (corpus_dir / 'graph' / 'sop-graph.json').exists():
+            print(f"Generating {args.components}-component corpus in {corpus_dir} (seed {args.seed})...")
+            corpus = generate_corpus(corpus_dir, args.components, args.seed)
+        else:
+            with open(corpus_dir / 'graph' / 'sop-graph.json', 'r', encoding='utf-8') as f:
+                corpus = json.load(f).get('metadata', {}).get('stats', {})
+
+        stage_results = run_benchmarks(args, corpus_dir)
+
+    document = {
+        'schema': RESULTS_SCHEMA_VERSION,
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'corpus': corpus,
+            'seed': args.seed,
+            'limit': args.limit,
+            'repeat': args.repeat,
+            'embedding_provider': args.embedding_provider,
+            'embedding_dimension': args.embedding_dimension
+        },
+        'results': stage_results
+    }
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            compare(document, json.load(f))
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
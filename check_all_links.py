@@ -1,18 +1,56 @@
 #!/usr/bin/env python3
 """
 Comprehensive Link Checker for SOP Demo Application
-Scans all HTML files and checks for broken internal links
+Scans all HTML files and checks for broken internal links and anchors
+
+Existing paths are collected once with a single os.scandir walk of the root,
+so links are checked against an in-memory index instead of the filesystem.
+Pages are parsed in a process pool, and the links found in each page are
+cached in .cache/link-check-cache.json by mtime, size and content hash;
+unchanged pages are not read again, only their links are re-checked against
+the current index.
+
+Links with a #fragment are also checked against the target page's anchors
+(`id` attributes and `<a name>`). Each target page is parsed at most once per
+run with an incremental HTMLParser, and its anchors are cached like the links.
+
+Usage:
+    python check_all_links.py
+    python check_all_links.py --root /path/to/SOPDemo --workers 8
 """
 
+import argparse
+import hashlib
+import json
 import os
+import posixpath
 import re
-from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote
 
-# Base directory
-BASE_DIR = Path('/home/user/SOPDemo')
+# Base directory (override with --root)
+BASE_DIR = Path(__file__).resolve().parent
 PUBLIC_DIR = BASE_DIR / 'public'
 
+CACHE_VERSION = 2
+
+# Directories never linked from the site
+SKIP_DIRS = {'.git', 'node_modules'}
+
+# Below this many pages to parse, a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+LINK_PATTERN = re.compile(r'(?:href|src)=["\']([^"\']+)["\']')
+
+# Fragments every page has (empty, '#top') or that are client-side routes/parameters
+IMPLICIT_ANCHORS = {'', 'top'}
+UNCHECKED_FRAGMENT = re.compile(r'[/=!:]')
+
+READ_CHUNK = 64 * 1024
+
 # Colors for output
 class Colors:
     RED = '\033[91m'
@@ -22,104 +60,314 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
-def find_all_links(file_path):
-    """Extract all href and src links from an HTML file"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+class PathIndex:
+    """Every file and directory under the root, as root-relative POSIX paths"""
+
+    def __init__(self, files, dirs, html_stats):
+        self.files = files
+        self.dirs = dirs
+        # (mtime_ns, size) of every .html file, from the same walk
+        self.html_stats = html_stats
+
+    @classmethod
+    def scan(cls, root):
+        """Build the index with one os.scandir walk"""
+        files = set()
+        dirs = {''}
+        stats = {}
+        stack = [(str(root), '')]
+        while stack:
+            path, rel = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        rel_path = f"{rel}/{entry.name}" if rel else entry.name
+                        if entry.is_dir():
+                            if entry.name not in SKIP_DIRS:
+                                dirs.add(rel_path)
+                                stack.append((entry.path, rel_path))
+                        elif entry.is_file():
+                            files.add(rel_path)
+                            if entry.name.endswith('.html'):
+                                stat = entry.stat()
+                                stats[rel_path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError as e:
+                print(f"{Colors.YELLOW}Warning: Cannot scan {path}: {e}{Colors.END}")
+        return cls(files, dirs, stats)
 
-        # Find href links
-        href_pattern = r'href=["\']([^"\']+)["\']'
-        src_pattern = r'src=["\']([^"\']+)["\']'
+    def exists(self, rel_path):
+        """A file, or a directory with an index.html"""
+        return self.page(rel_path) is not None
 
-        hrefs = re.findall(href_pattern, content)
-        srcs = re.findall(src_pattern, content)
+    def page(self, rel_path):
+        """The file a link target serves (index.html for directories), or None"""
+        if rel_path in self.files:
+            return rel_path
+        index_path = posixpath.join(rel_path, 'index.html')
+        if rel_path in self.dirs and index_path in self.files:
+            return index_path
+        return None
 
-        return hrefs + srcs
-    except Exception as e:
-        print(f"{Colors.RED}Error reading {file_path}: {e}{Colors.END}")
-        return []
+class AnchorParser(HTMLParser):
+    """Collects the fragment targets of a page: id attributes and <a name>"""
 
-def resolve_link(link, source_file):
-    """Resolve a link to an absolute path"""
-    # Skip external links, anchors, javascript, mailto, etc.
-    if link.startswith(('http://', 'https://', '#', 'javascript:', 'mailto:', 'tel:')):
-        return None, 'external'
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.anchors = set()
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if value and (name == 'id' or (name == 'name' and tag == 'a')):
+                self.anchors.add(value)
+
+    handle_startendtag = handle_starttag
+
+def find_all_links(content):
+    """Extract all href and src links from HTML content"""
+    return LINK_PATTERN.findall(content)
+
+def resolve_link(link, source_rel):
+    """
+    Resolve a link to (root-relative path, link type, fragment).
+
+    source_rel is the page's root-relative path; same-page '#section' links
+    resolve to the page itself.
+    """
+    # Skip external links, javascript, mailto, etc.
+    if link.startswith(('http://', 'https://', 'javascript:', 'mailto:', 'tel:')):
+        return None, 'external', None
 
     # Skip template variables (e.g., ${sop.file_path})
     if link.startswith('${') or '${' in link:
-        return None, 'template'
+        return None, 'template', None
+
+    # Remove query strings and keep the anchor
+    link_clean, _, fragment = link.partition('#')
+    link_clean = link_clean.split('?')[0]
 
-    # Remove query strings and anchors
-    link_clean = link.split('?')[0].split('#')[0]
+    if not link_clean and link.startswith('#'):
+        return source_rel, 'internal', fragment
 
     if not link_clean or link_clean == '/':
-        return None, 'root'
+        return None, 'root', None
 
     # Handle absolute paths from root
     if link_clean.startswith('/'):
-        target = BASE_DIR / link_clean.lstrip('/')
+        target = posixpath.normpath(link_clean.lstrip('/'))
     else:
         # Handle relative paths
-        source_dir = source_file.parent
-        target = (source_dir / link_clean).resolve()
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(source_rel), link_clean))
 
-    return target, 'internal'
+    return target, 'internal', fragment
 
-def check_file_exists(file_path):
-    """Check if a file exists"""
-    if file_path.is_file():
+def parse_anchors(path):
+    """Anchors of one HTML page, fed to the parser in chunks (runs in a worker process)"""
+    parser = AnchorParser()
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK), ''):
+                parser.feed(chunk)
+        parser.close()
+    except OSError as e:
+        print(f"{Colors.RED}Error reading {path}: {e}{Colors.END}")
+    return sorted(parser.anchors)
+
+def anchor_exists(fragment, anchors):
+    """Whether a #fragment resolves on a page with the given anchors"""
+    if fragment.lower() in IMPLICIT_ANCHORS or UNCHECKED_FRAGMENT.search(fragment):
         return True
-    # Check if it's a directory with index.html
-    if file_path.is_dir():
-        index_path = file_path / 'index.html'
-        return index_path.is_file()
-    return False
+    return fragment in anchors or unquote(fragment) in anchors
+
+def scan_html_file(task):
+    """
+    Read, hash and extract the links of one page (runs in a worker process).
+
+    `task` is (path, root-relative path, known hash). Returns (content hash,
+    total link count, [(link, root-relative target, fragment)] for internal
+    links), or (hash, None, None) if the content still matches known hash.
+    """
+    path, rel_path, known_hash = task
+    try:
+        raw = Path(path).read_bytes()
+    except OSError as e:
+        print(f"{Colors.RED}Error reading {path}: {e}{Colors.END}")
+        return None, 0, []
+
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if content_hash == known_hash:
+        return content_hash, None, None
+
+    links = find_all_links(raw.decode('utf-8', errors='replace'))
+    internal = []
+    for link in links:
+        target, link_type, fragment = resolve_link(link, rel_path)
+        if link_type == 'internal':
+            internal.append((link, target, fragment))
+    return content_hash, len(links), internal
+
+def load_cache(cache_path):
+    """Load the link cache: {'pages': ..., 'anchors': ...} (empty if missing, unreadable or outdated)"""
+    empty = {'pages': {}, 'anchors': {}}
+    if not cache_path or not cache_path.exists():
+        return empty
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if data.get('version') != CACHE_VERSION:
+        return empty
+    return {'pages': data.get('pages', {}), 'anchors': data.get('anchors', {})}
+
+def save_cache(cache_path, cache):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, **cache}, f)
+    os.replace(tmp_path, cache_path)
+
+def _run_parallel(function, tasks, workers):
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(function, tasks, chunksize=32))
+    return [function(task) for task in tasks]
+
+def scan_pages(root, html_files, index, cached, workers=None):
+    """
+    Links of every page, parsed in parallel where needed.
+
+    Pages whose mtime and size match the cache are not read; touched pages
+    with unchanged content are hashed but not parsed.
+    """
+    pages = {}
+    tasks = []
+    for rel_path in html_files:
+        mtime_ns, size = index.html_stats[rel_path]
+        entry = cached.get(rel_path)
+        if entry and entry['mtime_ns'] == mtime_ns and entry['size'] == size:
+            pages[rel_path] = entry
+        else:
+            pages[rel_path] = {'mtime_ns': mtime_ns, 'size': size}
+            tasks.append((str(root / rel_path), rel_path, entry.get('hash') if entry else None))
+
+    results = _run_parallel(scan_html_file, tasks, workers)
+
+    parsed = 0
+    for (_, rel_path, _), (content_hash, link_count, internal) in zip(tasks, results):
+        if internal is None:
+            link_count, internal = cached[rel_path]['links'], cached[rel_path]['internal']
+        else:
+            parsed += 1
+        pages[rel_path].update(hash=content_hash, links=link_count, internal=internal)
+
+    print(f"{Colors.BLUE}Parsed {parsed} new or changed HTML files "
+          f"({len(html_files) - parsed} unchanged){Colors.END}\n")
+    return pages
+
+def build_anchor_index(root, targets, index, cached, workers=None):
+    """
+    {page: set of anchors} for every page targeted by a #fragment link.
+
+    Each page is parsed once however many links point at it, and only if
+    its mtime and size changed since the cached parse.
+    """
+    anchors = {}
+    tasks = []
+    for rel_path in sorted(targets):
+        mtime_ns, size = index.html_stats[rel_path]
+        entry = cached.get(rel_path)
+        if entry and entry['mtime_ns'] == mtime_ns and entry['size'] == size:
+            anchors[rel_path] = entry
+        else:
+            anchors[rel_path] = {'mtime_ns': mtime_ns, 'size': size}
+            tasks.append(rel_path)
+
+    results = _run_parallel(parse_anchors, [str(root / rel_path) for rel_path in tasks], workers)
+    for rel_path, page_anchors in zip(tasks, results):
+        anchors[rel_path]['anchors'] = page_anchors
+
+    print(f"{Colors.BLUE}Indexed anchors of {len(targets)} linked pages ({len(tasks)} parsed){Colors.END}\n")
+    return anchors
 
 def main():
+    parser = argparse.ArgumentParser(description='Check internal links of the generated site')
+    parser.add_argument('--root', type=Path, default=BASE_DIR,
+                        help='Repository root; absolute links resolve against it (default: this directory)')
+    parser.add_argument('--public-dir', type=Path, default=None,
+                        help='Directory of HTML files to check (default: <root>/public)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for parsing pages (default: CPU count; 1 parses serially)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-read every page, ignoring the link cache')
+    args = parser.parse_args()
+
+    root = args.root.resolve()
+    public_dir = (args.public_dir or root / 'public').resolve()
+    cache_path = None if args.no_cache else root / '.cache' / 'link-check-cache.json'
+    cache = load_cache(cache_path)
+
     print(f"\n{Colors.BOLD}{'='*80}{Colors.END}")
     print(f"{Colors.BOLD}SOP Demo - Comprehensive Link Checker{Colors.END}")
     print(f"{Colors.BOLD}{'='*80}{Colors.END}\n")
 
-    # Find all HTML files
-    html_files = list(PUBLIC_DIR.rglob('*.html'))
+    try:
+        public_rel = public_dir.relative_to(root).as_posix()
+    except ValueError:
+        print(f"{Colors.RED}ERROR: {public_dir} is not inside --root {root}{Colors.END}")
+        return 2
+
+    # Index every path under the root, then pick the HTML files
+    index = PathIndex.scan(root)
+    prefix = '' if public_rel == '.' else public_rel + '/'
+    html_files = sorted(path for path in index.html_stats if path.startswith(prefix))
     print(f"{Colors.BLUE}Found {len(html_files)} HTML files to check{Colors.END}\n")
 
+    pages = scan_pages(root, html_files, index, cache['pages'], args.workers)
+
+    # Pages targeted by #fragment links, each parsed once for its anchors
+    anchor_targets = set()
+    for page in pages.values():
+        for _, target, fragment in page['internal']:
+            served = index.page(target) if fragment else None
+            if served and served.endswith('.html'):
+                anchor_targets.add(served)
+    anchors = build_anchor_index(root, anchor_targets, index, cache['anchors'], args.workers)
+    anchor_sets = {rel_path: set(entry['anchors']) for rel_path, entry in anchors.items()}
+
+    if cache_path:
+        save_cache(cache_path, {'pages': pages, 'anchors': anchors})
+
     broken_links = defaultdict(list)
     total_links = 0
     total_broken = 0
+    total_broken_anchors = 0
 
     # Check each HTML file
-    for html_file in sorted(html_files):
-        rel_path = html_file.relative_to(BASE_DIR)
-        links = find_all_links(html_file)
-
-        if not links:
+    for rel_path in html_files:
+        page = pages[rel_path]
+        if not page['links']:
             continue
+        total_links += page['links']
 
         print(f"{Colors.BOLD}Checking: {rel_path}{Colors.END}")
 
+        # (link, target, missing anchor or None for a missing file)
         file_broken = []
-        for link in links:
-            total_links += 1
-            target, link_type = resolve_link(link, html_file)
-
-            if link_type == 'external' or link_type == 'root':
-                continue
-
-            if target and not check_file_exists(target):
-                file_broken.append((link, target))
+        for link, target, fragment in page['internal']:
+            served = index.page(target)
+            if served is None:
+                file_broken.append((link, target, None))
                 total_broken += 1
+            elif fragment and served in anchor_sets and not anchor_exists(fragment, anchor_sets[served]):
+                file_broken.append((link, served, fragment))
+                total_broken_anchors += 1
 
         if file_broken:
-            broken_links[str(rel_path)] = file_broken
+            broken_links[rel_path] = file_broken
             print(f"  {Colors.RED}✗ {len(file_broken)} broken link(s){Colors.END}")
-            for link, target in file_broken:
-                try:
-                    rel_target = target.relative_to(BASE_DIR)
-                except:
-                    rel_target = target
-                print(f"    • {link} → {Colors.RED}{rel_target}{Colors.END}")
+            for link, target, fragment in file_broken:
+                problem = f"no anchor #{fragment} in {target}" if fragment else target
+                print(f"    • {link} → {Colors.RED}{problem}{Colors.END}")
         else:
             print(f"  {Colors.GREEN}✓ All links valid{Colors.END}")
         print()
@@ -131,25 +379,29 @@ def main():
 
     print(f"Total links checked: {total_links}")
     print(f"Files with broken links: {len(broken_links)}")
-    print(f"Total broken links: {total_broken}\n")
+    print(f"Total broken links: {total_broken}")
+    print(f"Total broken anchors: {total_broken_anchors}\n")
 
     if broken_links:
         print(f"{Colors.RED}{Colors.BOLD}BROKEN LINKS BY FILE:{Colors.END}\n")
         for file_path, links in sorted(broken_links.items()):
             print(f"{Colors.YELLOW}{file_path}{Colors.END}")
-            for link, target in links:
+            for link, _, _ in links:
                 print(f"  → {link}")
             print()
 
         # Generate report
-        report_path = BASE_DIR / 'broken-links-report.txt'
+        report_path = root / 'broken-links-report.txt'
         with open(report_path, 'w') as f:
             f.write("SOP Demo - Broken Links Report\n")
             f.write("="*80 + "\n\n")
             for file_path, links in sorted(broken_links.items()):
                 f.write(f"\n{file_path}\n")
-                for link, target in links:
-                    f.write(f"  → {link} (target: {target})\n")
+                for link, target, fragment in links:
+                    if fragment:
+                        f.write(f"  → {link} (missing anchor: #{fragment} in {root / target})\n")
+                    else:
+                        f.write(f"  → {link} (target: {root / target})\n")
 
         print(f"{Colors.BLUE}Report saved to: {report_path}{Colors.END}\n")
         return 1
@@ -0,0 +1,159 @@
+"""
+Token-Counted Markdown Chunking
+===============================
+Splits component markdown on section (heading) boundaries into overlapping
+chunks of at most `max_tokens` tokens, so long documents are embedded in
+full instead of being truncated.
+
+Token counts use tiktoken when it is installed (the same tokenizer as the
+OpenAI embedding models); otherwise the 4-chars-per-token estimate is used.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_CHUNK_TOKENS = 512
+DEFAULT_CHUNK_OVERLAP = 64
+
+_HEADING = re.compile(r'^#{1,6}\s+(.*)$')
+
+
+@dataclass
+class Chunk:
+    """A token-counted slice of a component's markdown."""
+    index: int
+    heading: str
+    text: str
+    token_count: int
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    """tiktoken encoding for an embedding model (None if tiktoken is missing)."""
+    global tiktoken
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding('cl100k_base')
+    except Exception as e:
+        # Encodings are downloaded on first use; air-gapped hosts fall back
+        print(f"Warning: tiktoken encoding unavailable, estimating tokens: {e}")
+        tiktoken = None
+        return None
+
+
+def count_tokens(text: str, model: str = "text-embedding-ada-002") -> int:
+    """Exact token count with tiktoken, else a 4-chars-per-token estimate."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _split_tokens(text: str, max_tokens: int, model: str) -> List[str]:
+    """Split text that exceeds `max_tokens` into consecutive token windows."""
+
+    encoding = _encoding(model)
+    if encoding is None:
+        max_chars = max_tokens * 4
+        return [text[start:start + max_chars] for start in range(0, len(text), max_chars)]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[start:start + max_tokens]) for start in range(0, len(tokens), max_tokens)]
+
+
+def _tail_tokens(text: str, n: int, model: str) -> str:
+    """The last `n` tokens of text."""
+
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[-n * 4:]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[-n:])
+
+
+def _sections(markdown: str) -> List[tuple]:
+    """Split markdown into (heading, text) sections, ignoring headings in code blocks."""
+
+    sections = []
+    heading = ''
+    lines = []
+    in_code = False
+
+    for line in markdown.splitlines():
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+        match = None if in_code else _HEADING.match(line)
+        if match and lines:
+            sections.append((heading, '\n'.join(lines).strip()))
+            lines = []
+        if match:
+            heading = match.group(1).strip()
+        lines.append(line)
+
+    if lines:
+        sections.append((heading, '\n'.join(lines).strip()))
+
+    return [(h, t) for h, t in sections if t]
+
+
+def chunk_markdown(
+    markdown: str,
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    overlap_tokens: int = DEFAULT_CHUNK_OVERLAP,
+    model: str = "text-embedding-ada-002"
+) -> List[Chunk]:
+    """
+    Chunk markdown on section boundaries.
+
+    Consecutive small sections are packed together and sections that are too
+    large are split into token windows. Each chunk after the first starts
+    with the last `overlap_tokens` tokens of the previous chunk so context
+    carries across boundaries; the packing budget leaves room for that
+    overlap so chunks stay within `max_tokens`.
+    """
+
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    budget = max_tokens - overlap_tokens
+
+    pieces = []
+    for heading, text in _sections(markdown):
+        if count_tokens(text, model) > budget:
+            pieces.extend((heading, part) for part in _split_tokens(text, budget, model))
+        else:
+            pieces.append((heading, text))
+
+    chunks = []
+    current_heading: Optional[str] = None
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush():
+        text = '\n\n'.join(current)
+        if chunks and overlap_tokens:
+            text = f"{_tail_tokens(chunks[-1].text, overlap_tokens, model)}\n\n{text}"
+        chunks.append(Chunk(len(chunks), current_heading or '', text, count_tokens(text, model)))
+
+    for heading, text in pieces:
+        tokens = count_tokens(text, model)
+        if current and current_tokens + tokens > budget:
+            flush()
+            current, current_tokens, current_heading = [], 0, None
+        if current_heading is None:
+            current_heading = heading
+        current.append(text)
+        current_tokens += tokens
+
+    if current:
+        flush()
+
+    return chunks
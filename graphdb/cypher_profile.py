@@ -0,0 +1,266 @@
+"""
+Cypher Plan Profiling
+=====================
+Opt-in profiling of the Cypher statements issued by SOPGraphIngestion and
+GraphRAGQuery. ProfilingDriver wraps a Neo4j driver and runs every statement
+with `PROFILE`, and CypherProfiler aggregates the plans per statement
+template (the statement text with whitespace collapsed; parameters do not
+split templates): calls, db hits, rows, elapsed time and the planner
+operators used.
+
+The report ranks templates by total db hits and flags plans containing
+operators that do not scale with the graph (AllNodesScan, CartesianProduct),
+so a regression such as a lost label or index shows up before production.
+
+Profiled results are read eagerly so the plan is available once the
+statement returns; use profiling for diagnosis runs, not in production.
+
+Usage:
+    profiler = CypherProfiler()
+    graphrag = GraphRAGQuery(profiler=profiler)
+    ...
+    print('\\n'.join(profiler.format_report()))
+"""
+
+import json
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Operators that mean a statement touches every node or row combination
+FLAGGED_OPERATORS = ('AllNodesScan', 'CartesianProduct')
+
+# Schema and admin commands cannot be profiled; they run unchanged
+_UNPROFILED = re.compile(
+    r'^\s*(?:PROFILE|EXPLAIN|SHOW|DROP|CREATE\s+(?:OR\s+REPLACE\s+)?(?:\w+\s+)?(?:CONSTRAINT|INDEX))\b',
+    re.IGNORECASE
+)
+
+
+def statement_template(cypher: str) -> str:
+    """Aggregation key of a statement: its text with whitespace collapsed."""
+    return ' '.join(cypher.split())
+
+
+def plan_operators(plan: Optional[Dict]) -> Iterator[Dict]:
+    """Every operator of a PROFILE plan tree, depth first."""
+
+    stack = [plan] if plan else []
+    while stack:
+        operator = stack.pop()
+        yield operator
+        stack.extend(reversed(operator.get('children') or []))
+
+
+def _operator_name(operator: Dict) -> str:
+    """Operator type without the runtime suffix ('NodeIndexSeek@neo4j' -> 'NodeIndexSeek')."""
+    return str(operator.get('operatorType', '?')).split('@')[0]
+
+
+class StatementProfile:
+    """Aggregated PROFILE results of one statement template (not locked; see CypherProfiler)."""
+
+    def __init__(self, template: str):
+        self.template = template
+        self.calls = 0
+        self.profiled_calls = 0
+        self.db_hits = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.operators: Counter = Counter()
+
+    def observe(self, plan: Optional[Dict], seconds: float):
+        self.calls += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if not plan:
+            return
+        self.profiled_calls += 1
+        self.rows += plan.get('rows', 0) or 0
+        for operator in plan_operators(plan):
+            self.db_hits += operator.get('dbHits', 0) or 0
+            self.operators[_operator_name(operator)] += 1
+
+    @property
+    def flags(self) -> List[str]:
+        return [name for name in FLAGGED_OPERATORS if self.operators.get(name)]
+
+    def to_dict(self) -> Dict:
+        return {
+            'template': self.template,
+            'calls': self.calls,
+            'profiled_calls': self.profiled_calls,
+            'db_hits': self.db_hits,
+            'rows': self.rows,
+            'seconds': round(self.seconds, 6),
+            'max_seconds': round(self.max_seconds, 6),
+            'operators': dict(self.operators.most_common()),
+            'flags': self.flags
+        }
+
+
+class CypherProfiler:
+    """Thread-safe per-template aggregation of profiled statements."""
+
+    def __init__(self):
+        self._statements: Dict[str, StatementProfile] = {}
+        self._lock = threading.Lock()
+
+    def record(self, cypher: str, plan: Optional[Dict], seconds: float):
+        """Add one execution of `cypher` (plan is the summary's profile, None if unavailable)."""
+
+        template = statement_template(cypher)
+        with self._lock:
+            statement = self._statements.get(template)
+            if statement is None:
+                statement = self._statements[template] = StatementProfile(template)
+            statement.observe(plan, seconds)
+
+    def run(self, runner, query: str, parameters: Optional[Dict] = None, **kwargs):
+        """Run `query` on a session or transaction with PROFILE and record its plan."""
+
+        if _UNPROFILED.match(query):
+            return runner.run(query, parameters, **kwargs)
+
+        started = time.perf_counter()
+        result = runner.run('PROFILE ' + query, parameters, **kwargs)
+        records = list(result)
+        summary = result.consume()
+        self.record(query, getattr(summary, 'profile', None), time.perf_counter() - started)
+        return ProfiledResult(records, summary)
+
+    def statements(self) -> List[StatementProfile]:
+        """Templates ranked by total db hits, then total time."""
+
+        with self._lock:
+            return sorted(self._statements.values(), key=lambda s: (s.db_hits, s.seconds), reverse=True)
+
+    def flagged(self) -> List[StatementProfile]:
+        """Templates whose plans contain a flagged operator."""
+        return [statement for statement in self.statements() if statement.flags]
+
+    def to_dict(self) -> Dict:
+        statements = self.statements()
+        return {
+            'statements': [statement.to_dict() for statement in statements],
+            'flagged': [statement.template for statement in statements if statement.flags]
+        }
+
+    def to_json(self, path: Path):
+        """Write the ranked report as JSON."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def format_report(self, top: int = 20, width: int = 100) -> List[str]:
+        """Ranked summary lines, flagged templates marked with '!'."""
+
+        statements = self.statements()
+        if not statements:
+            return []
+
+        lines = [f"  {'#':>3}{'Calls':>7}{'DB hits':>12}{'Rows':>10}{'Total ms':>11}{'Max ms':>9}  Statement"]
+        for rank, statement in enumerate(statements[:top], 1):
+            mark = '!' if statement.flags else ' '
+            lines.append(
+                f"{mark} {rank:>3}{statement.calls:>7}{statement.db_hits:>12}{statement.rows:>10}"
+                f"{statement.seconds * 1000:>11.1f}{statement.max_seconds * 1000:>9.1f}  "
+                f"{statement.template[:width]}"
+            )
+            top_operators = ', '.join(f"{name} x{count}" for name, count in statement.operators.most_common(4))
+            if top_operators:
+                lines.append(f"{'':>56}{top_operators}")
+
+        flagged = [statement for statement in statements if statement.flags]
+        if flagged:
+            lines.append(f"{len(flagged)} statement template(s) with {' or '.join(FLAGGED_OPERATORS)}:")
+            for statement in flagged:
+                lines.append(f"  {', '.join(statement.flags)}: {statement.template[:width]}")
+        return lines
+
+
+class ProfiledResult(list):
+    """Records of a profiled statement, read eagerly, with the Result methods the code uses."""
+
+    def __init__(self, records, summary):
+        super().__init__(records)
+        self.summary = summary
+
+    def single(self):
+        return self[0] if self else None
+
+    def data(self) -> List[Dict]:
+        return [record.data() if hasattr(record, 'data') else dict(record) for record in self]
+
+    def consume(self):
+        return self.summary
+
+
+class ProfilingTransaction:
+    """Transaction wrapper that profiles tx.run."""
+
+    def __init__(self, tx, profiler: CypherProfiler):
+        self._tx = tx
+        self._profiler = profiler
+
+    def run(self, query: str, parameters: Optional[Dict] = None, **kwargs):
+        return self._profiler.run(self._tx, query, parameters, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+
+class ProfilingSession:
+    """Session wrapper that profiles session.run and managed transactions."""
+
+    def __init__(self, session, profiler: CypherProfiler):
+        self._session = session
+        self._profiler = profiler
+
+    def run(self, query: str, parameters: Optional[Dict] = None, **kwargs):
+        return self._profiler.run(self._session, query, parameters, **kwargs)
+
+    def _wrap(self, work):
+        return lambda tx, *args, **kwargs: work(ProfilingTransaction(tx, self._profiler), *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._session.execute_write(self._wrap(work), *args, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._session.execute_read(self._wrap(work), *args, **kwargs)
+
+    def close(self):
+        self._session.close()
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._session.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class ProfilingDriver:
+    """Driver wrapper whose sessions run every statement with PROFILE."""
+
+    def __init__(self, driver, profiler: CypherProfiler):
+        self.driver = driver
+        self.profiler = profiler
+
+    def session(self, **kwargs) -> ProfilingSession:
+        return ProfilingSession(self.driver.session(**kwargs), self.profiler)
+
+    def close(self):
+        self.driver.close()
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
@@ -0,0 +1,178 @@
+"""
+Persistent Embedding Cache
+==========================
+Content-addressed, on-disk cache of embedding vectors backed by SQLite.
+
+Entries are keyed by the embedding model plus a SHA-256 hash of the cleaned
+text sent to the embedding API, so unchanged components are never embedded
+twice. Vectors are stored compactly as float32 blobs. Eviction is LRU by last
+access time, bounded by entry count and/or age, and runs every `evict_every`
+inserts as well as on close.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import List, Optional
+
+# SQLite limits the number of host parameters per statement
+_SQL_CHUNK = 500
+
+# Inserted entries between eviction passes
+EVICT_EVERY = 1000
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache with LRU eviction."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+        evict_every: int = EVICT_EVERY
+    ):
+        """Open (or create) the cache database at `path`."""
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.evict_every = evict_every
+        self._inserts_since_evict = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        # Embedding stages may run on worker threads; serialize access
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key_for(model: str, clean_text: str) -> str:
+        """Cache key: model name plus hash of the cleaned embedding input."""
+        digest = hashlib.sha256(clean_text.encode('utf-8')).hexdigest()
+        return f"{model}:{digest}"
+
+    def get_many(self, model: str, clean_texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up vectors for cleaned texts; misses are returned as None."""
+
+        keys = [self.key_for(model, text) for text in clean_texts]
+        found = {}
+
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), _SQL_CHUNK):
+                chunk = unique_keys[start:start + _SQL_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for vector in results if vector is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        return results
+
+    def get(self, model: str, clean_text: str) -> Optional[List[float]]:
+        """Look up a single vector."""
+        return self.get_many(model, [clean_text])[0]
+
+    def put_many(self, model: str, clean_texts: List[str], vectors: List[Optional[List[float]]]):
+        """Store vectors for cleaned texts, skipping missing ones."""
+
+        now = time.time()
+        rows = [
+            (self.key_for(model, text), model, len(vector), array('f', vector).tobytes(), now, now)
+            for text, vector in zip(clean_texts, vectors)
+            if vector
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO embeddings
+                    (key, model, dimension, vector, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+            self._conn.commit()
+            self._inserts_since_evict += len(rows)
+            due = self._inserts_since_evict >= self.evict_every
+
+        # Keep a long ingestion run within the limits, not just at close()
+        if due and (self.max_entries is not None or self.max_age_days is not None):
+            self.evict()
+
+    def put(self, model: str, clean_text: str, vector: List[float]):
+        """Store a single vector."""
+        self.put_many(model, [clean_text], [vector])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+
+    def evict(self) -> int:
+        """Apply the age and size limits, dropping least recently used entries first."""
+
+        removed = 0
+        with self._lock:
+            self._inserts_since_evict = 0
+            if self.max_age_days is not None:
+                cutoff = time.time() - self.max_age_days * 86400
+                removed += self._conn.execute(
+                    "DELETE FROM embeddings WHERE last_access < ?", (cutoff,)
+                ).rowcount
+
+            if self.max_entries is not None:
+                count = self._conn.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    removed += self._conn.execute("""
+                        DELETE FROM embeddings WHERE key IN (
+                            SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?
+                        )
+                    """, (excess,)).rowcount
+
+            self._conn.commit()
+
+        return removed
+
+    def close(self):
+        """Apply eviction and close the database."""
+        self.evict()
+        with self._lock:
+            self._conn.close()
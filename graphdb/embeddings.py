@@ -0,0 +1,305 @@
+"""
+Embedding Helpers for the SOP GraphRAG System
+=============================================
+Embedding backends and batching utilities shared by ingestion and query:
+
+    - EmbeddingProvider: interface used by SOPGraphIngestion and GraphRAGQuery
+    - OpenAIEmbeddingProvider: OpenAI embeddings API (default)
+    - HashingEmbeddingProvider: local CPU embedder (NumPy feature hashing),
+      no network calls, for air-gapped environments and CI
+    - pack_embedding_batches: groups texts into requests that respect the
+      embedding API's per-request input count and token limits
+    - FakeEmbeddingClient: offline, deterministic stand-in for the OpenAI
+      client, for tests
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import random
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, List, Optional, Set
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# OpenAI embedding endpoint limits (per request)
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300000
+
+# text-embedding-ada-002 always returns vectors of this size
+ADA_002_MODEL = "text-embedding-ada-002"
+ADA_002_DIMENSION = 1536
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (rough estimate: 4 chars = 1 token)."""
+    return max(1, len(text) // 4)
+
+
+def pack_embedding_batches(
+    texts: List[str],
+    max_inputs: int = MAX_INPUTS_PER_REQUEST,
+    max_tokens: int = MAX_TOKENS_PER_REQUEST,
+    count_tokens: Callable[[str], int] = estimate_tokens
+) -> List[List[int]]:
+    """
+    Pack texts into request batches, returning lists of indexes into `texts`.
+
+    Batches preserve input order and never exceed `max_inputs` texts or
+    `max_tokens` estimated tokens. A single text larger than `max_tokens`
+    is placed in a batch of its own.
+    """
+
+    batches = []
+    current = []
+    current_tokens = 0
+
+    for index, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (len(current) >= max_inputs or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+
+        current.append(index)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+@dataclass
+class FakeEmbedding:
+    """Mirrors an item of the OpenAI embeddings response `data` list."""
+    index: int
+    embedding: List[float]
+
+
+@dataclass
+class FakeEmbeddingResponse:
+    """Mirrors the OpenAI embeddings response object."""
+    data: List[FakeEmbedding]
+    model: str
+
+
+class _FakeEmbeddingsAPI:
+    """Implements `client.embeddings.create` for FakeEmbeddingClient."""
+
+    def __init__(self, client: 'FakeEmbeddingClient'):
+        self._client = client
+
+    def create(self, model: str, input, **kwargs) -> FakeEmbeddingResponse:
+        return self._client._create(model, input)
+
+
+@dataclass
+class FakeEmbeddingClient:
+    """
+    Offline drop-in for `OpenAI()` that returns deterministic embeddings.
+
+    Every request is recorded in `calls` so tests can assert on batch packing.
+    Inputs listed in `fail_inputs` make any request containing them raise,
+    and `shuffle_response` returns `data` out of order (with correct `index`
+    values) to exercise result mapping.
+    """
+    dimension: int = 1536
+    max_inputs: int = MAX_INPUTS_PER_REQUEST
+    fail_inputs: Set[str] = field(default_factory=set)
+    shuffle_response: bool = False
+    calls: List[List[str]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.embeddings = _FakeEmbeddingsAPI(self)
+
+    def embed_text(self, text: str) -> List[float]:
+        """Deterministic unit vector derived from the text hash."""
+        seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+        rng = random.Random(seed)
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self.dimension)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _create(self, model: str, input) -> FakeEmbeddingResponse:
+        inputs = [input] if isinstance(input, str) else list(input)
+        self.calls.append(inputs)
+
+        if len(inputs) > self.max_inputs:
+            raise ValueError(f"Too many inputs in one request: {len(inputs)} > {self.max_inputs}")
+        failing = [text for text in inputs if text in self.fail_inputs]
+        if failing:
+            raise RuntimeError(f"Simulated embedding failure for {len(failing)} input(s)")
+
+        data = [FakeEmbedding(index=i, embedding=self.embed_text(text)) for i, text in enumerate(inputs)]
+        if self.shuffle_response:
+            random.Random(len(inputs)).shuffle(data)
+
+        return FakeEmbeddingResponse(data=data, model=model)
+
+
+class EmbeddingProvider(ABC):
+    """
+    Interface for embedding backends.
+
+    `model` identifies the vector space (it is part of embedding cache keys),
+    `dimension` is the vector length, and `max_inputs`/`max_tokens` bound a
+    single `embed` call for batch packing.
+    """
+    name = 'base'
+    max_inputs = MAX_INPUTS_PER_REQUEST
+    max_tokens = MAX_TOKENS_PER_REQUEST
+
+    def __init__(self, model: str, dimension: int):
+        self.model = model
+        self.dimension = dimension
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, returning one vector per input in input order."""
+        raise NotImplementedError
+
+    def embed_one(self, text: str) -> List[float]:
+        """Embed a single text."""
+        return self.embed([text])[0]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Async embed; by default runs `embed` on a worker thread."""
+        return await asyncio.to_thread(self.embed, texts)
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI API (or any client with the same shape)."""
+    name = 'openai'
+
+    def __init__(
+        self,
+        model: str = "text-embedding-ada-002",
+        api_key: Optional[str] = None,
+        client=None,
+        dimension: Optional[int] = None,
+        async_client=None
+    ):
+        """
+        Use `client` if given, otherwise create an OpenAI client from `api_key`/OPENAI_API_KEY.
+
+        `aembed` uses `async_client` (an `AsyncOpenAI`); one is created from
+        the API key when no sync client was passed in.
+        """
+
+        # ada-002 has a fixed size; text-embedding-3 models can be shortened
+        if model == ADA_002_MODEL and dimension and dimension != ADA_002_DIMENSION:
+            print(f"Warning: {model} only returns {ADA_002_DIMENSION}-dimensional vectors; "
+                  f"ignoring dimension {dimension}")
+            dimension = ADA_002_DIMENSION
+        super().__init__(model, dimension or ADA_002_DIMENSION)
+        self._request_dimension = dimension if dimension and model != ADA_002_MODEL else None
+
+        if client is None:
+            api_key = api_key or os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OpenAI API key required via OPENAI_API_KEY env var")
+            from openai import AsyncOpenAI, OpenAI
+            client = OpenAI(api_key=api_key)
+            async_client = async_client or AsyncOpenAI(api_key=api_key)
+        self.client = client
+        self.async_client = async_client
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        kwargs = {'dimensions': self._request_dimension} if self._request_dimension else {}
+        response = self.client.embeddings.create(model=self.model, input=texts, **kwargs)
+        return self._vectors(response, len(texts))
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        if self.async_client is None:
+            return await super().aembed(texts)
+
+        kwargs = {'dimensions': self._request_dimension} if self._request_dimension else {}
+        response = await self.async_client.embeddings.create(model=self.model, input=texts, **kwargs)
+        return self._vectors(response, len(texts))
+
+    @staticmethod
+    def _vectors(response, count: int) -> List[List[float]]:
+        """Order response vectors by their input index."""
+
+        vectors = [None] * count
+        for item in response.data:
+            vectors[item.index] = item.embedding
+        return vectors
+
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+
+@lru_cache(maxsize=65536)
+def _feature_hash(feature: str) -> int:
+    """Stable 64-bit hash of a feature string (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Local CPU embedder: signed feature hashing of word unigrams and bigrams.
+
+    Term counts are hashed into `dimension` buckets with a hash-derived sign,
+    damped with sublinear TF (sign * log1p|count|) and L2-normalized, so
+    cosine similarity reflects shared vocabulary. Needs no model download,
+    no fitting step and no network access.
+    """
+    name = 'local'
+    max_tokens = 10 ** 9
+
+    def __init__(self, dimension: int = 384):
+        if np is None:
+            raise ImportError("The local embedding provider requires numpy: pip install numpy")
+        super().__init__(f"local-hashing-{dimension}", dimension)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+
+            hashes = np.fromiter((_feature_hash(f) for f in features), dtype=np.uint64, count=len(features))
+            buckets = (hashes % np.uint64(self.dimension)).astype(np.intp)
+            signs = np.where(hashes >> np.uint64(63), 1.0, -1.0).astype(np.float32)
+            np.add.at(matrix[row], buckets, signs)
+
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1.0, norms)
+        return matrix.tolist()
+
+
+EMBEDDING_PROVIDERS = ('openai', 'local', 'fake')
+
+
+def get_embedding_provider(
+    name: str = 'openai',
+    model: Optional[str] = None,
+    dimension: Optional[int] = None,
+    api_key: Optional[str] = None
+) -> EmbeddingProvider:
+    """Create an embedding provider by name ('openai', 'local' or 'fake')."""
+
+    if name == 'openai':
+        return OpenAIEmbeddingProvider(model or "text-embedding-ada-002", api_key=api_key, dimension=dimension)
+    if name == 'local':
+        return HashingEmbeddingProvider(dimension or 384)
+    if name == 'fake':
+        return OpenAIEmbeddingProvider(
+            model or "fake-embedding",
+            client=FakeEmbeddingClient(dimension=dimension or 1536),
+            dimension=dimension
+        )
+    raise ValueError(f"Unknown embedding provider '{name}' (choose from {', '.join(EMBEDDING_PROVIDERS)})")
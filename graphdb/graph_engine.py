@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+In-Memory Graph Engine for SOP Graphs
+=====================================
+Compiles `graph/sop-graph.json` / `graph/mortgage-sop-graph.json` (a `nodes`
+dict or list plus an `edges` list) into integer-indexed CSR adjacency arrays,
+one forward and one reverse array per edge type. Dependency trees, usage
+trees and k-hop neighborhoods are answered with array-based BFS, without
+Neo4j.
+
+Edge semantics follow the JSON files: `A depends-on B` points from the
+dependent to its dependency, and `A component-of B` points from a part to
+the component (or SOP) that uses it. So the dependency tree follows
+`depends-on` forward and the usage tree follows `component-of` forward,
+matching DEPENDS_ON and COMPOSED_OF (reversed) in Neo4j. Each node is
+reported once, at its shortest depth.
+
+Usage:
+    python graphdb/graph_engine.py graph/sop-graph.json deps molecule-account-setup
+    python graphdb/graph_engine.py graph/sop-graph.json usage atom-password-reset
+    python graphdb/graph_engine.py graph/sop-graph.json neighbors sop-001 --hops 2
+    python graphdb/graph_engine.py graph/sop-graph.json stats
+    python graphdb/graph_engine.py .cache/sop-graph.snap deps molecule-account-setup
+"""
+
+import argparse
+import json
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Depth limits of GraphRAGQuery.get_component_dependencies / get_component_usage
+DEPENDENCY_DEPTH = 3
+USAGE_DEPTH = 3
+
+# Neighbors returned per node by k_hop_neighborhood (as graph_expansion)
+NEIGHBORHOOD_LIMIT = 20
+
+
+class CSRAdjacency:
+    """Compressed sparse row adjacency: neighbors of node i are targets[offsets[i]:offsets[i + 1]]."""
+
+    __slots__ = ('offsets', 'targets')
+
+    def __init__(self, node_count: int, pairs: Iterable[Tuple[int, int]]):
+        """Build from (source, target) index pairs; duplicate pairs are dropped."""
+
+        pairs = sorted(set(pairs))
+        counts = [0] * (node_count + 1)
+        for source, _ in pairs:
+            counts[source + 1] += 1
+        for i in range(node_count):
+            counts[i + 1] += counts[i]
+
+        self.offsets = array('l', counts)
+        self.targets = array('l', (target for _, target in pairs))
+
+    def neighbors(self, index: int) -> array:
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+
+class CompiledGraph:
+    """Read-only SOP graph with per-edge-type forward and reverse CSR arrays."""
+
+    def __init__(self, nodes: List[Dict], edges: List[Tuple[int, str, int]]):
+        """Compile node dicts and (source index, edge type, target index) triples."""
+
+        self.nodes = nodes
+        self.ids = [node['id'] for node in nodes]
+        self.index = {node_id: i for i, node_id in enumerate(self.ids)}
+
+        by_type: Dict[str, List[Tuple[int, int]]] = {}
+        for source, edge_type, target in edges:
+            by_type.setdefault(edge_type, []).append((source, target))
+
+        self.edge_types = sorted(by_type)
+        self.forward = {t: CSRAdjacency(len(nodes), by_type[t]) for t in self.edge_types}
+        self.reverse = {
+            t: CSRAdjacency(len(nodes), ((target, source) for source, target in by_type[t]))
+            for t in self.edge_types
+        }
+
+    @classmethod
+    def from_dict(cls, graph_data: Dict) -> 'CompiledGraph':
+        """Compile a parsed sop-graph.json document."""
+
+        nodes = graph_data.get('nodes', {})
+        if isinstance(nodes, dict):
+            nodes = list(nodes.values())
+
+        index = {node['id']: i for i, node in enumerate(nodes)}
+        edges = []
+        skipped = 0
+        for edge in graph_data.get('edges', []):
+            source = index.get(edge.get('source', edge.get('from')))
+            target = index.get(edge.get('target', edge.get('to')))
+            if source is None or target is None or not edge.get('type'):
+                skipped += 1
+                continue
+            edges.append((source, edge['type'], target))
+
+        if skipped:
+            print(f"Warning: Skipped {skipped} edges with unknown endpoints or no type")
+
+        return cls(nodes, edges)
+
+    @classmethod
+    def from_json(cls, graph_json_path: Path) -> 'CompiledGraph':
+        """Load and compile a graph JSON file."""
+
+        with open(graph_json_path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def edge_count(self) -> int:
+        return sum(len(adjacency) for adjacency in self.forward.values())
+
+    def _adjacencies(self, edge_types: Optional[Iterable[str]], direction: str) -> List[Tuple[str, CSRAdjacency]]:
+        """(edge type, adjacency) pairs to traverse for a direction: 'out', 'in' or 'both'."""
+
+        types = self.edge_types if edge_types is None else [t for t in edge_types if t in self.forward]
+        adjacencies = []
+        if direction in ('out', 'both'):
+            adjacencies.extend((t, self.forward[t]) for t in types)
+        if direction in ('in', 'both'):
+            adjacencies.extend((t, self.reverse[t]) for t in types)
+        return adjacencies
+
+    def bfs(
+        self,
+        node_id: str,
+        edge_types: Optional[Iterable[str]] = None,
+        max_depth: int = 1,
+        direction: str = 'out'
+    ) -> List[Tuple[int, int, str]]:
+        """
+        Breadth-first search from `node_id` up to `max_depth` hops.
+
+        Returns (node index, depth, first edge type) for every reached node
+        except the start, in order of increasing depth. Unknown ids yield [].
+        """
+
+        start = self.index.get(node_id)
+        if start is None:
+            return []
+
+        adjacencies = self._adjacencies(edge_types, direction)
+        # Dicts rather than per-node arrays: cost scales with the nodes reached
+        depth = {start: 0}
+        via = {}
+        reached = []
+        queue = deque([start])
+
+        while queue:
+            current = queue.popleft()
+            next_depth = depth[current] + 1
+            if next_depth > max_depth:
+                continue
+            for edge_type, adjacency in adjacencies:
+                offsets, targets = adjacency.offsets, adjacency.targets
+                for k in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[k]
+                    if neighbor not in depth:
+                        depth[neighbor] = next_depth
+                        via[neighbor] = via.get(current, edge_type)
+                        reached.append((neighbor, next_depth, via[neighbor]))
+                        queue.append(neighbor)
+
+        return reached
+
+    def _describe(self, index: int, depth: int) -> Dict:
+        node = self.nodes[index]
+        return {'id': node['id'], 'type': node.get('type'), 'title': node.get('title'), 'depth': depth}
+
+    def dependency_tree(self, component_id: str, max_depth: int = DEPENDENCY_DEPTH) -> Dict:
+        """Transitive dependencies (same shape as GraphRAGQuery.get_component_dependencies)."""
+
+        dependencies = [
+            self._describe(index, depth)
+            for index, depth, _ in self.bfs(component_id, ['depends-on'], max_depth, 'out')
+        ]
+        return {
+            'component_id': component_id,
+            'dependencies': dependencies,
+            'dependency_count': len(dependencies)
+        }
+
+    def usage_tree(self, component_id: str, max_depth: int = USAGE_DEPTH) -> Dict:
+        """Components and SOPs that use a component (same shape as get_component_usage)."""
+
+        usage = [
+            self._describe(index, depth)
+            for index, depth, _ in self.bfs(component_id, ['component-of'], max_depth, 'out')
+        ]
+        return {
+            'component_id': component_id,
+            'used_in': usage,
+            'usage_count': len(usage)
+        }
+
+    def k_hop_neighborhood(
+        self,
+        node_id: str,
+        hops: int = 2,
+        edge_types: Optional[List[str]] = None,
+        limit: Optional[int] = NEIGHBORHOOD_LIMIT
+    ) -> List[Dict]:
+        """Undirected k-hop neighborhood (same shape as GraphRAGQuery.graph_expansion)."""
+
+        reached = self.bfs(node_id, edge_types, hops, 'both')
+        if limit is not None:
+            reached = reached[:limit]
+
+        return [
+            {
+                'startId': node_id,
+                'neighborId': self.ids[index],
+                'neighborType': self.nodes[index].get('type'),
+                'neighborTitle': self.nodes[index].get('title'),
+                'relationshipType': edge_type,
+                'distance': depth
+            }
+            for index, depth, edge_type in reached
+        ]
+
+
+def main():
+    """Answer dependency, usage and neighborhood queries from a graph JSON file."""
+
+    parser = argparse.ArgumentParser(description='Query an SOP graph JSON file without Neo4j')
+    parser.add_argument('graph', type=Path,
+                        help='Graph JSON file (e.g. graph/sop-graph.json) or binary snapshot')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    deps = subparsers.add_parser('deps', help='Dependency tree of a component')
+    deps.add_argument('node_id')
+    deps.add_argument('--depth', type=int, default=DEPENDENCY_DEPTH)
+
+    usage = subparsers.add_parser('usage', help='Where a component is used')
+    usage.add_argument('node_id')
+    usage.add_argument('--depth', type=int, default=USAGE_DEPTH)
+
+    neighbors = subparsers.add_parser('neighbors', help='k-hop neighborhood of a node')
+    neighbors.add_argument('node_id')
+    neighbors.add_argument('--hops', type=int, default=2)
+    neighbors.add_argument('--limit', type=int, default=NEIGHBORHOOD_LIMIT)
+
+    subparsers.add_parser('stats', help='Node and edge counts')
+    args = parser.parse_args()
+
+    # Binary snapshots (graph_snapshot.py) are memory-mapped instead of parsed
+    try:
+        from .graph_snapshot import load_graph
+    except ImportError:
+        from graph_snapshot import load_graph
+    graph = load_graph(args.graph)
+
+    if args.command != 'stats' and args.node_id not in graph.index:
+        print(f"ERROR: Unknown node id: {args.node_id}")
+        return 1
+
+    if args.command == 'deps':
+        result = graph.dependency_tree(args.node_id, args.depth)
+    elif args.command == 'usage':
+        result = graph.usage_tree(args.node_id, args.depth)
+    elif args.command == 'neighbors':
+        result = graph.k_hop_neighborhood(args.node_id, args.hops, limit=args.limit)
+    else:
+        result = {
+            'nodes': len(graph),
+            'edges': graph.edge_count(),
+            'edgeTypes': {t: len(graph.forward[t]) for t in graph.edge_types}
+        }
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,136 @@
+"""
+Graph Schema Bootstrap
+======================
+Checks the constraints and vector indexes the ingestion and query code rely
+on, and creates the missing ones before anything is written.
+
+Every component node (Atom, Molecule, Organism, SOP) also carries the shared
+`:Component` label with a uniqueness constraint on `id`, so lookups by id
+that do not know the component type (COMPOSED_OF/DEPENDS_ON targets, graph
+expansion, dependency and usage queries) use an index seek instead of
+scanning every node.
+
+Vector indexes are created with the embedding provider's dimension; existing
+indexes with another dimension are reported, not dropped.
+"""
+
+from typing import Dict, List, Optional
+
+# Shared label of all component nodes
+COMPONENT_LABEL = 'Component'
+
+# Labels that carry the shared label
+COMPONENT_LABELS = ('Atom', 'Molecule', 'Organism', 'SOP')
+
+# Uniqueness constraints: (name, label, property)
+UNIQUE_CONSTRAINTS = [
+    ('component_id_unique', COMPONENT_LABEL, 'id'),
+    ('atom_id_unique', 'Atom', 'id'),
+    ('molecule_id_unique', 'Molecule', 'id'),
+    ('organism_id_unique', 'Organism', 'id'),
+    ('sop_id_unique', 'SOP', 'id'),
+    ('chunk_id_unique', 'Chunk', 'id'),
+    ('graph_meta_id_unique', 'GraphMeta', 'id'),
+    ('concept_name_unique', 'Concept', 'name'),
+    ('department_name_unique', 'Department', 'name'),
+    ('compliance_name_unique', 'ComplianceFramework', 'name'),
+]
+
+# Vector indexes on the `embedding` property: (name, label)
+VECTOR_INDEXES = [
+    ('atom_embedding_index', 'Atom'),
+    ('molecule_embedding_index', 'Molecule'),
+    ('organism_embedding_index', 'Organism'),
+    ('sop_embedding_index', 'SOP'),
+    ('chunk_embedding_index', 'Chunk'),
+]
+
+DEFAULT_VECTOR_DIMENSION = 1536
+
+SHOW_CONSTRAINTS_CYPHER = "SHOW CONSTRAINTS YIELD name"
+
+SHOW_VECTOR_INDEXES_CYPHER = """
+    SHOW INDEXES YIELD name, type, options
+    WHERE type = 'VECTOR'
+    RETURN name, options
+"""
+
+CREATE_CONSTRAINT_CYPHER = """
+    CREATE CONSTRAINT {name} IF NOT EXISTS
+    FOR (n:{label}) REQUIRE n.{property} IS UNIQUE
+"""
+
+# Dimension and similarity are part of the schema statement, not parameters
+CREATE_VECTOR_INDEX_CYPHER = """
+    CREATE VECTOR INDEX {name} IF NOT EXISTS
+    FOR (n:{label}) ON (n.embedding)
+    OPTIONS {{indexConfig: {{
+        `vector.dimensions`: {dimension},
+        `vector.similarity_function`: 'cosine'
+    }}}}
+"""
+
+# Adds the shared label to component nodes written before it existed
+BACKFILL_COMPONENT_LABEL_CYPHER = """
+    MATCH (n:{label})
+    WHERE NOT n:Component
+    SET n:Component
+    RETURN count(n) AS labeled
+"""
+
+
+def _vector_dimension(options: Optional[Dict]) -> Optional[int]:
+    """Dimension of an existing vector index from its SHOW INDEXES options."""
+
+    config = (options or {}).get('indexConfig') or {}
+    dimension = config.get('vector.dimensions')
+    return int(dimension) if dimension is not None else None
+
+
+def ensure_schema(driver, dimension: Optional[int] = None, vector_indexes: bool = True) -> Dict[str, List[str]]:
+    """
+    Create missing constraints and vector indexes, and backfill :Component.
+
+    `dimension` is the embedding size for new vector indexes (default 1536).
+    Returns {'constraints': [...], 'vector_indexes': [...], 'mismatched': [...]}
+    with the names created and those whose dimension differs from `dimension`.
+    """
+
+    dimension = dimension or DEFAULT_VECTOR_DIMENSION
+    report = {'constraints': [], 'vector_indexes': [], 'mismatched': []}
+
+    with driver.session() as session:
+        existing = {record['name'] for record in session.run(SHOW_CONSTRAINTS_CYPHER)}
+
+        # Label existing component nodes first: the constraint only covers labeled nodes
+        if 'component_id_unique' not in existing:
+            for label in COMPONENT_LABELS:
+                session.run(BACKFILL_COMPONENT_LABEL_CYPHER.format(label=label)).consume()
+
+        for name, label, property_name in UNIQUE_CONSTRAINTS:
+            if name in existing:
+                continue
+            try:
+                session.run(CREATE_CONSTRAINT_CYPHER.format(name=name, label=label, property=property_name)).consume()
+            except Exception as e:
+                # Typically duplicate ids across component types
+                print(f"Warning: Could not create constraint {name}: {e}")
+                continue
+            report['constraints'].append(name)
+
+        if not vector_indexes:
+            return report
+
+        indexes = {record['name']: record['options'] for record in session.run(SHOW_VECTOR_INDEXES_CYPHER)}
+        for name, label in VECTOR_INDEXES:
+            if name in indexes:
+                existing_dimension = _vector_dimension(indexes[name])
+                if existing_dimension is not None and existing_dimension != dimension:
+                    print(f"Warning: Vector index {name} has dimension {existing_dimension}, "
+                          f"embeddings have {dimension}; drop and recreate it to search them")
+                    report['mismatched'].append(name)
+                continue
+            session.run(CREATE_VECTOR_INDEX_CYPHER.format(name=name, label=label, dimension=int(dimension))).consume()
+            report['vector_indexes'].append(name)
+
+    return report
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Binary Graph Snapshots
+======================
+Compiles SOP graph JSON (`graph/sop-graph.json`, the mortgage graphs) into a
+compact binary snapshot that is opened with `mmap` and queried in place:
+
+    header          magic, version, counts, section table
+    strings         interned string table (u64 offsets + UTF-8 data) holding
+                    node ids, types, titles and edge types
+    nodes           fixed-width records (id, type, title, extra-properties blob)
+    id_order        node indices sorted by id, for binary-search lookup
+    edges           fixed-width records in file order (for the JSON round trip)
+    csr             per edge type forward and reverse CSR arrays (u32)
+    embeddings      optional float16 block, one row per embedded node
+    meta            the document's other top-level keys (JSON)
+
+Opening a snapshot reads only the header and section table. Node records,
+strings, adjacency rows and embedding rows are decoded on access, so startup
+time and resident memory scale with the part of the graph a query touches,
+not with the file size. GraphSnapshot has the CompiledGraph query API
+(dependency_tree, usage_tree, k_hop_neighborhood, bfs).
+
+`to_dict()` / `export` round-trip a snapshot back to the JSON document.
+Embeddings come back rounded to float16.
+
+Usage:
+    python graphdb/graph_snapshot.py compile graph/sop-graph.json .cache/sop-graph.snap
+    python graphdb/graph_snapshot.py compile graph/sop-graph.json .cache/sop-graph.snap --vector-index .cache/vector-index
+    python graphdb/graph_snapshot.py export .cache/sop-graph.snap graph/sop-graph.json
+    python graphdb/graph_snapshot.py info .cache/sop-graph.snap
+    python graphdb/graph_engine.py .cache/sop-graph.snap deps molecule-account-setup
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .graph_engine import CompiledGraph
+except ImportError:
+    from graph_engine import CompiledGraph
+
+MAGIC = b'SOPGRAPH'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<8sIIIIIIII')      # magic, version, flags, strings, nodes, edges, edge types, dim, sections
+SECTION = struct.Struct('<QQ')             # offset, length
+NODE_RECORD = struct.Struct('<IIIQI')      # id, type, title (string ids), props offset, props length
+EDGE_RECORD = struct.Struct('<IIIIQI')     # source, target, type (string ids), flags, props offset, props length
+CSR_ENTRY = struct.Struct('<QQQQ')         # forward offsets, forward targets, reverse offsets, reverse targets
+
+SECTIONS = (
+    'string_offsets', 'string_data', 'nodes', 'id_order', 'node_props', 'edges', 'edge_props',
+    'edge_types', 'csr_index', 'csr', 'embedding_rows', 'embeddings', 'meta'
+)
+
+# Missing string / node without an embedding row
+NONE = 0xFFFFFFFF
+
+FLAG_NODES_AS_LIST = 1
+
+# Edge stored verbatim in its properties blob (non-string or from/to endpoints)
+EDGE_RAW = 1
+
+ALIGNMENT = 8
+
+
+def _u32(values) -> bytes:
+    data = array('I', values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _u64(values) -> bytes:
+    data = array('Q', values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _compact_json(value) -> bytes:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class _StringTable:
+    """Interns strings to sequential ids while compiling."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.data = bytearray()
+        self.offsets = [0]
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.offsets) - 1
+            self.data += value.encode('utf-8')
+            self.offsets.append(len(self.data))
+        return sid
+
+
+def compile_snapshot(graph_data: Dict, output_path: Path, embeddings: Optional[Dict[str, List[float]]] = None) -> Dict:
+    """
+    Write a parsed graph document as a binary snapshot; returns counts.
+
+    Node `embedding` properties and `embeddings` ({node id: vector}, e.g.
+    from a LocalVectorIndex) are stored as float16 rows.
+    """
+
+    raw_nodes = graph_data.get('nodes', {})
+    nodes = list(raw_nodes.values()) if isinstance(raw_nodes, dict) else list(raw_nodes)
+    edges = graph_data.get('edges', [])
+    embeddings = dict(embeddings or {})
+
+    strings = _StringTable()
+    node_records = bytearray()
+    node_props = bytearray()
+    for node in nodes:
+        if not isinstance(node.get('id'), str):
+            raise ValueError(f"Node without a string id: {node!r:.80}")
+        # String type/title are interned; any other value stays in the props blob
+        rest = {
+            k: v for k, v in node.items()
+            if k not in ('id', 'embedding') and not (k in ('type', 'title') and isinstance(v, str))
+        }
+        if node.get('embedding'):
+            embeddings.setdefault(node['id'], node['embedding'])
+        blob = _compact_json(rest) if rest else b''
+        node_records += NODE_RECORD.pack(
+            strings.intern(node['id']),
+            strings.intern(node['type']) if isinstance(node.get('type'), str) else NONE,
+            strings.intern(node['title']) if isinstance(node.get('title'), str) else NONE,
+            len(node_props), len(blob)
+        )
+        node_props += blob
+
+    # Traversal uses the CompiledGraph edge resolution (source/target or from/to)
+    compiled = CompiledGraph.from_dict({'nodes': nodes, 'edges': edges})
+
+    edge_records = bytearray()
+    edge_props = bytearray()
+    for edge in edges:
+        # Interned when to_dict() can rebuild it as-is: string endpoints, (id,) source, target, type first
+        keys = list(edge)
+        if keys[:1] == ['id']:
+            keys = keys[1:]
+        if keys[:3] == ['source', 'target', 'type'] and all(isinstance(edge[k], str) for k in keys[:3]):
+            source, target, edge_type = edge['source'], edge['target'], edge['type']
+            rest = {k: v for k, v in edge.items() if k not in ('source', 'target', 'type')}
+            blob = _compact_json(rest) if rest else b''
+            edge_records += EDGE_RECORD.pack(
+                strings.intern(source), strings.intern(target), strings.intern(edge_type), 0,
+                len(edge_props), len(blob)
+            )
+        else:
+            blob = _compact_json(edge)
+            edge_records += EDGE_RECORD.pack(NONE, NONE, NONE, EDGE_RAW, len(edge_props), len(blob))
+        edge_props += blob
+
+    csr = []
+    csr_index = bytearray()
+    for edge_type in compiled.edge_types:
+        starts = []
+        for adjacency in (compiled.forward[edge_type], compiled.reverse[edge_type]):
+            starts.append(len(csr))
+            csr.extend(adjacency.offsets)
+            starts.append(len(csr))
+            csr.extend(adjacency.targets)
+        csr_index += CSR_ENTRY.pack(starts[0], starts[1], starts[2], starts[3])
+    edge_type_ids = [strings.intern(t) for t in compiled.edge_types]
+
+    id_order = sorted(range(len(nodes)), key=lambda i: nodes[i]['id'].encode('utf-8'))
+
+    dimension = 0
+    embedding_rows = [NONE] * len(nodes)
+    embedding_block = bytearray()
+    vectors = [(compiled.index[node_id], vector) for node_id, vector in embeddings.items() if node_id in compiled.index]
+    if vectors:
+        dimension = len(vectors[0][1])
+        row_format = struct.Struct(f'<{dimension}e')
+        for row, (index, vector) in enumerate(sorted(vectors, key=lambda v: v[0])):
+            if len(vector) != dimension:
+                raise ValueError(f"Embedding of {nodes[index]['id']} has dimension {len(vector)}, expected {dimension}")
+            embedding_rows[index] = row
+            embedding_block += row_format.pack(*vector)
+
+    meta = {
+        'keys': list(graph_data),
+        'document': {k: v for k, v in graph_data.items() if k not in ('nodes', 'edges')}
+    }
+
+    sections = {
+        'string_offsets': _u64(strings.offsets),
+        'string_data': bytes(strings.data),
+        'nodes': bytes(node_records),
+        'id_order': _u32(id_order),
+        'node_props': bytes(node_props),
+        'edges': bytes(edge_records),
+        'edge_props': bytes(edge_props),
+        'edge_types': _u32(edge_type_ids),
+        'csr_index': bytes(csr_index),
+        'csr': _u32(csr),
+        'embedding_rows': _u32(embedding_rows),
+        'embeddings': bytes(embedding_block),
+        'meta': _compact_json(meta)
+    }
+
+    flags = FLAG_NODES_AS_LIST if isinstance(raw_nodes, list) else 0
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, flags, len(strings.offsets) - 1, len(nodes), len(edges),
+        len(compiled.edge_types), dimension, len(SECTIONS)
+    )
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    offset = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    for name in SECTIONS:
+        offset += -offset % ALIGNMENT
+        table.append((offset, len(sections[name])))
+        offset += len(sections[name])
+
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for section_offset, length in table:
+            f.write(SECTION.pack(section_offset, length))
+        for name, (section_offset, _) in zip(SECTIONS, table):
+            f.write(b'\0' * (section_offset - f.tell()))
+            f.write(sections[name])
+    os.replace(tmp_path, output_path)
+
+    return {
+        'nodes': len(nodes),
+        'edges': len(edges),
+        'strings': len(strings.offsets) - 1,
+        'embeddings': len(vectors),
+        'dimension': dimension,
+        'bytes': offset
+    }
+
+
+class _Adjacency:
+    """CSR adjacency over memory-mapped arrays (same interface as CSRAdjacency)."""
+
+    __slots__ = ('offsets', 'targets')
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+    def neighbors(self, index: int):
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+
+class _NodeView(Mapping):
+    """A node's properties; id/type/title come from the record, the rest is decoded on first use."""
+
+    __slots__ = ('_snapshot', '_index', '_fields', '_props')
+
+    def __init__(self, snapshot: 'GraphSnapshot', index: int):
+        self._snapshot = snapshot
+        self._index = index
+        self._fields = None
+        self._props = None
+
+    def _record_fields(self) -> Dict:
+        if self._fields is None:
+            id_sid, type_sid, title_sid, _, _ = self._snapshot._node_record(self._index)
+            fields = {'id': self._snapshot.string(id_sid)}
+            for key, sid in (('type', type_sid), ('title', title_sid)):
+                if sid != NONE:
+                    fields[key] = self._snapshot.string(sid)
+            self._fields = fields
+        return self._fields
+
+    def _all(self) -> Dict:
+        if self._props is None:
+            self._props = {**self._record_fields(), **self._snapshot._node_props(self._index)}
+        return self._props
+
+    def __getitem__(self, key):
+        fields = self._record_fields()
+        if key in fields:
+            return fields[key]
+        return self._all()[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._all())
+
+    def __len__(self) -> int:
+        return len(self._all())
+
+
+class _Nodes(Sequence):
+    def __init__(self, snapshot: 'GraphSnapshot'):
+        self._snapshot = snapshot
+
+    def __getitem__(self, index: int) -> _NodeView:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return _NodeView(self._snapshot, index)
+
+    def __len__(self) -> int:
+        return self._snapshot.node_count
+
+
+class _Ids(Sequence):
+    def __init__(self, snapshot: 'GraphSnapshot'):
+        self._snapshot = snapshot
+
+    def __getitem__(self, index: int) -> str:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._snapshot.string(self._snapshot._node_record(index)[0])
+
+    def __len__(self) -> int:
+        return self._snapshot.node_count
+
+
+class _IdIndex(Mapping):
+    """id -> node index by binary search over the sorted id_order section."""
+
+    def __init__(self, snapshot: 'GraphSnapshot'):
+        self._snapshot = snapshot
+
+    def __getitem__(self, node_id: str) -> int:
+        snapshot = self._snapshot
+        if not isinstance(node_id, str):
+            raise KeyError(node_id)
+        key = node_id.encode('utf-8')
+        lo, hi = 0, snapshot.node_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            index = snapshot._id_order[mid]
+            candidate = snapshot._string_bytes(snapshot._node_record(index)[0])
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                return index
+        raise KeyError(node_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._snapshot.ids)
+
+    def __len__(self) -> int:
+        return self._snapshot.node_count
+
+
+class GraphSnapshot(CompiledGraph):
+    """Memory-mapped binary snapshot with the CompiledGraph query API."""
+
+    def __init__(self, path: Path):
+        """Map a snapshot file; only the header and section table are read."""
+
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.flags, self.string_count, self.node_count, self.stored_edge_count,
+         edge_type_count, self.dimension, section_count) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a graph snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} has snapshot format {version}, expected {FORMAT_VERSION}")
+
+        self._sections = {
+            name: SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            for i, name in enumerate(SECTIONS[:section_count])
+        }
+        self._view = memoryview(self._mmap)
+        self._string_offsets = self._array('string_offsets', 'Q')
+        self._id_order = self._array('id_order', 'I')
+        self._csr = self._array('csr', 'I')
+        self._embedding_rows = self._array('embedding_rows', 'I')
+        self._strings: Dict[int, str] = {}
+        self._row_format = struct.Struct(f'<{self.dimension}e') if self.dimension else None
+
+        self.nodes = _Nodes(self)
+        self.ids = _Ids(self)
+        self.index = _IdIndex(self)
+
+        type_ids = self._array('edge_types', 'I')
+        self.edge_types = [self.string(type_ids[i]) for i in range(edge_type_count)]
+        self.forward = {}
+        self.reverse = {}
+        for i, edge_type in enumerate(self.edge_types):
+            fwd_offsets, fwd_targets, rev_offsets, rev_targets = CSR_ENTRY.unpack_from(
+                self._mmap, self._sections['csr_index'][0] + i * CSR_ENTRY.size
+            )
+            n = self.node_count + 1
+            self.forward[edge_type] = _Adjacency(
+                self._csr[fwd_offsets:fwd_offsets + n],
+                self._csr[fwd_targets:fwd_targets + self._csr[fwd_offsets + n - 1]]
+            )
+            self.reverse[edge_type] = _Adjacency(
+                self._csr[rev_offsets:rev_offsets + n],
+                self._csr[rev_targets:rev_targets + self._csr[rev_offsets + n - 1]]
+            )
+
+    @classmethod
+    def open(cls, path: Path) -> 'GraphSnapshot':
+        return cls(path)
+
+    def _section(self, name: str) -> memoryview:
+        offset, length = self._sections[name]
+        return self._view[offset:offset + length]
+
+    def _array(self, name: str, typecode: str):
+        """A section as an integer array: zero-copy on little-endian hosts, decoded otherwise."""
+
+        section = self._section(name)
+        if sys.byteorder == 'little':
+            return section.cast(typecode)
+        data = array(typecode, section.tobytes())
+        data.byteswap()
+        return data
+
+    def _string_bytes(self, sid: int) -> bytes:
+        return bytes(self._section('string_data')[self._string_offsets[sid]:self._string_offsets[sid + 1]])
+
+    def string(self, sid: int) -> str:
+        """Interned string by id (decoded once, then cached)."""
+
+        value = self._strings.get(sid)
+        if value is None:
+            value = self._strings[sid] = self._string_bytes(sid).decode('utf-8')
+        return value
+
+    def _node_record(self, index: int) -> Tuple[int, int, int, int, int]:
+        return NODE_RECORD.unpack_from(self._mmap, self._sections['nodes'][0] + index * NODE_RECORD.size)
+
+    def _node_props(self, index: int) -> Dict:
+        _, _, _, offset, length = self._node_record(index)
+        if not length:
+            return {}
+        start = self._sections['node_props'][0] + offset
+        return json.loads(self._mmap[start:start + length])
+
+    def node(self, node_id: str) -> Optional[Dict]:
+        """All properties of a node as a dict (None if unknown)."""
+
+        index = self.index.get(node_id)
+        return None if index is None else dict(self.nodes[index])
+
+    def embedding(self, node_id: str) -> Optional[List[float]]:
+        """A node's embedding (float16 precision), or None."""
+
+        index = self.index.get(node_id)
+        if index is None or not self.dimension or self._embedding_rows[index] == NONE:
+            return None
+        offset = self._sections['embeddings'][0] + self._embedding_rows[index] * self._row_format.size
+        return list(self._row_format.unpack_from(self._mmap, offset))
+
+    def embedding_count(self) -> int:
+        return self._sections['embeddings'][1] // self._row_format.size if self.dimension else 0
+
+    def edges(self) -> Iterator[Dict]:
+        """Stored edges in their original order, as JSON dicts."""
+
+        records_offset = self._sections['edges'][0]
+        props_offset = self._sections['edge_props'][0]
+        for i in range(self.stored_edge_count):
+            source, target, edge_type, flags, offset, length = EDGE_RECORD.unpack_from(
+                self._mmap, records_offset + i * EDGE_RECORD.size
+            )
+            props = json.loads(self._mmap[props_offset + offset:props_offset + offset + length]) if length else {}
+            if flags & EDGE_RAW:
+                yield props
+                continue
+            edge = {}
+            if 'id' in props:
+                edge['id'] = props.pop('id')
+            edge['source'] = self.string(source)
+            edge['target'] = self.string(target)
+            edge['type'] = self.string(edge_type)
+            edge.update(props)
+            yield edge
+
+    def to_dict(self) -> Dict:
+        """The graph JSON document this snapshot was compiled from."""
+
+        meta = json.loads(self._section('meta').tobytes())
+        nodes = []
+        for index in range(self.node_count):
+            node = dict(self.nodes[index])
+            vector = self.embedding(node['id'])
+            if vector is not None:
+                node['embedding'] = vector
+            nodes.append(node)
+
+        document = {}
+        for key in meta['keys']:
+            if key == 'nodes':
+                document['nodes'] = nodes if self.flags & FLAG_NODES_AS_LIST else {n['id']: n for n in nodes}
+            elif key == 'edges':
+                document['edges'] = list(self.edges())
+            else:
+                document[key] = meta['document'][key]
+        return document
+
+    def close(self):
+        """Release the memory map."""
+
+        for name in ('_string_offsets', '_id_order', '_csr', '_embedding_rows'):
+            value = getattr(self, name, None)
+            if isinstance(value, memoryview):
+                value.release()
+        self.forward = self.reverse = {}
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def is_snapshot(path: Path) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_graph(path: Path) -> CompiledGraph:
+    """Open a graph snapshot, or compile a graph JSON file in memory."""
+
+    return GraphSnapshot(path) if is_snapshot(path) else CompiledGraph.from_json(path)
+
+
+def main():
+    """Compile, export or describe graph snapshots."""
+
+    parser = argparse.ArgumentParser(description='Compile SOP graph JSON into memory-mappable binary snapshots')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    compile_parser = subparsers.add_parser('compile', help='Graph JSON -> snapshot')
+    compile_parser.add_argument('graph', type=Path, help='Graph JSON file (e.g. graph/sop-graph.json)')
+    compile_parser.add_argument('output', type=Path, help='Snapshot file to write')
+    compile_parser.add_argument('--vector-index', type=Path, default=None,
+                                help='Also store embeddings from this local vector index directory')
+
+    export_parser = subparsers.add_parser('export', help='Snapshot -> graph JSON')
+    export_parser.add_argument('snapshot', type=Path)
+    export_parser.add_argument('output', type=Path)
+
+    info_parser = subparsers.add_parser('info', help='Counts and section sizes')
+    info_parser.add_argument('snapshot', type=Path)
+    args = parser.parse_args()
+
+    if args.command == 'compile':
+        with open(args.graph, 'r', encoding='utf-8') as f:
+            graph_data = json.load(f)
+
+        embeddings = None
+        if args.vector_index:
+            try:
+                from .vector_index import LocalVectorIndex
+            except ImportError:
+                from vector_index import LocalVectorIndex
+            index = LocalVectorIndex.load(args.vector_index)
+            embeddings = {record['id']: index.matrix[row].tolist() for row, record in enumerate(index.records)}
+
+        counts = compile_snapshot(graph_data, args.output, embeddings)
+        print(f"✓ Compiled {args.graph} -> {args.output}")
+        for name, count in counts.items():
+            print(f"  {name}: {count}")
+        return 0
+
+    try:
+        snapshot = GraphSnapshot(args.snapshot)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    with snapshot:
+        if args.command == 'export':
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(snapshot.to_dict(), f, indent=2)
+            print(f"✓ Exported {args.snapshot} -> {args.output}")
+        else:
+            print(json.dumps({
+                'nodes': snapshot.node_count,
+                'edges': snapshot.stored_edge_count,
+                'strings': snapshot.string_count,
+                'edgeTypes': {t: len(snapshot.forward[t]) for t in snapshot.edge_types},
+                'embeddings': snapshot.embedding_count(),
+                'dimension': snapshot.dimension,
+                'sections': {name: length for name, (_, length) in snapshot._sections.items()}
+            }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
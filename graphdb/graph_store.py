@@ -0,0 +1,1350 @@
+"""
+Graph Storage Backends
+======================
+The storage operations SOPGraphIngestion and GraphRAGQuery need, behind one
+interface, so ingestion and queries can run against Neo4j or an embedded
+in-memory graph:
+
+    upsert_nodes / upsert_edges   MERGE component nodes and typed edges
+    write_component_batch         nodes, chunks and edges of one batch
+    expand                        undirected k-hop neighborhoods
+    vector_search(_many)          top-k cosine search of a vector index
+    filtered_vector_search        top-k restricted by department, complexity
+                                  and compliance framework
+    find_nodes                    lookups by label and property values
+
+Neo4jGraphStore issues the Cypher statements below through a driver (or any
+stand-in with the same session interface, e.g. ProfilingDriver).
+InMemoryGraphStore keeps nodes in dicts with label and property indexes,
+edges in forward/reverse adjacency dicts and embeddings in per-index numpy
+matrices (LocalVectorIndex); it can be saved to and loaded from a JSON file,
+so small deployments and CI need no database server.
+
+AsyncGraphRAGQuery reads through an AsyncGraphStore: AsyncNeo4jGraphStore
+over the Neo4j async driver, or ThreadedGraphStore, which runs any
+GraphStore (e.g. an InMemoryGraphStore) on worker threads.
+
+Usage:
+    store = InMemoryGraphStore('.cache/sop-graph-store.json')
+    ingestion = SOPGraphIngestion(store=store, embedding_provider=provider)
+    graphrag = GraphRAGQuery(store=InMemoryGraphStore.load('.cache/sop-graph-store.json'), ...)
+"""
+
+import asyncio
+import heapq
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .graph_schema import COMPONENT_LABEL, COMPONENT_LABELS, VECTOR_INDEXES, ensure_schema
+    from .vector_index import EXPORT_CYPHER, RECORD_FIELDS, LocalVectorIndex
+except ImportError:
+    from graph_schema import COMPONENT_LABEL, COMPONENT_LABELS, VECTOR_INDEXES, ensure_schema
+    from vector_index import EXPORT_CYPHER, RECORD_FIELDS, LocalVectorIndex
+
+
+# ----------------------------------------------------------------------------
+# Write statements (bulk UNWIND; each handles a whole batch in one round trip)
+# ----------------------------------------------------------------------------
+
+# Parameterized UNWIND statements of the Neo4j write path. Component nodes
+# also get the shared :Component label so that links to targets of unknown
+# type are index lookups (see graph_schema.py).
+BULK_NODE_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (n:{label} {{id: row.id}})
+    SET n:Component, n += row.properties
+"""
+
+BULK_RELATIONSHIP_CYPHER = {
+    'OWNED_BY': """
+        UNWIND $rows AS row
+        MATCH (n:{label} {{id: row.source}})
+        MERGE (d:Department {{name: row.target}})
+        MERGE (n)-[:OWNED_BY]->(d)
+    """,
+    'COMPLIES_WITH': """
+        UNWIND $rows AS row
+        MATCH (n:{label} {{id: row.source}})
+        MERGE (cf:ComplianceFramework {{name: row.target}})
+        MERGE (n)-[:COMPLIES_WITH]->(cf)
+    """,
+    'REFERENCES': """
+        UNWIND $rows AS row
+        MATCH (n:{label} {{id: row.source}})
+        MERGE (c:Concept {{name: row.target}})
+        MERGE (n)-[:REFERENCES]->(c)
+    """,
+    'COMPOSED_OF': """
+        UNWIND $rows AS row
+        MATCH (n:{label} {{id: row.source}})
+        MATCH (c:Component {{id: row.target}})
+        MERGE (n)-[:COMPOSED_OF {{order: row.order}}]->(c)
+    """,
+    'DEPENDS_ON': """
+        UNWIND $rows AS row
+        MATCH (n:{label} {{id: row.source}})
+        MATCH (dep:Component {{id: row.target}})
+        MERGE (n)-[:DEPENDS_ON {{dependencyType: 'hard'}}]->(dep)
+    """,
+}
+
+# Relationship types written by ingestion, in write order
+RELATIONSHIP_TYPES = tuple(BULK_RELATIONSHIP_CYPHER)
+
+# Drops outgoing ingestion-managed relationships of re-ingested nodes so that
+# entries removed from frontmatter do not linger in incremental mode.
+BULK_CLEAR_RELATIONSHIPS_CYPHER = """
+    UNWIND $ids AS id
+    MATCH (n:{label} {{id: id}})-[r:OWNED_BY|COMPLIES_WITH|REFERENCES|COMPOSED_OF|DEPENDS_ON]->()
+    DELETE r
+"""
+
+# Removes nodes (and their chunks) whose source file no longer exists
+TOMBSTONE_CYPHER = """
+    UNWIND $ids AS id
+    MATCH (n:{label} {{id: id}})
+    OPTIONAL MATCH (n)-[:HAS_CHUNK]->(c:Chunk)
+    DETACH DELETE c, n
+"""
+
+# Chunk mode: replace a component's :Chunk nodes with freshly embedded ones
+CLEAR_CHUNKS_CYPHER = """
+    UNWIND $ids AS id
+    MATCH (n:{label} {{id: id}})-[:HAS_CHUNK]->(c:Chunk)
+    DETACH DELETE c
+"""
+
+BULK_CHUNK_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (n:{label} {{id: row.parentId}})
+    MERGE (c:Chunk {{id: row.id}})
+    SET c += row.properties
+    MERGE (n)-[:HAS_CHUNK {{order: row.properties.chunkIndex}}]->(c)
+"""
+
+# Graph version stamp: bumped after every run that changed the graph so
+# query-side result caches can tell when they are stale
+BUMP_GRAPH_VERSION_CYPHER = """
+    MERGE (m:GraphMeta {id: 'graph'})
+    SET m.version = coalesce(m.version, 0) + 1,
+        m.updatedAt = datetime()
+    RETURN m.version AS version
+"""
+
+# ----------------------------------------------------------------------------
+# Read statements
+# ----------------------------------------------------------------------------
+
+GRAPH_VERSION_CYPHER = """
+    OPTIONAL MATCH (m:GraphMeta {id: 'graph'})
+    RETURN m.version AS version
+"""
+
+VECTOR_SEARCH_CYPHER = """
+    CALL db.index.vector.queryNodes($indexName, $topK, $embedding)
+    YIELD node, score
+    RETURN
+        node.id as id,
+        node.type as type,
+        node.title as title,
+        node.content as content,
+        node.department as department,
+        node.tags as tags,
+        score
+    ORDER BY score DESC
+"""
+
+# Searches one index for several query embeddings in one round trip
+VECTOR_SEARCH_MANY_CYPHER = """
+    UNWIND range(0, size($embeddings) - 1) AS queryIndex
+    CALL {
+        WITH queryIndex
+        CALL db.index.vector.queryNodes($indexName, $topK, $embeddings[queryIndex])
+        YIELD node, score
+        RETURN
+            node.id as id,
+            node.type as type,
+            node.title as title,
+            node.content as content,
+            node.department as department,
+            node.tags as tags,
+            score
+    }
+    RETURN queryIndex, id, type, title, content, department, tags, score
+"""
+
+# Filters are parameters (NULL = no constraint); the subquery always returns
+# one row so the candidate count is known even when nothing passes
+ONTOLOGY_SEARCH_CYPHER = """
+    CALL db.index.vector.queryNodes($indexName, $candidates, $embedding)
+    YIELD node, score
+    WITH collect({node: node, score: score}) AS hits
+    CALL {
+        WITH hits
+        UNWIND hits AS hit
+        WITH hit.node AS node, hit.score AS score
+        WHERE ($department IS NULL OR node.department = $department)
+          AND ($complexity IS NULL OR node.complexity = $complexity)
+          AND ($framework IS NULL OR EXISTS {
+              MATCH (node)-[:COMPLIES_WITH]->(:ComplianceFramework {name: $framework})
+          })
+        WITH node, score
+        ORDER BY score DESC
+        LIMIT $topK
+        RETURN collect({
+            id: node.id,
+            type: node.type,
+            title: node.title,
+            content: node.content,
+            department: node.department,
+            complexity: node.complexity,
+            score: score
+        }) AS matches
+    }
+    RETURN size(hits) AS candidateCount, matches
+"""
+
+# One round trip for many start nodes; the subquery keeps the ordering and
+# limit per start node. Formatted with rel_filter, hops and limit (see
+# expansion_cypher). Only components are returned, so :Chunk, :Department
+# and :Concept nodes do not use up the limit. Each neighbor is returned once,
+# at its shortest distance (with the first edge type of a shortest path), like
+# InMemoryGraphStore's breadth-first search.
+GRAPH_EXPANSION_CYPHER = """
+    UNWIND $nodeIds AS nodeId
+    CALL {{
+        WITH nodeId
+        MATCH path = (start:Component {{id: nodeId}})-[r{rel_filter}*1..{hops}]-(neighbor:Component)
+        WHERE neighbor <> start
+        WITH start, neighbor, length(path) AS pathLength, type(r[0]) AS firstType
+        ORDER BY pathLength
+        WITH start, neighbor, min(pathLength) AS distance, collect(firstType)[0] AS relationshipType
+        RETURN
+            start.id as startId,
+            neighbor.id as neighborId,
+            neighbor.type as neighborType,
+            neighbor.title as neighborTitle,
+            relationshipType,
+            distance
+        ORDER BY distance, neighborId
+        {limit}
+    }}
+    RETURN startId, neighborId, neighborType, neighborTitle, relationshipType, distance
+"""
+
+# Edge types followed by graph expansion when none are given: everything
+# ingestion links except HAS_CHUNK
+EXPANSION_RELATIONSHIP_TYPES = RELATIONSHIP_TYPES
+
+
+def expansion_cypher(hops: int, rel_types: Optional[Iterable[str]] = None, limited: bool = True) -> str:
+    """
+    GRAPH_EXPANSION_CYPHER for `hops` over `rel_types` (default:
+    EXPANSION_RELATIONSHIP_TYPES). With `limited`, each start node returns at
+    most $limit neighbors; otherwise there is no LIMIT clause (Neo4j rejects
+    LIMIT null).
+    """
+
+    rel_types = [rel_type for rel_type in rel_types or EXPANSION_RELATIONSHIP_TYPES if rel_type != 'HAS_CHUNK']
+    return GRAPH_EXPANSION_CYPHER.format(
+        rel_filter=f":{'|'.join(rel_types)}", hops=int(hops), limit='LIMIT $limit' if limited else ''
+    )
+
+
+CHUNK_VECTOR_SEARCH_CYPHER = """
+    CALL db.index.vector.queryNodes('chunk_embedding_index', $candidates, $embedding)
+    YIELD node AS chunk, score
+    MATCH (parent)-[:HAS_CHUNK]->(chunk)
+    WHERE $nodeType IS NULL OR parent.type = toLower($nodeType)
+    WITH parent, chunk, score
+    ORDER BY score DESC
+    WITH parent, collect({id: chunk.id, heading: chunk.heading, text: chunk.text, score: score}) AS hits
+    RETURN
+        parent.id as id,
+        parent.type as type,
+        parent.title as title,
+        parent.content as content,
+        parent.department as department,
+        parent.tags as tags,
+        hits[0].score as score,
+        hits[0..3] as chunks
+    ORDER BY score DESC
+    LIMIT $topK
+"""
+
+COMPONENT_DEPENDENCIES_CYPHER = """
+    MATCH path = (c:Component {id: $id})-[:DEPENDS_ON*1..3]->(dep)
+    RETURN
+        dep.id as depId,
+        dep.type as depType,
+        dep.title as depTitle,
+        length(path) as depth
+    ORDER BY depth
+"""
+
+COMPONENT_USAGE_CYPHER = """
+    MATCH path = (c:Component {id: $id})<-[:COMPOSED_OF*1..3]-(parent)
+    RETURN
+        parent.id as parentId,
+        parent.type as parentType,
+        parent.title as parentTitle,
+        length(path) as depth
+    ORDER BY depth
+"""
+
+HAS_COMPLIANCE_CYPHER = """
+    MATCH (n:Component {id: $nodeId})-[:COMPLIES_WITH]->(cf:ComplianceFramework {name: $framework})
+    RETURN count(cf) > 0 as hasCompliance
+"""
+
+# Formatted with the label; filters are a {property: value} parameter map
+FIND_NODES_CYPHER = """
+    MATCH (n:{label})
+    WHERE all(key IN keys($filters) WHERE n[key] = $filters[key])
+    RETURN properties(n) AS properties
+    LIMIT $limit
+"""
+
+# Hits returned per query by the chunk search (as CHUNK_VECTOR_SEARCH_CYPHER)
+CHUNKS_PER_HIT = 3
+
+# Vector index name -> indexed label
+VECTOR_INDEX_LABELS = dict(VECTOR_INDEXES)
+
+# Nodes identified by name rather than id, with the edge types that point at them
+NAMED_LABELS = {'OWNED_BY': 'Department', 'COMPLIES_WITH': 'ComplianceFramework', 'REFERENCES': 'Concept'}
+
+# Edge properties that MERGE matches on (so they distinguish parallel edges)
+EDGE_PROPERTIES = {
+    'COMPOSED_OF': lambda row: {'order': row.get('order')},
+    'DEPENDS_ON': lambda row: {'dependencyType': 'hard'},
+}
+
+STORE_FORMAT_VERSION = 1
+
+
+def _vector_record(record) -> Dict:
+    return {field: record[field] for field in ('id', 'type', 'title', 'content', 'department', 'tags', 'score')}
+
+
+class GraphStore(ABC):
+    """
+    Storage operations used by SOPGraphIngestion and GraphRAGQuery.
+
+    Backends implement the abstract methods; ensure_schema,
+    write_component_batch, vector_search_many and close have defaults.
+    """
+
+    def ensure_schema(self, dimension: Optional[int] = None, vector_indexes: bool = True) -> Dict[str, List[str]]:
+        """Create missing constraints and indexes (see graph_schema.ensure_schema)."""
+        return {'constraints': [], 'vector_indexes': [], 'mismatched': []}
+
+    @abstractmethod
+    def upsert_nodes(self, label: str, rows: List[Dict]):
+        """MERGE nodes by id and add `properties`; rows are {'id', 'properties'}."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert_edges(self, rel_type: str, source_label: str, rows: List[Dict]):
+        """MERGE `rel_type` edges from `source_label` nodes; rows are {'source', 'target'[, 'order']}."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear_relationships(self, label: str, ids: List[str]):
+        """Delete the outgoing ingestion-managed edges of the given nodes."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def replace_chunks(self, label: str, parent_ids: List[str], chunk_rows: List[Dict]):
+        """Replace the :Chunk nodes of the given parents with `chunk_rows`."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_nodes(self, label: str, ids: List[str]):
+        """Detach-delete nodes and their chunks."""
+        raise NotImplementedError
+
+    def write_component_batch(
+        self,
+        label: str,
+        rows: List[Dict],
+        replace_relationships: bool = False,
+        rel_types: Optional[List[str]] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, int]:
+        """
+        Write one batch of component rows (see SOPGraphIngestion.build_component_row).
+
+        Returns the row count per relationship type (and 'HAS_CHUNK'). Time
+        spent on relationships is added to timings['relationships'].
+        """
+
+        ids = [row['id'] for row in rows]
+        if replace_relationships:
+            self.clear_relationships(label, ids)
+
+        self.upsert_nodes(label, [{'id': row['id'], 'properties': row['properties']} for row in rows])
+
+        counts = {}
+        chunked = [row for row in rows if row.get('chunks') is not None]
+        if chunked:
+            chunk_rows = [chunk for row in chunked for chunk in row['chunks']]
+            self.replace_chunks(label, [row['id'] for row in chunked], chunk_rows)
+            counts['HAS_CHUNK'] = len(chunk_rows)
+
+        started = time.perf_counter()
+        for rel_type in RELATIONSHIP_TYPES:
+            if rel_types is not None and rel_type not in rel_types:
+                continue
+            rel_rows = [rel for row in rows for rel in row['relationships'][rel_type]]
+            if rel_rows:
+                self.upsert_edges(rel_type, label, rel_rows)
+            counts[rel_type] = len(rel_rows)
+        if timings is not None:
+            timings['relationships'] = timings.get('relationships', 0.0) + time.perf_counter() - started
+
+        return counts
+
+    @abstractmethod
+    def graph_version(self) -> Optional[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def bump_graph_version(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def vector_search(self, index_name: str, embedding: List[float], top_k: int) -> List[Dict]:
+        """Top-k hits of one vector index: id, type, title, content, department, tags, score."""
+        raise NotImplementedError
+
+    def vector_search_many(self, index_name: str, embeddings: List[List[float]], top_k: int) -> List[List[Dict]]:
+        """vector_search for several embeddings, per embedding in input order."""
+        return [self.vector_search(index_name, embedding, top_k) for embedding in embeddings]
+
+    @abstractmethod
+    def chunk_search(
+        self,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        node_type: Optional[str] = None
+    ) -> List[Dict]:
+        """Chunk hits collapsed to their parents, scored by the best chunk, with the top chunks."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def filtered_vector_search(
+        self,
+        index_name: str,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        department: Optional[str] = None,
+        complexity: Optional[str] = None,
+        framework: Optional[str] = None
+    ) -> Tuple[int, List[Dict]]:
+        """(candidates returned by the index, top_k of them passing the filters)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def expand(
+        self,
+        node_ids: List[str],
+        hops: int,
+        rel_types: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        {node_id: component neighbors within `hops` edges in either direction}.
+
+        Each neighbor appears once, at its shortest distance, with the first
+        edge type of a shortest path; the start node is never included.
+        Neighbors are ordered by (distance, id), and `limit` (None = all)
+        applies per start node. HAS_CHUNK edges are not followed.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def dependencies(self, node_id: str) -> List[Dict]:
+        """Components reached over DEPENDS_ON (up to 3 hops): id, type, title, depth."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def usage(self, node_id: str) -> List[Dict]:
+        """Components and SOPs that reach the node over COMPOSED_OF (up to 3 hops)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def has_compliance(self, node_id: str, framework: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_nodes(self, label: str = COMPONENT_LABEL, limit: int = 100, **filters) -> List[Dict]:
+        """Properties (without embeddings) of `label` nodes whose properties equal `filters`."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def embedding_records(self) -> Iterable[Dict]:
+        """Embedded component nodes, for LocalVectorIndex.build."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class Neo4jGraphStore(GraphStore):
+    """GraphStore over a Neo4j driver."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def ensure_schema(self, dimension: Optional[int] = None, vector_indexes: bool = True) -> Dict[str, List[str]]:
+        return ensure_schema(self.driver, dimension, vector_indexes=vector_indexes)
+
+    def _write(self, cypher: str, **params):
+        with self.driver.session() as session:
+            session.execute_write(lambda tx: tx.run(cypher, **params).consume())
+
+    def upsert_nodes(self, label: str, rows: List[Dict]):
+        if rows:
+            self._write(BULK_NODE_CYPHER.format(label=label), rows=rows)
+
+    def upsert_edges(self, rel_type: str, source_label: str, rows: List[Dict]):
+        if rows:
+            self._write(BULK_RELATIONSHIP_CYPHER[rel_type].format(label=source_label), rows=rows)
+
+    def clear_relationships(self, label: str, ids: List[str]):
+        self._write(BULK_CLEAR_RELATIONSHIPS_CYPHER.format(label=label), ids=ids)
+
+    def replace_chunks(self, label: str, parent_ids: List[str], chunk_rows: List[Dict]):
+        with self.driver.session() as session:
+            session.execute_write(self._replace_chunks_tx, label, parent_ids, chunk_rows)
+
+    @staticmethod
+    def _replace_chunks_tx(tx, label: str, parent_ids: List[str], chunk_rows: List[Dict]):
+        tx.run(CLEAR_CHUNKS_CYPHER.format(label=label), ids=parent_ids)
+        if chunk_rows:
+            tx.run(BULK_CHUNK_CYPHER.format(label=label), rows=chunk_rows)
+
+    def delete_nodes(self, label: str, ids: List[str]):
+        self._write(TOMBSTONE_CYPHER.format(label=label), ids=ids)
+
+    def write_component_batch(
+        self,
+        label: str,
+        rows: List[Dict],
+        replace_relationships: bool = False,
+        rel_types: Optional[List[str]] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, int]:
+        """All statements of the batch in one transaction."""
+
+        with self.driver.session() as session:
+            return session.execute_write(
+                self._write_component_batch_tx, label, rows, replace_relationships, rel_types, timings
+            )
+
+    @staticmethod
+    def _write_component_batch_tx(
+        tx,
+        label: str,
+        rows: List[Dict],
+        replace_relationships: bool = False,
+        rel_types: Optional[List[str]] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, int]:
+        if replace_relationships:
+            tx.run(BULK_CLEAR_RELATIONSHIPS_CYPHER.format(label=label), ids=[row['id'] for row in rows])
+
+        tx.run(
+            BULK_NODE_CYPHER.format(label=label),
+            rows=[{'id': row['id'], 'properties': row['properties']} for row in rows]
+        )
+
+        counts = {}
+        chunked = [row for row in rows if row.get('chunks') is not None]
+        if chunked:
+            Neo4jGraphStore._replace_chunks_tx(
+                tx, label, [row['id'] for row in chunked], [chunk for row in chunked for chunk in row['chunks']]
+            )
+            counts['HAS_CHUNK'] = sum(len(row['chunks']) for row in chunked)
+
+        started = time.perf_counter()
+        for rel_type, cypher in BULK_RELATIONSHIP_CYPHER.items():
+            if rel_types is not None and rel_type not in rel_types:
+                continue
+            rel_rows = [rel for row in rows for rel in row['relationships'][rel_type]]
+            if rel_rows:
+                tx.run(cypher.format(label=label), rows=rel_rows).consume()
+            counts[rel_type] = len(rel_rows)
+        if timings is not None:
+            timings['relationships'] = timings.get('relationships', 0.0) + time.perf_counter() - started
+
+        return counts
+
+    def graph_version(self) -> Optional[int]:
+        with self.driver.session() as session:
+            record = session.run(GRAPH_VERSION_CYPHER).single()
+            return record['version'] if record else None
+
+    def bump_graph_version(self) -> int:
+        with self.driver.session() as session:
+            return session.run(BUMP_GRAPH_VERSION_CYPHER).single()['version']
+
+    def vector_search(self, index_name: str, embedding: List[float], top_k: int) -> List[Dict]:
+        with self.driver.session() as session:
+            result = session.run(VECTOR_SEARCH_CYPHER, indexName=index_name, topK=top_k, embedding=embedding)
+            return [_vector_record(record) for record in result]
+
+    def vector_search_many(self, index_name: str, embeddings: List[List[float]], top_k: int) -> List[List[Dict]]:
+        per_query = [[] for _ in embeddings]
+        with self.driver.session() as session:
+            result = session.run(VECTOR_SEARCH_MANY_CYPHER, indexName=index_name, topK=top_k, embeddings=embeddings)
+            for record in result:
+                per_query[record['queryIndex']].append(_vector_record(record))
+        return per_query
+
+    def chunk_search(
+        self,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        node_type: Optional[str] = None
+    ) -> List[Dict]:
+        with self.driver.session() as session:
+            result = session.run(
+                CHUNK_VECTOR_SEARCH_CYPHER, candidates=candidates, topK=top_k, nodeType=node_type, embedding=embedding
+            )
+            return [dict(_vector_record(record), chunks=record['chunks']) for record in result]
+
+    def filtered_vector_search(
+        self,
+        index_name: str,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        department: Optional[str] = None,
+        complexity: Optional[str] = None,
+        framework: Optional[str] = None
+    ) -> Tuple[int, List[Dict]]:
+        with self.driver.session() as session:
+            row = session.run(
+                ONTOLOGY_SEARCH_CYPHER,
+                indexName=index_name,
+                candidates=candidates,
+                topK=top_k,
+                embedding=embedding,
+                department=department,
+                complexity=complexity,
+                framework=framework
+            ).single()
+        return (row['candidateCount'], row['matches']) if row else (0, [])
+
+    def expand(
+        self,
+        node_ids: List[str],
+        hops: int,
+        rel_types: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        expansions = {node_id: [] for node_id in node_ids}
+        if not node_ids or hops < 1:
+            return expansions
+
+        with self.driver.session() as session:
+            result = session.run(
+                expansion_cypher(hops, rel_types, limited=limit is not None),
+                nodeIds=node_ids,
+                limit=limit
+            )
+            for record in result:
+                expansions[record['startId']].append({
+                    'startId': record['startId'],
+                    'neighborId': record['neighborId'],
+                    'neighborType': record['neighborType'],
+                    'neighborTitle': record['neighborTitle'],
+                    'relationshipType': record['relationshipType'],
+                    'distance': record['distance']
+                })
+        return expansions
+
+    def dependencies(self, node_id: str) -> List[Dict]:
+        with self.driver.session() as session:
+            return [
+                {'id': record['depId'], 'type': record['depType'], 'title': record['depTitle'], 'depth': record['depth']}
+                for record in session.run(COMPONENT_DEPENDENCIES_CYPHER, id=node_id)
+            ]
+
+    def usage(self, node_id: str) -> List[Dict]:
+        with self.driver.session() as session:
+            return [
+                {
+                    'id': record['parentId'],
+                    'type': record['parentType'],
+                    'title': record['parentTitle'],
+                    'depth': record['depth']
+                }
+                for record in session.run(COMPONENT_USAGE_CYPHER, id=node_id)
+            ]
+
+    def has_compliance(self, node_id: str, framework: str) -> bool:
+        with self.driver.session() as session:
+            record = session.run(HAS_COMPLIANCE_CYPHER, nodeId=node_id, framework=framework).single()
+            return record['hasCompliance'] if record else False
+
+    def find_nodes(self, label: str = COMPONENT_LABEL, limit: int = 100, **filters) -> List[Dict]:
+        with self.driver.session() as session:
+            result = session.run(FIND_NODES_CYPHER.format(label=label), filters=filters, limit=limit)
+            nodes = [dict(record['properties']) for record in result]
+        for node in nodes:
+            node.pop('embedding', None)
+        return nodes
+
+    def embedding_records(self) -> Iterable[Dict]:
+        with self.driver.session() as session:
+            return [record.data() for record in session.run(EXPORT_CYPHER)]
+
+    def close(self):
+        self.driver.close()
+
+
+class InMemoryGraphStore(GraphStore):
+    """
+    Embedded GraphStore: dict node/edge indexes plus numpy vector search.
+
+    Nodes are keyed by id (by 'Label:name' for Department, ComplianceFramework
+    and Concept nodes). With a `path`, the graph is loaded from it if the
+    file exists and written back on save() and close().
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        # key -> {'labels': set, 'properties': dict}
+        self.nodes: Dict[str, Dict] = {}
+        self.labels: Dict[str, set] = {}
+        # source -> {(type, target, edge properties as sorted items): properties}
+        self.out_edges: Dict[str, Dict[Tuple, Dict]] = {}
+        # target -> {(type, source, edge properties as sorted items)}
+        self.in_edges: Dict[str, set] = {}
+        self.version: Optional[int] = None
+        # Derived indexes, rebuilt lazily after writes
+        self._vector_indexes: Dict[str, LocalVectorIndex] = {}
+        self._property_indexes: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.RLock()
+        self.modified = False
+
+        if self.path and self.path.exists():
+            self._load(self.path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'InMemoryGraphStore':
+        """Open a saved store (FileNotFoundError if missing)."""
+
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Graph store not found: {path}")
+        return cls(path)
+
+    # -- node and edge primitives ---------------------------------------------
+
+    def _invalidate(self, labels: Iterable[str]):
+        for label in labels:
+            for name, indexed_label in VECTOR_INDEX_LABELS.items():
+                if indexed_label == label:
+                    self._vector_indexes.pop(name, None)
+            for key in [key for key in self._property_indexes if key[0] == label]:
+                del self._property_indexes[key]
+        self.modified = True
+
+    def _merge_node(self, key: str, labels: Iterable[str], properties: Dict) -> Dict:
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = {'labels': set(), 'properties': {}}
+        for label in labels:
+            if label not in node['labels']:
+                node['labels'].add(label)
+                self.labels.setdefault(label, set()).add(key)
+        node['properties'].update(properties)
+        self._invalidate(node['labels'])
+        return node
+
+    def _has_label(self, key: str, label: str) -> bool:
+        return key in self.labels.get(label, ())
+
+    def _merge_edge(self, source: str, rel_type: str, target: str, properties: Dict):
+        edge_key = (rel_type, target, tuple(sorted(properties.items())))
+        self.out_edges.setdefault(source, {})[edge_key] = properties
+        self.in_edges.setdefault(target, set()).add((rel_type, source, edge_key[2]))
+
+    def _delete_edge(self, source: str, edge_key: Tuple):
+        rel_type, target, props = edge_key
+        del self.out_edges[source][edge_key]
+        self.in_edges[target].discard((rel_type, source, props))
+
+    def _detach_delete(self, key: str):
+        for edge_key in list(self.out_edges.get(key, {})):
+            self._delete_edge(key, edge_key)
+        for rel_type, source, props in list(self.in_edges.get(key, ())):
+            self._delete_edge(source, (rel_type, key, props))
+        self.out_edges.pop(key, None)
+        self.in_edges.pop(key, None)
+        node = self.nodes.pop(key)
+        for label in node['labels']:
+            self.labels[label].discard(key)
+        self._invalidate(node['labels'])
+
+    def upsert_nodes(self, label: str, rows: List[Dict]):
+        labels = (label, COMPONENT_LABEL) if label in COMPONENT_LABELS else (label,)
+        with self._lock:
+            for row in rows:
+                self._merge_node(row['id'], labels, dict(row['properties'], id=row['id']))
+
+    def upsert_edges(self, rel_type: str, source_label: str, rows: List[Dict]):
+        target_label = NAMED_LABELS.get(rel_type)
+        edge_properties = EDGE_PROPERTIES.get(rel_type, lambda row: {})
+        with self._lock:
+            for row in rows:
+                # MATCH semantics: missing endpoints create nothing
+                if not self._has_label(row['source'], source_label):
+                    continue
+                if target_label:
+                    target = f"{target_label}:{row['target']}"
+                    self._merge_node(target, (target_label,), {'name': row['target']})
+                elif self._has_label(row['target'], COMPONENT_LABEL):
+                    target = row['target']
+                else:
+                    continue
+                self._merge_edge(row['source'], rel_type, target, edge_properties(row))
+            self.modified = True
+
+    def clear_relationships(self, label: str, ids: List[str]):
+        with self._lock:
+            for node_id in ids:
+                if not self._has_label(node_id, label):
+                    continue
+                for edge_key in [k for k in self.out_edges.get(node_id, {}) if k[0] in RELATIONSHIP_TYPES]:
+                    self._delete_edge(node_id, edge_key)
+            self.modified = True
+
+    def _chunks_of(self, key: str) -> List[str]:
+        return [target for rel_type, target, _ in self.out_edges.get(key, {}) if rel_type == 'HAS_CHUNK']
+
+    def replace_chunks(self, label: str, parent_ids: List[str], chunk_rows: List[Dict]):
+        with self._lock:
+            for parent_id in parent_ids:
+                if self._has_label(parent_id, label):
+                    for chunk_id in self._chunks_of(parent_id):
+                        self._detach_delete(chunk_id)
+            for row in chunk_rows:
+                if not self._has_label(row['parentId'], label):
+                    continue
+                self._merge_node(row['id'], ('Chunk',), dict(row['properties'], id=row['id']))
+                self._merge_edge(row['parentId'], 'HAS_CHUNK', row['id'], {'order': row['properties'].get('chunkIndex')})
+
+    def delete_nodes(self, label: str, ids: List[str]):
+        with self._lock:
+            for node_id in ids:
+                if self._has_label(node_id, label):
+                    for chunk_id in self._chunks_of(node_id):
+                        self._detach_delete(chunk_id)
+                    self._detach_delete(node_id)
+
+    def graph_version(self) -> Optional[int]:
+        return self.version
+
+    def bump_graph_version(self) -> int:
+        with self._lock:
+            self.version = (self.version or 0) + 1
+            self.modified = True
+            return self.version
+
+    # -- reads ------------------------------------------------------------------
+
+    def _properties(self, key: str) -> Dict:
+        return self.nodes[key]['properties']
+
+    def _vector_index(self, index_name: str) -> Optional[LocalVectorIndex]:
+        label = VECTOR_INDEX_LABELS.get(index_name)
+        if label is None:
+            return None
+        with self._lock:
+            index = self._vector_indexes.get(index_name)
+            if index is None:
+                entries = (
+                    self._properties(key) for key in self.labels.get(label, ())
+                    if self._properties(key).get('embedding')
+                )
+                index = self._vector_indexes[index_name] = LocalVectorIndex.build(entries)
+            return index
+
+    def vector_search(self, index_name: str, embedding: List[float], top_k: int) -> List[Dict]:
+        index = self._vector_index(index_name)
+        if index is None:
+            raise ValueError(f"Unknown vector index: {index_name}")
+        return index.search(embedding, top_k=top_k)
+
+    def chunk_search(
+        self,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        node_type: Optional[str] = None
+    ) -> List[Dict]:
+        parents = {}
+        for hit in self.vector_search('chunk_embedding_index', embedding, candidates):
+            for rel_type, parent, _ in self.in_edges.get(hit['id'], ()):
+                if rel_type != 'HAS_CHUNK':
+                    continue
+                properties = self._properties(parent)
+                if node_type and properties.get('type') != node_type.lower():
+                    continue
+                chunk = self._properties(hit['id'])
+                entry = parents.get(parent)
+                if entry is None:
+                    entry = parents[parent] = dict(
+                        {field: properties.get(field) for field in RECORD_FIELDS}, score=hit['score'], chunks=[]
+                    )
+                entry['chunks'].append({
+                    'id': hit['id'], 'heading': chunk.get('heading'), 'text': chunk.get('text'), 'score': hit['score']
+                })
+
+        for entry in parents.values():
+            del entry['chunks'][CHUNKS_PER_HIT:]
+        return heapq.nlargest(top_k, parents.values(), key=lambda entry: entry['score'])
+
+    def filtered_vector_search(
+        self,
+        index_name: str,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        department: Optional[str] = None,
+        complexity: Optional[str] = None,
+        framework: Optional[str] = None
+    ) -> Tuple[int, List[Dict]]:
+        hits = self.vector_search(index_name, embedding, candidates)
+        matches = []
+        for hit in hits:
+            properties = self._properties(hit['id'])
+            if department is not None and properties.get('department') != department:
+                continue
+            if complexity is not None and properties.get('complexity') != complexity:
+                continue
+            if framework is not None and not self.has_compliance(hit['id'], framework):
+                continue
+            matches.append({
+                'id': hit['id'],
+                'type': properties.get('type'),
+                'title': properties.get('title'),
+                'content': properties.get('content'),
+                'department': properties.get('department'),
+                'complexity': properties.get('complexity'),
+                'score': hit['score']
+            })
+            if len(matches) >= top_k:
+                break
+        return len(hits), matches
+
+    def _bfs(
+        self,
+        start: str,
+        max_depth: int,
+        rel_types: Optional[Iterable[str]],
+        direction: str
+    ) -> List[Tuple[str, int, str]]:
+        """
+        (key, depth, first edge type) of nodes reached from `start`, nearest
+        first, each once. HAS_CHUNK edges are never followed.
+        """
+
+        rel_types = set(rel_types) if rel_types else None
+        depth = {start: 0}
+        via = {}
+        reached = []
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            next_depth = depth[current] + 1
+            if next_depth > max_depth:
+                continue
+            neighbors = []
+            if direction in ('out', 'both'):
+                neighbors.extend((rel_type, target) for rel_type, target, _ in self.out_edges.get(current, {}))
+            if direction in ('in', 'both'):
+                neighbors.extend((rel_type, source) for rel_type, source, _ in self.in_edges.get(current, ()))
+            for rel_type, neighbor in neighbors:
+                if rel_type == 'HAS_CHUNK' or (rel_types is not None and rel_type not in rel_types):
+                    continue
+                if neighbor not in depth:
+                    depth[neighbor] = next_depth
+                    via[neighbor] = via.get(current, rel_type)
+                    reached.append((neighbor, next_depth, via[neighbor]))
+                    queue.append(neighbor)
+        return reached
+
+    def expand(
+        self,
+        node_ids: List[str],
+        hops: int,
+        rel_types: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        expansions = {}
+        for node_id in node_ids:
+            reached = self._bfs(node_id, hops, rel_types, 'both') if self._has_label(node_id, COMPONENT_LABEL) else []
+            # Department and Concept nodes link components but are not returned
+            reached = [entry for entry in reached if self._has_label(entry[0], COMPONENT_LABEL)]
+            reached.sort(key=lambda entry: (entry[1], self._properties(entry[0]).get('id')))
+            if limit is not None:
+                reached = reached[:limit]
+            expansions[node_id] = [
+                {
+                    'startId': node_id,
+                    'neighborId': self._properties(key).get('id'),
+                    'neighborType': self._properties(key).get('type'),
+                    'neighborTitle': self._properties(key).get('title'),
+                    'relationshipType': rel_type,
+                    'distance': depth
+                }
+                for key, depth, rel_type in reached
+            ]
+        return expansions
+
+    def _tree(self, node_id: str, rel_type: str, direction: str) -> List[Dict]:
+        if not self._has_label(node_id, COMPONENT_LABEL):
+            return []
+        return [
+            {
+                'id': self._properties(key).get('id'),
+                'type': self._properties(key).get('type'),
+                'title': self._properties(key).get('title'),
+                'depth': depth
+            }
+            for key, depth, _ in self._bfs(node_id, 3, [rel_type], direction)
+        ]
+
+    def dependencies(self, node_id: str) -> List[Dict]:
+        return self._tree(node_id, 'DEPENDS_ON', 'out')
+
+    def usage(self, node_id: str) -> List[Dict]:
+        return self._tree(node_id, 'COMPOSED_OF', 'in')
+
+    def has_compliance(self, node_id: str, framework: str) -> bool:
+        if not self._has_label(node_id, COMPONENT_LABEL):
+            return False
+        edge_key = ('COMPLIES_WITH', f"ComplianceFramework:{framework}", ())
+        return edge_key in self.out_edges.get(node_id, {})
+
+    def _property_index(self, label: str, name: str) -> Dict:
+        """{value: keys} for one property of one label, built on first use."""
+
+        with self._lock:
+            index = self._property_indexes.get((label, name))
+            if index is None:
+                index = {}
+                for key in self.labels.get(label, ()):
+                    value = self._properties(key).get(name)
+                    index.setdefault(tuple(value) if isinstance(value, list) else value, set()).add(key)
+                self._property_indexes[(label, name)] = index
+            return index
+
+    def find_nodes(self, label: str = COMPONENT_LABEL, limit: int = 100, **filters) -> List[Dict]:
+        keys = set(self.labels.get(label, ()))
+        for name, value in filters.items():
+            keys &= self._property_index(label, name).get(tuple(value) if isinstance(value, list) else value, set())
+            if not keys:
+                break
+
+        nodes = []
+        for key in sorted(keys)[:limit]:
+            node = dict(self._properties(key))
+            node.pop('embedding', None)
+            nodes.append(node)
+        return nodes
+
+    def embedding_records(self) -> Iterable[Dict]:
+        return [
+            self._properties(key) for key in self.labels.get(COMPONENT_LABEL, ())
+            if self._properties(key).get('embedding')
+        ]
+
+    # -- persistence --------------------------------------------------------------
+
+    def save(self, path: Optional[Path] = None):
+        """Write the graph to `path` (default: the store's path) as JSON, atomically."""
+
+        path = Path(path) if path else self.path
+        if path is None:
+            raise ValueError("No path to save the graph store to")
+
+        with self._lock:
+            data = {
+                'version': STORE_FORMAT_VERSION,
+                'graphVersion': self.version,
+                'nodes': [
+                    {'key': key, 'labels': sorted(node['labels']), 'properties': node['properties']}
+                    for key, node in self.nodes.items()
+                ],
+                'edges': [
+                    [source, rel_type, target, properties]
+                    for source, edges in self.out_edges.items()
+                    for (rel_type, target, _), properties in edges.items()
+                ]
+            }
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # Dates from frontmatter are stored as ISO strings
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, path)
+        self.modified = False
+
+    def _load(self, path: Path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph store format in {path}: {data.get('version')}")
+
+        for node in data['nodes']:
+            self._merge_node(node['key'], node['labels'], node['properties'])
+        for source, rel_type, target, properties in data['edges']:
+            self._merge_edge(source, rel_type, target, properties)
+        self.version = data.get('graphVersion')
+        self.modified = False
+
+    def close(self):
+        if self.path is not None and self.modified:
+            self.save()
+
+
+class AsyncGraphStore(ABC):
+    """Async counterparts of the GraphStore read operations used by AsyncGraphRAGQuery."""
+
+    @abstractmethod
+    async def graph_version(self) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    async def vector_search(self, index_name: str, embedding: List[float], top_k: int) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    async def vector_search_many(
+        self,
+        index_name: str,
+        embeddings: List[List[float]],
+        top_k: int
+    ) -> List[List[Dict]]:
+        ...
+
+    @abstractmethod
+    async def chunk_search(
+        self,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        node_type: Optional[str] = None
+    ) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    async def filtered_vector_search(
+        self,
+        index_name: str,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        department: Optional[str] = None,
+        complexity: Optional[str] = None,
+        framework: Optional[str] = None
+    ) -> Tuple[int, List[Dict]]:
+        ...
+
+    @abstractmethod
+    async def expand(
+        self,
+        node_ids: List[str],
+        hops: int,
+        rel_types: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        ...
+
+    @abstractmethod
+    async def dependencies(self, node_id: str) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    async def usage(self, node_id: str) -> List[Dict]:
+        ...
+
+    async def close(self):
+        pass
+
+
+class AsyncNeo4jGraphStore(AsyncGraphStore):
+    """AsyncGraphStore over a Neo4j async driver (one shared connection pool)."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def _run(self, cypher: str, **params) -> List[Dict]:
+        """Run one query in its own session and return its records as dicts."""
+
+        async with self.driver.session() as session:
+            result = await session.run(cypher, **params)
+            return await result.data()
+
+    async def graph_version(self) -> Optional[int]:
+        records = await self._run(GRAPH_VERSION_CYPHER)
+        return records[0]['version'] if records else None
+
+    async def vector_search(self, index_name: str, embedding: List[float], top_k: int) -> List[Dict]:
+        return await self._run(VECTOR_SEARCH_CYPHER, indexName=index_name, topK=top_k, embedding=embedding)
+
+    async def vector_search_many(
+        self,
+        index_name: str,
+        embeddings: List[List[float]],
+        top_k: int
+    ) -> List[List[Dict]]:
+        per_query = [[] for _ in embeddings]
+        records = await self._run(VECTOR_SEARCH_MANY_CYPHER, indexName=index_name, topK=top_k, embeddings=embeddings)
+        for record in records:
+            per_query[record.pop('queryIndex')].append(record)
+        return per_query
+
+    async def chunk_search(
+        self,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        node_type: Optional[str] = None
+    ) -> List[Dict]:
+        return await self._run(
+            CHUNK_VECTOR_SEARCH_CYPHER, candidates=candidates, topK=top_k, nodeType=node_type, embedding=embedding
+        )
+
+    async def filtered_vector_search(
+        self,
+        index_name: str,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        department: Optional[str] = None,
+        complexity: Optional[str] = None,
+        framework: Optional[str] = None
+    ) -> Tuple[int, List[Dict]]:
+        rows = await self._run(
+            ONTOLOGY_SEARCH_CYPHER,
+            indexName=index_name,
+            candidates=candidates,
+            topK=top_k,
+            embedding=embedding,
+            department=department,
+            complexity=complexity,
+            framework=framework
+        )
+        return (rows[0]['candidateCount'], rows[0]['matches']) if rows else (0, [])
+
+    async def expand(
+        self,
+        node_ids: List[str],
+        hops: int,
+        rel_types: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        expansions = {node_id: [] for node_id in node_ids}
+        if not node_ids or hops < 1:
+            return expansions
+
+        cypher = expansion_cypher(hops, rel_types, limited=limit is not None)
+        for record in await self._run(cypher, nodeIds=node_ids, limit=limit):
+            expansions[record['startId']].append(record)
+        return expansions
+
+    async def dependencies(self, node_id: str) -> List[Dict]:
+        return [
+            {'id': r['depId'], 'type': r['depType'], 'title': r['depTitle'], 'depth': r['depth']}
+            for r in await self._run(COMPONENT_DEPENDENCIES_CYPHER, id=node_id)
+        ]
+
+    async def usage(self, node_id: str) -> List[Dict]:
+        return [
+            {'id': r['parentId'], 'type': r['parentType'], 'title': r['parentTitle'], 'depth': r['depth']}
+            for r in await self._run(COMPONENT_USAGE_CYPHER, id=node_id)
+        ]
+
+    async def close(self):
+        await self.driver.close()
+
+
+class ThreadedGraphStore(AsyncGraphStore):
+    """AsyncGraphStore that runs a (thread-safe) GraphStore's calls on worker threads."""
+
+    def __init__(self, store: GraphStore):
+        self.store = store
+
+    async def graph_version(self) -> Optional[int]:
+        return await asyncio.to_thread(self.store.graph_version)
+
+    async def vector_search(self, index_name: str, embedding: List[float], top_k: int) -> List[Dict]:
+        return await asyncio.to_thread(self.store.vector_search, index_name, embedding, top_k)
+
+    async def vector_search_many(
+        self,
+        index_name: str,
+        embeddings: List[List[float]],
+        top_k: int
+    ) -> List[List[Dict]]:
+        return await asyncio.to_thread(self.store.vector_search_many, index_name, embeddings, top_k)
+
+    async def chunk_search(
+        self,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        node_type: Optional[str] = None
+    ) -> List[Dict]:
+        return await asyncio.to_thread(self.store.chunk_search, embedding, candidates, top_k, node_type)
+
+    async def filtered_vector_search(
+        self,
+        index_name: str,
+        embedding: List[float],
+        candidates: int,
+        top_k: int,
+        department: Optional[str] = None,
+        complexity: Optional[str] = None,
+        framework: Optional[str] = None
+    ) -> Tuple[int, List[Dict]]:
+        return await asyncio.to_thread(
+            self.store.filtered_vector_search, index_name, embedding, candidates, top_k,
+            department, complexity, framework
+        )
+
+    async def expand(
+        self,
+        node_ids: List[str],
+        hops: int,
+        rel_types: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        return await asyncio.to_thread(self.store.expand, node_ids, hops, rel_types, limit)
+
+    async def dependencies(self, node_id: str) -> List[Dict]:
+        return await asyncio.to_thread(self.store.dependencies, node_id)
+
+    async def usage(self, node_id: str) -> List[Dict]:
+        return await asyncio.to_thread(self.store.usage, node_id)
+
+    async def close(self):
+        await asyncio.to_thread(self.store.close)
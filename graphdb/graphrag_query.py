@@ -9,26 +9,83 @@ Requirements:
     pip install neo4j openai langchain langchain-openai
 
 Environment Variables:
-    OPENAI_API_KEY: Your OpenAI API key
+    OPENAI_API_KEY: Your OpenAI API key (not needed with a local embedding provider)
     NEO4J_URI: Neo4j connection URI (default: bolt://localhost:7687)
     NEO4J_USER: Neo4j username (default: neo4j)
     NEO4J_PASSWORD: Neo4j password
 """
 
 import os
+import copy
 import json
+import time
+import heapq
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
 
 try:
     from neo4j import GraphDatabase
-    from openai import OpenAI
 except ImportError as e:
     print(f"Missing required dependencies: {e}")
     print("Install with: pip install neo4j openai")
     exit(1)
 
+try:
+    from .cypher_profile import CypherProfiler, ProfilingDriver
+    from .embeddings import (
+        EMBEDDING_PROVIDERS, EmbeddingProvider, OpenAIEmbeddingProvider, get_embedding_provider,
+        pack_embedding_batches
+    )
+    from .graph_store import GraphStore, InMemoryGraphStore, Neo4jGraphStore
+    from .query_cache import TTLCache, normalize_query
+    from .vector_index import LocalVectorIndex
+except ImportError:
+    from cypher_profile import CypherProfiler, ProfilingDriver
+    from embeddings import (
+        EMBEDDING_PROVIDERS, EmbeddingProvider, OpenAIEmbeddingProvider, get_embedding_provider,
+        pack_embedding_batches
+    )
+    from graph_store import GraphStore, InMemoryGraphStore, Neo4jGraphStore
+    from query_cache import TTLCache, normalize_query
+    from vector_index import LocalVectorIndex
+
+
+# Vector indexes searched when no node type is given
+COMPONENT_VECTOR_INDEXES = [
+    'atom_embedding_index',
+    'molecule_embedding_index',
+    'organism_embedding_index',
+    'sop_embedding_index'
+]
+
+# Query embedding cache defaults (entries, seconds)
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_TTL = 3600
+
+# Assembled hybrid_search results kept per graph version
+RESULT_CACHE_SIZE = 256
+
+# Seconds a fetched graph version stamp is trusted before it is read again.
+# The default 0 reads it on every search, so results are never stale after an
+# ingest; a positive value trades that guarantee for one less round trip.
+GRAPH_VERSION_TTL = 0.0
+
+# Ontology-constrained search: initial candidates per wanted result, growth
+# factor while too few candidates pass the filters, and the candidate cap
+ONTOLOGY_CANDIDATE_FACTOR = 2
+ONTOLOGY_WIDEN_FACTOR = 4
+ONTOLOGY_MAX_CANDIDATES = 1024
+
+# Neighbors returned per expanded node, nearest first
+GRAPH_EXPANSION_LIMIT = 20
+
+# Chunk-level search fetches several chunks per wanted parent, since many
+# hits may collapse into the same component.
+CHUNK_CANDIDATE_FACTOR = 5
+
 
 @dataclass
 class GraphRAGResult:
@@ -43,198 +100,192 @@ class GraphRAGResult:
     metadata: Dict
 
 
-class GraphRAGQuery:
-    """GraphRAG query interface with hybrid search capabilities."""
+def copy_results(results: List[GraphRAGResult]) -> List[GraphRAGResult]:
+    """Deep copy of a result list, so callers cannot mutate cached results."""
+    return copy.deepcopy(results)
+
+
+def merge_top_hits(per_index: List[List[List[Dict]]], query_count: int, top_k: int) -> List[List[Dict]]:
+    """Merge per-index hit lists ([index][query] -> hits) into the top_k hits of each query."""
+
+    merged = [[] for _ in range(query_count)]
+    for per_query in per_index:
+        for query_index, hits in enumerate(per_query):
+            merged[query_index].extend(hits)
+    return [heapq.nlargest(top_k, hits, key=lambda x: x['score']) for hits in merged]
+
+
+def widen_ontology_candidates(candidate_count: int, matches: int, candidates: int, top_k: int) -> Optional[int]:
+    """Next candidate pool size for ontology_constrained_search, or None once it is done."""
+
+    exhausted = candidate_count < candidates
+    if matches >= top_k or exhausted or candidates >= ONTOLOGY_MAX_CANDIDATES:
+        return None
+    return min(candidates * ONTOLOGY_WIDEN_FACTOR, ONTOLOGY_MAX_CANDIDATES)
+
+
+class GraphRAGQueryBase:
+    """
+    Caching, query planning and result assembly shared by GraphRAGQuery and
+    AsyncGraphRAGQuery. Subclasses only perform the (sync or awaited) I/O.
+    """
 
     def __init__(
         self,
-        neo4j_uri: str = None,
-        neo4j_user: str = None,
-        neo4j_password: str = None,
-        openai_api_key: str = None,
-        embedding_model: str = "text-embedding-ada-002"
+        embedding_model: str,
+        embedding_provider: Optional[EmbeddingProvider],
+        openai_api_key: Optional[str],
+        vector_index: Optional[LocalVectorIndex],
+        query_cache_size: int,
+        query_cache_ttl: Optional[float],
+        result_cache_size: int,
+        result_cache_ttl: Optional[float],
+        graph_version_ttl: float
     ):
-        """Initialize GraphRAG query interface."""
+        # Embedding provider (raises ValueError without an OpenAI API key)
+        self.embedding_provider = embedding_provider or OpenAIEmbeddingProvider(
+            embedding_model, api_key=openai_api_key
+        )
+        self.embedding_model = self.embedding_provider.model
 
-        # Neo4j connection
-        self.neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
-        self.neo4j_user = neo4j_user or os.getenv("NEO4J_USER", "neo4j")
-        self.neo4j_password = neo4j_password or os.getenv("NEO4J_PASSWORD")
+        # Optional in-process vector index (see vector_index.py)
+        self.vector_index = vector_index
 
-        if not self.neo4j_password:
-            raise ValueError("Neo4j password required via NEO4J_PASSWORD env var")
+        # Query embeddings keyed by (model, normalized query)
+        self.query_embedding_cache = TTLCache(query_cache_size, query_cache_ttl)
 
-        self.driver = GraphDatabase.driver(
-            self.neo4j_uri,
-            auth=(self.neo4j_user, self.neo4j_password)
-        )
+        # hybrid_search results keyed by search parameters and graph version
+        self.result_cache = TTLCache(result_cache_size, result_cache_ttl)
+        self.graph_version_ttl = graph_version_ttl
+        self._graph_version = None
+        self._graph_version_read_at = None
 
-        # OpenAI client
-        self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-        if not self.openai_api_key:
-            raise ValueError("OpenAI API key required via OPENAI_API_KEY env var")
+    def cache_stats(self) -> Dict[str, Dict]:
+        """Hit/miss statistics for the query caches."""
+        return {
+            'query_embeddings': self.query_embedding_cache.stats(),
+            'results': self.result_cache.stats()
+        }
 
-        self.openai_client = OpenAI(api_key=self.openai_api_key)
-        self.embedding_model = embedding_model
+    # -- graph version ----------------------------------------------------------
 
-    def close(self):
-        """Close Neo4j connection."""
-        self.driver.close()
+    def _cached_graph_version_valid(self, refresh: bool) -> bool:
+        """True if the last version stamp read is younger than graph_version_ttl."""
+        return not refresh and self._graph_version_read_at is not None \
+            and time.monotonic() - self._graph_version_read_at < self.graph_version_ttl
 
-    def generate_query_embedding(self, query: str) -> List[float]:
-        """Generate embedding for user query."""
+    def _record_graph_version(self, version: Optional[int]) -> Optional[int]:
+        """Remember a freshly read version stamp, clearing the result cache if it changed."""
 
-        response = self.openai_client.embeddings.create(
-            model=self.embedding_model,
-            input=query
-        )
+        self._graph_version_read_at = time.monotonic()
+        if version != self._graph_version:
+            self.result_cache.clear()
+            self._graph_version = version
+        return version
 
-        return response.data[0].embedding
+    # -- query embeddings -------------------------------------------------------
 
-    def vector_search(
-        self,
-        query_embedding: List[float],
-        top_k: int = 5,
-        node_type: Optional[str] = None,
-        filters: Optional[Dict] = None
-    ) -> List[Dict]:
-        """Perform vector similarity search across all indexed nodes."""
+    def _plan_query_embeddings(self, queries: List[str]) -> Tuple[List, List, List, List[str], List[List[int]]]:
+        """
+        (keys, cached embeddings or None, missed keys, texts to embed, request
+        batches as indexes into texts), with one input per distinct missed query.
+        """
 
-        # Determine which indexes to search
-        index_names = []
-        if node_type:
-            index_names.append(f"{node_type.lower()}_embedding_index")
-        else:
-            # Search all component types
-            index_names = [
-                'atom_embedding_index',
-                'molecule_embedding_index',
-                'organism_embedding_index',
-                'sop_embedding_index'
-            ]
+        keys = [(self.embedding_model, normalize_query(query)) for query in queries]
+        embeddings = [self.query_embedding_cache.get(key) for key in keys]
 
-        results = []
-
-        with self.driver.session() as session:
-            for index_name in index_names:
-                try:
-                    # Vector search query
-                    cypher = """
-                        CALL db.index.vector.queryNodes($indexName, $topK, $embedding)
-                        YIELD node, score
-                        RETURN
-                            node.id as id,
-                            node.type as type,
-                            node.title as title,
-                            node.content as content,
-                            node.department as department,
-                            node.tags as tags,
-                            score
-                        ORDER BY score DESC
-                    """
-
-                    result = session.run(
-                        cypher,
-                        indexName=index_name,
-                        topK=top_k,
-                        embedding=query_embedding
-                    )
-
-                    for record in result:
-                        results.append({
-                            'id': record['id'],
-                            'type': record['type'],
-                            'title': record['title'],
-                            'content': record['content'],
-                            'department': record['department'],
-                            'tags': record['tags'],
-                            'score': record['score']
-                        })
-
-                except Exception as e:
-                    print(f"Warning: Vector search failed for {index_name}: {e}")
-
-        # Sort all results by score and return top_k
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:top_k]
+        missing = {}
+        for query, key, embedding in zip(queries, keys, embeddings):
+            if embedding is None and key not in missing:
+                missing[key] = query.strip()
 
-    def graph_expansion(
-        self,
-        node_id: str,
-        hops: int = 2,
-        relationship_types: Optional[List[str]] = None
-    ) -> List[Dict]:
-        """Expand graph context from a starting node."""
+        miss_keys = list(missing)
+        texts = list(missing.values())
+        provider = self.embedding_provider
+        batches = pack_embedding_batches(texts, provider.max_inputs, provider.max_tokens) if texts else []
+        return keys, embeddings, miss_keys, texts, batches
 
-        rel_filter = ""
-        if relationship_types:
-            rel_types = '|'.join(relationship_types)
-            rel_filter = f":{rel_types}"
-
-        with self.driver.session() as session:
-            result = session.run(f"""
-                MATCH path = (start {{id: $nodeId}})-[r{rel_filter}*1..{hops}]-(neighbor)
-                RETURN
-                    start.id as startId,
-                    neighbor.id as neighborId,
-                    neighbor.type as neighborType,
-                    neighbor.title as neighborTitle,
-                    type(r[0]) as relationshipType,
-                    length(path) as distance,
-                    path
-                ORDER BY distance
-                LIMIT 20
-            """, nodeId=node_id)
-
-            context = []
-            for record in result:
-                context.append({
-                    'startId': record['startId'],
-                    'neighborId': record['neighborId'],
-                    'neighborType': record['neighborType'],
-                    'neighborTitle': record['neighborTitle'],
-                    'relationshipType': record['relationshipType'],
-                    'distance': record['distance']
-                })
-
-            return context
+    def _merge_query_embeddings(
+        self,
+        keys: List,
+        embeddings: List,
+        miss_keys: List,
+        batches: List[List[int]],
+        responses: List[List[List[float]]]
+    ) -> List[List[float]]:
+        """Cache the vectors returned for each batch and fill them into `embeddings`."""
+
+        fresh = {}
+        for batch, vectors in zip(batches, responses):
+            for i, vector in zip(batch, vectors):
+                fresh[miss_keys[i]] = vector
+                self.query_embedding_cache.put(miss_keys[i], vector)
+
+        return [embedding if embedding is not None else fresh[key] for key, embedding in zip(keys, embeddings)]
+
+    # -- hybrid search ----------------------------------------------------------
+
+    @staticmethod
+    def _index_names(node_type: Optional[str]) -> List[str]:
+        """Vector indexes searched for a node type (all component indexes if None)."""
+        if node_type:
+            return [f"{node_type.lower()}_embedding_index"]
+        return COMPONENT_VECTOR_INDEXES
 
-    def hybrid_search(
+    def _plan_hybrid_search(
         self,
-        query: str,
-        top_k: int = 5,
-        expand_hops: int = 2,
-        node_type: Optional[str] = None
-    ) -> List[GraphRAGResult]:
+        queries: List[str],
+        params: Tuple,
+        version: Optional[int]
+    ) -> Tuple[List, Dict, Dict]:
         """
-        Perform hybrid search combining vector similarity and graph traversal.
-
-        This is the core GraphRAG algorithm:
-        1. Generate query embedding
-        2. Vector search to find similar nodes
-        3. Graph expansion to find related context
-        4. Rank and assemble results
+        (result cache key per query, {key: cached results}, {key: query} of the
+        distinct queries that still have to run).
         """
 
-        # Step 1: Generate query embedding
-        query_embedding = self.generate_query_embedding(query)
-
-        # Step 2: Vector similarity search
-        vector_results = self.vector_search(
-            query_embedding,
-            top_k=top_k,
-            node_type=node_type
-        )
+        keys = [(normalize_query(query),) + params + (version,) for query in queries]
+        found = {}
+        for key in keys:
+            if key not in found:
+                cached = self.result_cache.get(key)
+                if cached is not None:
+                    found[key] = cached
+
+        pending = {}
+        for query, key in zip(queries, keys):
+            if key not in found and key not in pending:
+                pending[key] = query
+        return keys, found, pending
+
+    def _finish_hybrid_search(
+        self,
+        keys: List,
+        found: Dict,
+        pending: Dict,
+        all_vector_results: List[List[Dict]],
+        expansions: Dict[str, List[Dict]]
+    ) -> List[List[GraphRAGResult]]:
+        """Assemble and cache the results of the pending queries; return copies for every query."""
+
+        for (key, query), vector_results in zip(pending.items(), all_vector_results):
+            results = self._assemble_results(query, vector_results, expansions)
+            self.result_cache.put(key, results)
+            found[key] = results
+
+        return [copy_results(found[key]) for key in keys]
+
+    def _assemble_results(
+        self,
+        query: str,
+        vector_results: List[Dict],
+        expansions: Dict[str, List[Dict]]
+    ) -> List[GraphRAGResult]:
+        """Combine vector hits with their graph context into GraphRAG results."""
 
-        # Step 3: Graph expansion from top results
         hybrid_results = []
 
         for vec_result in vector_results:
-            # Get graph context around this node
-            graph_context = self.graph_expansion(
-                vec_result['id'],
-                hops=expand_hops
-            )
+            graph_context = expansions[vec_result['id']]
 
             # Build reasoning path
             reasoning_path = self._build_reasoning_path(
@@ -255,7 +306,8 @@ class GraphRAGQuery:
                 metadata={
                     'department': vec_result.get('department'),
                     'tags': vec_result.get('tags'),
-                    'related_count': len(graph_context)
+                    'related_count': len(graph_context),
+                    'matched_chunks': vec_result.get('chunks')
                 }
             )
 
@@ -273,6 +325,10 @@ class GraphRAGQuery:
 
         path = f"Found '{node['title']}' (similarity: {node['score']:.3f})\n"
 
+        # Chunk-level hits: name the matching section
+        if node.get('chunks'):
+            path += f"Matched section: {node['chunks'][0]['heading'] or '(introduction)'}\n"
+
         # Add graph context
         if context:
             path += f"\nRelated components ({len(context)}):\n"
@@ -281,6 +337,362 @@ class GraphRAGQuery:
 
         return path
 
+    @staticmethod
+    def _ontology_results(
+        records: List[Dict],
+        expansions: Dict[str, List[Dict]],
+        department: Optional[str],
+        complexity: Optional[str]
+    ) -> List[GraphRAGResult]:
+        """GraphRAG results for the records that passed the ontology filters."""
+
+        return [
+            GraphRAGResult(
+                node_id=record['id'],
+                node_type=record['type'],
+                title=record['title'],
+                content=record['content'],
+                similarity_score=record['score'],
+                graph_context=expansions[record['id']],
+                reasoning_path=f"Constrained search: dept={department}, complexity={complexity}",
+                metadata={
+                    'department': record['department'],
+                    'complexity': record['complexity']
+                }
+            )
+            for record in records
+        ]
+
+    def format_for_llm(self, results: List[GraphRAGResult], query: str) -> str:
+        """Format GraphRAG results into LLM prompt context."""
+
+        context = f"# GraphRAG Context for Query: \"{query}\"\n\n"
+        context += f"Found {len(results)} relevant components:\n\n"
+
+        for i, result in enumerate(results, 1):
+            context += f"## {i}. {result.title} ({result.node_type})\n\n"
+            context += f"**Similarity Score**: {result.similarity_score:.3f}\n\n"
+            context += f"**Content**:\n{result.content[:500]}...\n\n"
+
+            if result.graph_context:
+                context += f"**Related Components**:\n"
+                for ctx in result.graph_context[:3]:
+                    context += f"- {ctx['neighborTitle']} (via {ctx['relationshipType']})\n"
+                context += "\n"
+
+            context += f"**Reasoning**: {result.reasoning_path}\n\n"
+            context += "---\n\n"
+
+        return context
+
+    @staticmethod
+    def _component_dependencies(component_id: str, dependencies: List[Dict]) -> Dict:
+        return {
+            'component_id': component_id,
+            'dependencies': dependencies,
+            'dependency_count': len(dependencies)
+        }
+
+    @staticmethod
+    def _component_usage(component_id: str, usage: List[Dict]) -> Dict:
+        return {
+            'component_id': component_id,
+            'used_in': usage,
+            'usage_count': len(usage)
+        }
+
+
+class GraphRAGQuery(GraphRAGQueryBase):
+    """GraphRAG query interface with hybrid search capabilities."""
+
+    def __init__(
+        self,
+        neo4j_uri: str = None,
+        neo4j_user: str = None,
+        neo4j_password: str = None,
+        openai_api_key: str = None,
+        embedding_model: str = "text-embedding-ada-002",
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        vector_index: Optional[LocalVectorIndex] = None,
+        query_cache_size: int = QUERY_CACHE_SIZE,
+        query_cache_ttl: Optional[float] = QUERY_CACHE_TTL,
+        result_cache_size: int = RESULT_CACHE_SIZE,
+        result_cache_ttl: Optional[float] = None,
+        graph_version_ttl: float = GRAPH_VERSION_TTL,
+        driver=None,
+        profiler: Optional[CypherProfiler] = None,
+        store: Optional[GraphStore] = None
+    ):
+        """
+        Initialize GraphRAG query interface.
+
+        Query embeddings come from `embedding_provider`; by default an OpenAI
+        provider is created, which requires an API key. The provider must
+        match the one used at ingestion time.
+
+        If `vector_index` is given, similarity search runs in-process against
+        it instead of the Neo4j vector indexes.
+
+        Query embeddings are cached (LRU, `query_cache_size` entries, each
+        kept for `query_cache_ttl` seconds) by model and normalized query.
+        hybrid_search results are cached per graph version stamp, which is
+        read before every search, so they are invalidated as soon as an
+        ingestion run changes the graph. A positive `graph_version_ttl`
+        reuses the stamp for that many seconds (possibly serving stale
+        results in between).
+
+        `driver` may be an existing Neo4j driver (or a stand-in with the
+        same interface), in which case no connection is opened here. With a
+        `profiler`, every statement runs with PROFILE and its plan is
+        aggregated there (see cypher_profile.py). A `store` (e.g.
+        graph_store.InMemoryGraphStore) replaces the Neo4j connection.
+        """
+
+        # Graph store: the given one, else Neo4j
+        self.profiler = profiler
+        if store is None:
+            if driver is None:
+                self.neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
+                self.neo4j_user = neo4j_user or os.getenv("NEO4J_USER", "neo4j")
+                self.neo4j_password = neo4j_password or os.getenv("NEO4J_PASSWORD")
+
+                if not self.neo4j_password:
+                    raise ValueError("Neo4j password required via NEO4J_PASSWORD env var")
+
+                driver = GraphDatabase.driver(
+                    self.neo4j_uri,
+                    auth=(self.neo4j_user, self.neo4j_password)
+                )
+            store = Neo4jGraphStore(ProfilingDriver(driver, profiler) if profiler else driver)
+        self.store = store
+        self.driver = getattr(store, 'driver', None)
+
+        super().__init__(
+            embedding_model, embedding_provider, openai_api_key, vector_index, query_cache_size,
+            query_cache_ttl, result_cache_size, result_cache_ttl, graph_version_ttl
+        )
+
+        # Threads for concurrent per-index vector queries (stores are thread-safe)
+        self._search_pool = ThreadPoolExecutor(
+            max_workers=len(COMPONENT_VECTOR_INDEXES),
+            thread_name_prefix='graphrag-search'
+        )
+
+    def close(self):
+        """Close the graph store and the search thread pool."""
+        self._search_pool.shutdown(wait=True)
+        self.store.close()
+
+    def generate_query_embedding(self, query: str) -> List[float]:
+        """Generate embedding for user query (served from the cache when possible)."""
+
+        return self.generate_query_embeddings([query])[0]
+
+    def generate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Embed several queries, sending all cache misses in as few requests as possible."""
+
+        keys, embeddings, miss_keys, texts, batches = self._plan_query_embeddings(queries)
+        responses = [self.embedding_provider.embed([texts[i] for i in batch]) for batch in batches]
+        return self._merge_query_embeddings(keys, embeddings, miss_keys, batches, responses)
+
+    def graph_version(self, refresh: bool = False) -> Optional[int]:
+        """
+        Current :GraphMeta version stamp; clears the result cache when it changes.
+
+        The stamp is read from the store at most every `graph_version_ttl`
+        seconds (always with `refresh`).
+        """
+
+        if self._cached_graph_version_valid(refresh):
+            return self._graph_version
+        return self._record_graph_version(self.store.graph_version())
+
+    def vector_search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        node_type: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        chunk_level: bool = False
+    ) -> List[Dict]:
+        """
+        Perform vector similarity search across all indexed nodes.
+
+        With `chunk_level`, searches the :Chunk index instead and collapses
+        hits to their parent components (scored by their best chunk).
+        Component-level searches use the local vector index when configured.
+        """
+
+        if chunk_level:
+            return self._chunk_vector_search(query_embedding, top_k, node_type)
+
+        if self.vector_index is not None:
+            return self.vector_index.search(query_embedding, top_k=top_k, node_type=node_type)
+
+        index_names = self._index_names(node_type)
+        if len(index_names) == 1:
+            results = self._query_vector_index(index_names[0], query_embedding, top_k)
+        else:
+            # Fan out: one session per index, queried concurrently, so latency
+            # is that of the slowest index rather than the sum of all of them
+            futures = [
+                self._search_pool.submit(self._query_vector_index, index_name, query_embedding, top_k)
+                for index_name in index_names
+            ]
+            results = [hit for future in futures for hit in future.result()]
+
+        # Merge per-index hits into the overall top_k
+        return heapq.nlargest(top_k, results, key=lambda x: x['score'])
+
+    def _query_vector_index(self, index_name: str, query_embedding: List[float], top_k: int) -> List[Dict]:
+        """Top-k query against a single vector index of the store."""
+
+        try:
+            return self.store.vector_search(index_name, query_embedding, top_k)
+        except Exception as e:
+            print(f"Warning: Vector search failed for {index_name}: {e}")
+            return []
+
+    def vector_search_many(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        node_type: Optional[str] = None,
+        chunk_level: bool = False
+    ) -> List[List[Dict]]:
+        """
+        Vector search for several query embeddings at once.
+
+        Neo4j component searches send all embeddings to each index in one
+        query (indexes queried concurrently); results are per query, in input
+        order, with the same shape as vector_search.
+        """
+
+        if chunk_level or self.vector_index is not None or len(query_embeddings) == 1:
+            return [
+                self.vector_search(embedding, top_k=top_k, node_type=node_type, chunk_level=chunk_level)
+                for embedding in query_embeddings
+            ]
+
+        if not query_embeddings:
+            return []
+
+        futures = [
+            self._search_pool.submit(self._query_vector_index_many, index_name, query_embeddings, top_k)
+            for index_name in self._index_names(node_type)
+        ]
+        return merge_top_hits([future.result() for future in futures], len(query_embeddings), top_k)
+
+    def _query_vector_index_many(
+        self,
+        index_name: str,
+        query_embeddings: List[List[float]],
+        top_k: int
+    ) -> List[List[Dict]]:
+        """Top-k query of one vector index for each embedding (one round trip on Neo4j)."""
+
+        try:
+            return self.store.vector_search_many(index_name, query_embeddings, top_k)
+        except Exception as e:
+            print(f"Warning: Vector search failed for {index_name}: {e}")
+            return [[] for _ in query_embeddings]
+
+    def _chunk_vector_search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        node_type: Optional[str] = None
+    ) -> List[Dict]:
+        """Search chunk embeddings and collapse the hits back to parent components."""
+
+        return self.store.chunk_search(query_embedding, top_k * CHUNK_CANDIDATE_FACTOR, top_k, node_type)
+
+    def graph_expansion(
+        self,
+        node_id: str,
+        hops: int = 2,
+        relationship_types: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """Expand graph context from a starting node."""
+
+        return self.batch_graph_expansion([node_id], hops, relationship_types)[node_id]
+
+    def batch_graph_expansion(
+        self,
+        node_ids: List[str],
+        hops: int = 2,
+        relationship_types: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Expand graph context from several starting nodes in one query.
+
+        Returns {node_id: context}, where each context has the same shape,
+        distance ordering and per-node limit as graph_expansion.
+        """
+
+        node_ids = list(dict.fromkeys(node_ids))
+        return self.store.expand(node_ids, hops, relationship_types, GRAPH_EXPANSION_LIMIT)
+
+    def hybrid_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        expand_hops: int = 2,
+        node_type: Optional[str] = None,
+        chunk_level: bool = False
+    ) -> List[GraphRAGResult]:
+        """
+        Perform hybrid search combining vector similarity and graph traversal.
+
+        This is the core GraphRAG algorithm:
+        1. Generate query embedding (cached for repeated queries)
+        2. Vector search to find similar nodes (optionally at chunk level)
+        3. Graph expansion to find related context
+        4. Rank and assemble results
+
+        Results are served from the result cache while the graph version
+        is unchanged.
+        """
+
+        return self.hybrid_search_many([query], top_k, expand_hops, node_type, chunk_level)[0]
+
+    def hybrid_search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        expand_hops: int = 2,
+        node_type: Optional[str] = None,
+        chunk_level: bool = False
+    ) -> List[List[GraphRAGResult]]:
+        """
+        Run hybrid_search for several queries, returning one result list per query.
+
+        Queries with cached results are answered from the result cache; for
+        the rest, uncached query embeddings are generated in one request, the
+        vector searches run together, and all hits are expanded in one query.
+        """
+
+        keys, found, pending = self._plan_hybrid_search(
+            queries, (top_k, expand_hops, node_type, chunk_level), self.graph_version()
+        )
+
+        # Run the pipeline once per distinct uncached query
+        all_vector_results, expansions = [], {}
+        if pending:
+            query_embeddings = self.generate_query_embeddings(list(pending.values()))
+            all_vector_results = self.vector_search_many(
+                query_embeddings,
+                top_k=top_k,
+                node_type=node_type,
+                chunk_level=chunk_level
+            )
+            expansions = self.batch_graph_expansion(
+                [vec_result['id'] for vector_results in all_vector_results for vec_result in vector_results],
+                hops=expand_hops
+            )
+
+        return self._finish_hybrid_search(keys, found, pending, all_vector_results, expansions)
+
     def ontology_constrained_search(
         self,
         query: str,
@@ -293,208 +705,139 @@ class GraphRAGQuery:
         Perform ontology-constrained GraphRAG search.
 
         Applies ontology rules to filter and rank results based on
-        domain-specific constraints.
+        domain-specific constraints. Only the nodes that pass are expanded.
         """
 
         # Generate query embedding
         query_embedding = self.generate_query_embedding(query)
 
-        # Build constraint filters
-        constraints = []
-        if department:
-            constraints.append(f"node.department = '{department}'")
-        if complexity:
-            constraints.append(f"node.complexity = '{complexity}'")
-
-        # Vector search with constraints
-        with self.driver.session() as session:
-            # Build WHERE clause
-            where_clause = " AND ".join(constraints) if constraints else "true"
-
-            cypher = f"""
-                CALL db.index.vector.queryNodes('atom_embedding_index', {top_k * 2}, $embedding)
-                YIELD node, score
-                WHERE {where_clause}
-                RETURN
-                    node.id as id,
-                    node.type as type,
-                    node.title as title,
-                    node.content as content,
-                    node.department as department,
-                    node.complexity as complexity,
-                    score
-                ORDER BY score DESC
-                LIMIT {top_k}
-            """
-
-            result = session.run(cypher, embedding=query_embedding)
-
-            results = []
-            for record in result:
-                # Get graph context
-                graph_context = self.graph_expansion(record['id'], hops=2)
-
-                # Filter by compliance if specified
-                if compliance_framework:
-                    if not self._has_compliance(record['id'], compliance_framework):
-                        continue
-
-                results.append(GraphRAGResult(
-                    node_id=record['id'],
-                    node_type=record['type'],
-                    title=record['title'],
-                    content=record['content'],
-                    similarity_score=record['score'],
-                    graph_context=graph_context,
-                    reasoning_path=f"Constrained search: dept={department}, complexity={complexity}",
-                    metadata={
-                        'department': record['department'],
-                        'complexity': record['complexity']
-                    }
-                ))
-
-            return results
+        # Vector search with all constraints evaluated in the store. Widen
+        # the candidate pool until top_k candidates pass the filters, the
+        # index is exhausted, or the cap is reached.
+        candidates = top_k * ONTOLOGY_CANDIDATE_FACTOR
+        while candidates is not None:
+            candidate_count, records = self.store.filtered_vector_search(
+                'atom_embedding_index',
+                query_embedding,
+                candidates,
+                top_k,
+                department=department,
+                complexity=complexity,
+                framework=compliance_framework
+            )
+            candidates = widen_ontology_candidates(candidate_count, len(records), candidates, top_k)
+
+        # Get graph context for the matching nodes in one round trip
+        expansions = self.batch_graph_expansion([r['id'] for r in records], hops=2)
+        return self._ontology_results(records, expansions, department, complexity)
 
     def _has_compliance(self, node_id: str, framework: str) -> bool:
         """Check if node complies with framework."""
 
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (n {id: $nodeId})-[:COMPLIES_WITH]->(cf:ComplianceFramework {name: $framework})
-                RETURN count(cf) > 0 as hasCompliance
-            """, nodeId=node_id, framework=framework)
-
-            record = result.single()
-            return record['hasCompliance'] if record else False
+        return self.store.has_compliance(node_id, framework)
 
     def get_component_dependencies(self, component_id: str) -> Dict:
         """Get full dependency tree for a component."""
 
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH path = (c {id: $id})-[:DEPENDS_ON*1..3]->(dep)
-                RETURN
-                    dep.id as depId,
-                    dep.type as depType,
-                    dep.title as depTitle,
-                    length(path) as depth
-                ORDER BY depth
-            """, id=component_id)
-
-            dependencies = []
-            for record in result:
-                dependencies.append({
-                    'id': record['depId'],
-                    'type': record['depType'],
-                    'title': record['depTitle'],
-                    'depth': record['depth']
-                })
-
-            return {
-                'component_id': component_id,
-                'dependencies': dependencies,
-                'dependency_count': len(dependencies)
-            }
+        return self._component_dependencies(component_id, self.store.dependencies(component_id))
 
     def get_component_usage(self, component_id: str) -> Dict:
         """Get all places where a component is used."""
 
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH path = (c {id: $id})<-[:COMPOSED_OF*1..3]-(parent)
-                RETURN
-                    parent.id as parentId,
-                    parent.type as parentType,
-                    parent.title as parentTitle,
-                    length(path) as depth
-                ORDER BY depth
-            """, id=component_id)
-
-            usage = []
-            for record in result:
-                usage.append({
-                    'id': record['parentId'],
-                    'type': record['parentType'],
-                    'title': record['parentTitle'],
-                    'depth': record['depth']
-                })
-
-            return {
-                'component_id': component_id,
-                'used_in': usage,
-                'usage_count': len(usage)
-            }
-
-    def format_for_llm(self, results: List[GraphRAGResult], query: str) -> str:
-        """Format GraphRAG results into LLM prompt context."""
-
-        context = f"# GraphRAG Context for Query: \"{query}\"\n\n"
-        context += f"Found {len(results)} relevant components:\n\n"
-
-        for i, result in enumerate(results, 1):
-            context += f"## {i}. {result.title} ({result.node_type})\n\n"
-            context += f"**Similarity Score**: {result.similarity_score:.3f}\n\n"
-            context += f"**Content**:\n{result.content[:500]}...\n\n"
-
-            if result.graph_context:
-                context += f"**Related Components**:\n"
-                for ctx in result.graph_context[:3]:
-                    context += f"- {ctx['neighborTitle']} (via {ctx['relationshipType']})\n"
-                context += "\n"
-
-            context += f"**Reasoning**: {result.reasoning_path}\n\n"
-            context += "---\n\n"
-
-        return context
+        return self._component_usage(component_id, self.store.usage(component_id))
 
 
 def main():
     """Demo usage of GraphRAG query interface."""
 
+    parser = argparse.ArgumentParser(description='GraphRAG query interface demo')
+    parser.add_argument('queries', nargs='*',
+                        help='Queries to run (default: built-in examples)')
+    parser.add_argument('--embedding-provider', choices=EMBEDDING_PROVIDERS, default='openai',
+                        help='Embedding backend; must match the one used for ingestion (default: openai)')
+    parser.add_argument('--embedding-model', default=None,
+                        help='Embedding model for the openai provider (default: text-embedding-ada-002)')
+    parser.add_argument('--embedding-dimension', type=int, default=None,
+                        help='Embedding vector size (default: 1536 for openai, 384 for local)')
+    parser.add_argument('--vector-index', type=Path, default=None,
+                        help='Directory of a local vector index (see vector_index.py) to use instead of '
+                             'Neo4j vector search')
+    parser.add_argument('--store-path', type=Path, default=None,
+                        help='Query an in-memory graph store saved by ingest_sops_to_graph.py --store memory '
+                             'instead of Neo4j')
+    parser.add_argument('--profile', action='store_true',
+                        help='Run every Cypher statement with PROFILE and rank them by db hits (Neo4j only)')
+    parser.add_argument('--profile-json', type=Path, default=None,
+                        help='Write the Cypher profile report to this JSON file (implies --profile)')
+    args = parser.parse_args()
+    if args.store_path and (args.profile or args.profile_json):
+        parser.error('--profile/--profile-json profile Cypher and cannot be used with --store-path')
+
     print("="*60)
     print("GraphRAG Query Interface Demo")
     print("="*60)
 
     try:
-        graphrag = GraphRAGQuery()
-    except ValueError as e:
+        embedding_provider = get_embedding_provider(
+            args.embedding_provider, model=args.embedding_model, dimension=args.embedding_dimension
+        )
+        vector_index = LocalVectorIndex.load(args.vector_index) if args.vector_index else None
+        store = InMemoryGraphStore.load(args.store_path) if args.store_path else None
+        profiler = CypherProfiler() if args.profile or args.profile_json else None
+        graphrag = GraphRAGQuery(
+            embedding_provider=embedding_provider, vector_index=vector_index, profiler=profiler, store=store
+        )
+    except (ValueError, FileNotFoundError) as e:
         print(f"\nERROR: {e}")
         print("\nSet environment variables:")
         print("  export NEO4J_PASSWORD='your-password'")
-        print("  export OPENAI_API_KEY='your-api-key'")
+        print("  export OPENAI_API_KEY='your-api-key'  (or use --embedding-provider local)")
         return 1
 
     # Example queries
-    queries = [
+    queries = args.queries or [
         "How do I reset a user's password?",
         "What are the onboarding procedures for new employees?",
         "How do we handle security compliance?",
         "Account provisioning and access control"
     ]
 
-    for query in queries:
+    try:
+        # Perform hybrid search for all queries together
+        all_results = graphrag.hybrid_search_many(queries, top_k=3, expand_hops=2)
+    except Exception as e:
+        print(f"Error: {e}")
+        all_results = []
+
+    for query, results in zip(queries, all_results):
         print(f"\n{'='*60}")
         print(f"Query: {query}")
         print(f"{'='*60}\n")
 
-        try:
-            # Perform hybrid search
-            results = graphrag.hybrid_search(query, top_k=3, expand_hops=2)
-
-            for i, result in enumerate(results, 1):
-                print(f"\n{i}. {result.title} ({result.node_type})")
-                print(f"   Similarity: {result.similarity_score:.3f}")
-                print(f"   Department: {result.metadata.get('department')}")
-                print(f"   Related: {result.metadata.get('related_count')} components")
-                print(f"\n   {result.content[:200]}...")
-
-                if result.graph_context:
-                    print(f"\n   Related components:")
-                    for ctx in result.graph_context[:2]:
-                        print(f"     - {ctx['neighborTitle']} (via {ctx['relationshipType']})")
+        for i, result in enumerate(results, 1):
+            print(f"\n{i}. {result.title} ({result.node_type})")
+            print(f"   Similarity: {result.similarity_score:.3f}")
+            print(f"   Department: {result.metadata.get('department')}")
+            print(f"   Related: {result.metadata.get('related_count')} components")
+            print(f"\n   {result.content[:200]}...")
 
-        except Exception as e:
-            print(f"Error: {e}")
+            if result.graph_context:
+                print(f"\n   Related components:")
+                for ctx in result.graph_context[:2]:
+                    print(f"     - {ctx['neighborTitle']} (via {ctx['relationshipType']})")
+
+    print()
+    for name, stats in graphrag.cache_stats().items():
+        print(f"Cache {name}: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.1%} hit rate, {stats['size']}/{stats['max_entries']} entries)")
+
+    if profiler is not None:
+        print("\nCypher profile (ranked by db hits):")
+        for line in profiler.format_report():
+            print(line)
+        if args.profile_json:
+            profiler.to_json(args.profile_json)
+            print(f"Cypher profile written to {args.profile_json}")
 
     graphrag.close()
     return 0
@@ -0,0 +1,309 @@
+"""
+Async GraphRAG Query Interface
+==============================
+asyncio variant of GraphRAGQuery for serving many concurrent queries from
+one process. It reads through an AsyncGraphStore (see graph_store.py): the
+Neo4j async driver (one shared connection pool) by default, or any GraphStore
+such as InMemoryGraphStore run on worker threads. Query embeddings use the
+provider's `aembed` (AsyncOpenAI for the OpenAI provider).
+
+Within a search, independent work runs concurrently: the per-type vector
+indexes are queried concurrently, and all hits are expanded in one batched
+call. Caching, query planning and result assembly live in GraphRAGQueryBase
+(shared with GraphRAGQuery); this class only awaits the I/O.
+
+Usage:
+    graphrag = AsyncGraphRAGQuery()
+    results = await graphrag.hybrid_search("How do I reset a password?")
+    await graphrag.close()
+"""
+
+import asyncio
+import heapq
+import os
+from typing import Dict, List, Optional
+
+try:
+    from neo4j import AsyncGraphDatabase
+except ImportError:
+    AsyncGraphDatabase = None
+
+try:
+    from .embeddings import EmbeddingProvider
+    from .graph_store import AsyncNeo4jGraphStore, GraphStore, ThreadedGraphStore
+    from .graphrag_query import (
+        CHUNK_CANDIDATE_FACTOR, GRAPH_EXPANSION_LIMIT, ONTOLOGY_CANDIDATE_FACTOR, QUERY_CACHE_SIZE,
+        QUERY_CACHE_TTL, RESULT_CACHE_SIZE, GRAPH_VERSION_TTL, GraphRAGQueryBase, GraphRAGResult,
+        merge_top_hits, widen_ontology_candidates
+    )
+    from .vector_index import LocalVectorIndex
+except ImportError:
+    from embeddings import EmbeddingProvider
+    from graph_store import AsyncNeo4jGraphStore, GraphStore, ThreadedGraphStore
+    from graphrag_query import (
+        CHUNK_CANDIDATE_FACTOR, GRAPH_EXPANSION_LIMIT, ONTOLOGY_CANDIDATE_FACTOR, QUERY_CACHE_SIZE,
+        QUERY_CACHE_TTL, RESULT_CACHE_SIZE, GRAPH_VERSION_TTL, GraphRAGQueryBase, GraphRAGResult,
+        merge_top_hits, widen_ontology_candidates
+    )
+    from vector_index import LocalVectorIndex
+
+# Neo4j driver connection pool size shared by all concurrent queries
+MAX_CONNECTION_POOL_SIZE = 100
+
+
+class AsyncGraphRAGQuery(GraphRAGQueryBase):
+    """Async GraphRAG query interface; method names and results match GraphRAGQuery."""
+
+    def __init__(
+        self,
+        neo4j_uri: str = None,
+        neo4j_user: str = None,
+        neo4j_password: str = None,
+        openai_api_key: str = None,
+        embedding_model: str = "text-embedding-ada-002",
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        vector_index: Optional[LocalVectorIndex] = None,
+        query_cache_size: int = QUERY_CACHE_SIZE,
+        query_cache_ttl: Optional[float] = QUERY_CACHE_TTL,
+        result_cache_size: int = RESULT_CACHE_SIZE,
+        result_cache_ttl: Optional[float] = None,
+        graph_version_ttl: float = GRAPH_VERSION_TTL,
+        max_connection_pool_size: int = MAX_CONNECTION_POOL_SIZE,
+        driver=None,
+        store=None
+    ):
+        """
+        Initialize the async query interface.
+
+        Arguments match GraphRAGQuery. `driver` may be an existing async
+        Neo4j driver (or a stand-in with the same interface), in which case
+        no connection is opened here. A `store` replaces the Neo4j
+        connection: an AsyncGraphStore, or a GraphStore (e.g.
+        InMemoryGraphStore), which is wrapped in a ThreadedGraphStore.
+        """
+
+        if isinstance(store, GraphStore):
+            store = ThreadedGraphStore(store)
+        if store is None and driver is None:
+            self.neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
+            self.neo4j_user = neo4j_user or os.getenv("NEO4J_USER", "neo4j")
+            self.neo4j_password = neo4j_password or os.getenv("NEO4J_PASSWORD")
+
+            if not self.neo4j_password:
+                raise ValueError("Neo4j password required via NEO4J_PASSWORD env var")
+            if AsyncGraphDatabase is None:
+                raise ImportError("AsyncGraphRAGQuery requires the neo4j driver: pip install neo4j")
+
+            driver = AsyncGraphDatabase.driver(
+                self.neo4j_uri,
+                auth=(self.neo4j_user, self.neo4j_password),
+                max_connection_pool_size=max_connection_pool_size
+            )
+        self.store = store or AsyncNeo4jGraphStore(driver)
+        self.driver = getattr(self.store, 'driver', None)
+
+        super().__init__(
+            embedding_model, embedding_provider, openai_api_key, vector_index, query_cache_size,
+            query_cache_ttl, result_cache_size, result_cache_ttl, graph_version_ttl
+        )
+
+    async def close(self):
+        """Close the graph store."""
+        await self.store.close()
+
+    async def generate_query_embedding(self, query: str) -> List[float]:
+        """Generate embedding for user query (served from the cache when possible)."""
+
+        return (await self.generate_query_embeddings([query]))[0]
+
+    async def generate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Embed several queries; cache misses are sent in concurrent batched requests."""
+
+        keys, embeddings, miss_keys, texts, batches = self._plan_query_embeddings(queries)
+        responses = await asyncio.gather(*(
+            self.embedding_provider.aembed([texts[i] for i in batch]) for batch in batches
+        ))
+        return self._merge_query_embeddings(keys, embeddings, miss_keys, batches, responses)
+
+    async def graph_version(self, refresh: bool = False) -> Optional[int]:
+        """Current :GraphMeta version stamp, re-read at most every `graph_version_ttl` seconds."""
+
+        if self._cached_graph_version_valid(refresh):
+            return self._graph_version
+        return self._record_graph_version(await self.store.graph_version())
+
+    async def vector_search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        node_type: Optional[str] = None,
+        chunk_level: bool = False
+    ) -> List[Dict]:
+        """Vector similarity search; the per-type indexes are queried concurrently."""
+
+        if chunk_level:
+            return await self._chunk_vector_search(query_embedding, top_k, node_type)
+
+        if self.vector_index is not None:
+            return self.vector_index.search(query_embedding, top_k=top_k, node_type=node_type)
+
+        per_index = await asyncio.gather(*(
+            self._query_vector_index(index_name, query_embedding, top_k)
+            for index_name in self._index_names(node_type)
+        ))
+        return heapq.nlargest(top_k, (hit for hits in per_index for hit in hits), key=lambda x: x['score'])
+
+    async def _query_vector_index(self, index_name: str, query_embedding: List[float], top_k: int) -> List[Dict]:
+        """Top-k query against a single vector index of the store."""
+
+        try:
+            return await self.store.vector_search(index_name, query_embedding, top_k)
+        except Exception as e:
+            print(f"Warning: Vector search failed for {index_name}: {e}")
+            return []
+
+    async def vector_search_many(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        node_type: Optional[str] = None,
+        chunk_level: bool = False
+    ) -> List[List[Dict]]:
+        """Vector search for several embeddings: one query per index, indexes in parallel."""
+
+        if chunk_level or self.vector_index is not None or len(query_embeddings) == 1:
+            return list(await asyncio.gather(*(
+                self.vector_search(embedding, top_k=top_k, node_type=node_type, chunk_level=chunk_level)
+                for embedding in query_embeddings
+            )))
+
+        if not query_embeddings:
+            return []
+
+        per_index = await asyncio.gather(*(
+            self._query_vector_index_many(index_name, query_embeddings, top_k)
+            for index_name in self._index_names(node_type)
+        ))
+        return merge_top_hits(per_index, len(query_embeddings), top_k)
+
+    async def _query_vector_index_many(
+        self,
+        index_name: str,
+        query_embeddings: List[List[float]],
+        top_k: int
+    ) -> List[List[Dict]]:
+        """Top-k hits of one index for each embedding, per embedding in input order."""
+
+        try:
+            return await self.store.vector_search_many(index_name, query_embeddings, top_k)
+        except Exception as e:
+            print(f"Warning: Vector search failed for {index_name}: {e}")
+            return [[] for _ in query_embeddings]
+
+    async def _chunk_vector_search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        node_type: Optional[str] = None
+    ) -> List[Dict]:
+        """Search chunk embeddings and collapse the hits back to parent components."""
+
+        return await self.store.chunk_search(query_embedding, top_k * CHUNK_CANDIDATE_FACTOR, top_k, node_type)
+
+    async def batch_graph_expansion(
+        self,
+        node_ids: List[str],
+        hops: int = 2,
+        relationship_types: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """Expand graph context from several starting nodes in one query."""
+
+        node_ids = list(dict.fromkeys(node_ids))
+        return await self.store.expand(node_ids, hops, relationship_types, GRAPH_EXPANSION_LIMIT)
+
+    async def graph_expansion(
+        self,
+        node_id: str,
+        hops: int = 2,
+        relationship_types: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """Expand graph context from a starting node."""
+
+        return (await self.batch_graph_expansion([node_id], hops, relationship_types))[node_id]
+
+    async def hybrid_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        expand_hops: int = 2,
+        node_type: Optional[str] = None,
+        chunk_level: bool = False
+    ) -> List[GraphRAGResult]:
+        """Hybrid vector + graph search (see GraphRAGQuery.hybrid_search)."""
+
+        return (await self.hybrid_search_many([query], top_k, expand_hops, node_type, chunk_level))[0]
+
+    async def hybrid_search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        expand_hops: int = 2,
+        node_type: Optional[str] = None,
+        chunk_level: bool = False
+    ) -> List[List[GraphRAGResult]]:
+        """Run hybrid_search for several queries, returning one result list per query."""
+
+        keys, found, pending = self._plan_hybrid_search(
+            queries, (top_k, expand_hops, node_type, chunk_level), await self.graph_version()
+        )
+
+        all_vector_results, expansions = [], {}
+        if pending:
+            query_embeddings = await self.generate_query_embeddings(list(pending.values()))
+            all_vector_results = await self.vector_search_many(
+                query_embeddings, top_k=top_k, node_type=node_type, chunk_level=chunk_level
+            )
+            expansions = await self.batch_graph_expansion(
+                [hit['id'] for hits in all_vector_results for hit in hits],
+                hops=expand_hops
+            )
+
+        return self._finish_hybrid_search(keys, found, pending, all_vector_results, expansions)
+
+    async def ontology_constrained_search(
+        self,
+        query: str,
+        department: Optional[str] = None,
+        compliance_framework: Optional[str] = None,
+        complexity: Optional[str] = None,
+        top_k: int = 5
+    ) -> List[GraphRAGResult]:
+        """Ontology-constrained search (see GraphRAGQuery.ontology_constrained_search)."""
+
+        query_embedding = await self.generate_query_embedding(query)
+
+        candidates = top_k * ONTOLOGY_CANDIDATE_FACTOR
+        while candidates is not None:
+            candidate_count, records = await self.store.filtered_vector_search(
+                'atom_embedding_index',
+                query_embedding,
+                candidates,
+                top_k,
+                department=department,
+                complexity=complexity,
+                framework=compliance_framework
+            )
+            candidates = widen_ontology_candidates(candidate_count, len(records), candidates, top_k)
+
+        expansions = await self.batch_graph_expansion([r['id'] for r in records], hops=2)
+        return self._ontology_results(records, expansions, department, complexity)
+
+    async def get_component_dependencies(self, component_id: str) -> Dict:
+        """Get full dependency tree for a component."""
+
+        return self._component_dependencies(component_id, await self.store.dependencies(component_id))
+
+    async def get_component_usage(self, component_id: str) -> Dict:
+        """Get all places where a component is used."""
+
+        return self._component_usage(component_id, await self.store.usage(component_id))
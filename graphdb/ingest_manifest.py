@@ -0,0 +1,105 @@
+"""
+Incremental Ingestion Manifest
+==============================
+Tracks which source files have been ingested (path, content hash, mtime,
+size, node id, linked component ids) so that re-runs only process new or
+changed files, can tombstone nodes whose source file was deleted, and can
+re-link unchanged parents to components that are re-created.
+
+Unchanged files are detected from `stat()` alone (mtime + size); the file is
+only hashed when those differ, and a touched-but-identical file is not
+treated as changed.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MANIFEST_VERSION = 1
+
+
+class IngestManifest:
+    """JSON manifest of ingested files keyed by path relative to the corpus root."""
+
+    def __init__(self, path: Path):
+        """Load the manifest at `path` (an empty manifest if it does not exist)."""
+
+        self.path = Path(path)
+        self.files: Dict[str, Dict] = {}
+        self._pending: Dict[str, Dict] = {}
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.files = data.get('files', {})
+                else:
+                    print(f"Warning: Ignoring manifest {self.path} with unsupported version")
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read manifest {self.path}, starting fresh: {e}")
+
+    def is_changed(self, file_path: Path, key: str) -> bool:
+        """Return True if `file_path` is new or its content changed since it was recorded."""
+
+        stat = file_path.stat()
+        entry = self.files.get(key)
+
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return False
+
+        with open(file_path, 'rb') as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+
+        if entry and entry['hash'] == content_hash:
+            # Touched but identical: refresh stat info so the next run skips hashing
+            entry['mtime_ns'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+            return False
+
+        self._pending[key] = {
+            'hash': content_hash,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size
+        }
+        return True
+
+    def record(
+        self,
+        key: str,
+        node_id: Optional[str] = None,
+        node_type: Optional[str] = None,
+        links: Optional[List[str]] = None
+    ):
+        """
+        Mark a file reported as changed by `is_changed` as successfully ingested.
+
+        `links` are the ids of the components the file points at, used to
+        re-link it when one of them is re-created.
+        """
+
+        entry = self._pending.pop(key)
+        entry['node_id'] = node_id
+        entry['type'] = node_type
+        if links is not None:
+            entry['links'] = links
+        self.files[key] = entry
+
+    def missing(self, seen_keys) -> List[str]:
+        """Keys recorded in the manifest whose files were not seen in this run."""
+        return [key for key in self.files if key not in seen_keys]
+
+    def forget(self, key: str) -> Optional[Dict]:
+        """Remove a file from the manifest, returning its entry."""
+        return self.files.pop(key, None)
+
+    def save(self):
+        """Atomically write the manifest to disk."""
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.files}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
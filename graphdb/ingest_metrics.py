@@ -0,0 +1,246 @@
+"""
+Stage-Level Ingestion Metrics
+=============================
+Timing instrumentation for the ingestion stages (parse, clean, embed, write,
+relationships) so a slow run can be attributed to a stage. Each stage keeps
+its operation count, items processed, retries, busy time, wall time (first
+start to last finish, which differs from busy time when stages run on
+several workers) and a cumulative latency histogram.
+
+Operations slower than `outlier_threshold` seconds are logged as they happen
+and listed in the summary. Metrics can be exported as JSON or in the
+Prometheus text exposition format (for a node_exporter textfile collector or
+a push gateway).
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Stages in pipeline order (others are accepted and listed after these)
+STAGES = ('parse', 'clean', 'embed', 'write', 'relationships')
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Slowest operations kept for the summary
+MAX_OUTLIERS = 50
+
+METRIC_PREFIX = 'sop_ingest'
+
+
+class StageMetrics:
+    """Counters and latency histogram for one stage (not locked; see IngestMetrics)."""
+
+    def __init__(self, name: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.operations = 0
+        self.items = 0
+        self.retries = 0
+        self.busy_seconds = 0.0
+        self.max_seconds = 0.0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    def observe(self, seconds: float, items: int, started: float):
+        self.operations += 1
+        self.items += items
+        self.busy_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+        ended = started + seconds
+        self.first_start = started if self.first_start is None else min(self.first_start, started)
+        self.last_end = ended if self.last_end is None else max(self.last_end, ended)
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_start is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def items_per_sec(self) -> float:
+        wall = self.wall_seconds
+        return self.items / wall if wall else 0.0
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given quantile, capped at the max latency."""
+
+        if not self.operations:
+            return 0.0
+        rank = fraction * self.operations
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            if count >= rank:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def to_dict(self) -> Dict:
+        return {
+            'operations': self.operations,
+            'items': self.items,
+            'retries': self.retries,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'busy_seconds': round(self.busy_seconds, 6),
+            'items_per_sec': round(self.items_per_sec, 2),
+            'p50_seconds': round(self.quantile(0.50), 6),
+            'p99_seconds': round(self.quantile(0.99), 6),
+            'max_seconds': round(self.max_seconds, 6),
+            'histogram': {str(bound): count for bound, count in zip(self.buckets, self.bucket_counts)}
+        }
+
+
+class IngestMetrics:
+    """Thread-safe per-stage timings shared by the ingestion code paths."""
+
+    def __init__(self, outlier_threshold: Optional[float] = None, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """Log single operations slower than `outlier_threshold` seconds (None = never)."""
+
+        self.outlier_threshold = outlier_threshold
+        self.buckets = buckets
+        self.outliers: List[Dict] = []
+        self.started = time.time()
+        self._stages: Dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, name: str) -> StageMetrics:
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = StageMetrics(name, self.buckets)
+        return stage
+
+    @contextmanager
+    def timed(self, stage: str, items: int = 1, item: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block as one `stage` operation over `items` items (not recorded if it raises)."""
+
+        started = time.perf_counter()
+        yield
+        self.observe(stage, time.perf_counter() - started, items, item, started)
+
+    def observe(
+        self,
+        stage: str,
+        seconds: float,
+        items: int = 1,
+        item: Optional[str] = None,
+        started: Optional[float] = None
+    ):
+        """
+        Record one operation that took `seconds`.
+
+        `item` names what was processed (e.g. the file) for outlier logging.
+        `started` is a time.perf_counter() value; it defaults to now minus
+        `seconds` (for durations measured elsewhere, e.g. in a worker process).
+        """
+
+        if started is None:
+            started = time.perf_counter() - seconds
+
+        outlier = self.outlier_threshold is not None and seconds > self.outlier_threshold
+        with self._lock:
+            self._stage(stage).observe(seconds, items, started)
+            if outlier:
+                self.outliers.append({'stage': stage, 'item': item or f"{items} items", 'seconds': round(seconds, 6)})
+                self.outliers.sort(key=lambda o: o['seconds'], reverse=True)
+                del self.outliers[MAX_OUTLIERS:]
+
+        if outlier:
+            print(f"Warning: Slow {stage} ({seconds:.3f}s > {self.outlier_threshold}s): {item or f'{items} items'}")
+
+    def retry(self, stage: str, count: int = 1):
+        """Count retried items for a stage."""
+        with self._lock:
+            self._stage(stage).retries += count
+
+    def stages(self) -> List[StageMetrics]:
+        """Recorded stages, known stages first in pipeline order."""
+
+        with self._lock:
+            names = [name for name in STAGES if name in self._stages]
+            names += sorted(name for name in self._stages if name not in STAGES)
+            return [self._stages[name] for name in names]
+
+    def to_dict(self) -> Dict:
+        return {
+            'started': self.started,
+            'outlier_threshold': self.outlier_threshold,
+            'stages': {stage.name: stage.to_dict() for stage in self.stages()},
+            'outliers': list(self.outliers)
+        }
+
+    def to_json(self, path: Path):
+        """Write the metrics as JSON."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_prometheus(self, prefix: str = METRIC_PREFIX) -> str:
+        """Metrics in the Prometheus text exposition format."""
+
+        stages = self.stages()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Latency of single ingestion stage operations.",
+            f"# TYPE {prefix}_stage_seconds histogram"
+        ]
+        for stage in stages:
+            for bound, count in zip(stage.buckets, stage.bucket_counts):
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage.name}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage.name}",le="+Inf"}} {stage.operations}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage.name}"}} {stage.busy_seconds:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage.name}"}} {stage.operations}')
+
+        gauges = (
+            ('items_total', 'counter', 'Items processed by the stage.', lambda s: s.items),
+            ('retries_total', 'counter', 'Items retried by the stage.', lambda s: s.retries),
+            ('wall_seconds', 'gauge', 'Wall time from first start to last finish of the stage.',
+             lambda s: f"{s.wall_seconds:.6f}"),
+            ('items_per_second', 'gauge', 'Stage throughput over its wall time.',
+             lambda s: f"{s.items_per_sec:.3f}")
+        )
+        for suffix, metric_type, help_text, value in gauges:
+            lines.append(f"# HELP {prefix}_stage_{suffix} {help_text}")
+            lines.append(f"# TYPE {prefix}_stage_{suffix} {metric_type}")
+            for stage in stages:
+                lines.append(f'{prefix}_stage_{suffix}{{stage="{stage.name}"}} {value(stage)}')
+
+        lines.append(f"# HELP {prefix}_outliers_total Operations slower than the outlier threshold.")
+        lines.append(f"# TYPE {prefix}_outliers_total counter")
+        lines.append(f"{prefix}_outliers_total {len(self.outliers)}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: Path):
+        """Write the Prometheus text format to a file."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_prometheus(), encoding='utf-8')
+
+    def format_table(self) -> List[str]:
+        """Summary lines for print_stats."""
+
+        stages = self.stages()
+        if not stages:
+            return []
+
+        lines = [f"{'Stage':<14}{'Items':>8}{'Wall s':>8}{'Busy s':>8}{'Items/s':>10}{'p50 ms':>8}{'p99 ms':>8}"
+                 f"{'Max ms':>9}{'Retries':>8}"]
+        for stage in stages:
+            lines.append(
+                f"{stage.name:<14}{stage.items:>8}{stage.wall_seconds:>8.2f}{stage.busy_seconds:>8.2f}"
+                f"{stage.items_per_sec:>10.1f}"
+                f"{stage.quantile(0.50) * 1000:>8.1f}{stage.quantile(0.99) * 1000:>8.1f}"
+                f"{stage.max_seconds * 1000:>9.1f}{stage.retries:>8}"
+            )
+        if self.outliers:
+            lines.append(f"Slowest operations over {self.outlier_threshold}s:")
+            for outlier in self.outliers[:10]:
+                lines.append(f"  {outlier['stage']:<14}{outlier['seconds']:>9.3f}s  {outlier['item']}")
+        return lines
@@ -9,7 +9,8 @@ Requirements:
     pip install neo4j openai pyyaml python-frontmatter tiktoken
 
 Environment Variables:
-    OPENAI_API_KEY: Your OpenAI API key for embeddings
+    OPENAI_API_KEY: Your OpenAI API key for embeddings (not needed with
+                    --embedding-provider local)
     NEO4J_URI: Neo4j connection URI (default: bolt://localhost:7687)
     NEO4J_USER: Neo4j username (default: neo4j)
     NEO4J_PASSWORD: Neo4j password
@@ -24,15 +25,178 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import re
 import argparse
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 
 try:
     from neo4j import GraphDatabase
-    from openai import OpenAI
 except ImportError as e:
     print(f"Missing required dependencies: {e}")
     print("Install with: pip install neo4j openai pyyaml python-frontmatter tiktoken")
     exit(1)
 
+try:
+    from .embeddings import (
+        EMBEDDING_PROVIDERS, MAX_INPUTS_PER_REQUEST, MAX_TOKENS_PER_REQUEST,
+        EmbeddingProvider, OpenAIEmbeddingProvider, get_embedding_provider, pack_embedding_batches
+    )
+    from .cypher_profile import CypherProfiler, ProfilingDriver
+    from .embedding_cache import EmbeddingCache
+    from .graph_store import RELATIONSHIP_TYPES, GraphStore, InMemoryGraphStore, Neo4jGraphStore
+    from .ingest_manifest import IngestManifest
+    from .ingest_metrics import IngestMetrics
+    from .chunking import DEFAULT_CHUNK_OVERLAP, chunk_markdown, count_tokens
+    from .vector_index import LocalVectorIndex
+except ImportError:
+    from embeddings import (
+        EMBEDDING_PROVIDERS, MAX_INPUTS_PER_REQUEST, MAX_TOKENS_PER_REQUEST,
+        EmbeddingProvider, OpenAIEmbeddingProvider, get_embedding_provider, pack_embedding_batches
+    )
+    from cypher_profile import CypherProfiler, ProfilingDriver
+    from embedding_cache import EmbeddingCache
+    from graph_store import RELATIONSHIP_TYPES, GraphStore, InMemoryGraphStore, Neo4jGraphStore
+    from ingest_manifest import IngestManifest
+    from ingest_metrics import IngestMetrics
+    from chunking import DEFAULT_CHUNK_OVERLAP, chunk_markdown, count_tokens
+    from vector_index import LocalVectorIndex
+
+
+# Component directories in ingestion order (children before parents so that
+# COMPOSED_OF targets already exist when their parents are written).
+COMPONENT_TYPES = [
+    ('atom', 'atoms', 'Atom'),
+    ('molecule', 'molecules', 'Molecule'),
+    ('organism', 'organisms', 'Organism'),
+]
+
+# Relationship types that point at other components. The pipelined writer
+# defers these until all component nodes exist.
+COMPONENT_LINK_TYPES = ('COMPOSED_OF', 'DEPENDS_ON')
+
+# Stats that indicate a run wrote to the graph
+GRAPH_CHANGE_STATS = (
+    'atoms_created', 'molecules_created', 'organisms_created', 'sops_created',
+    'relationships_created', 'chunks_created', 'nodes_deleted'
+)
+
+
+def clean_text_for_embedding(text: str, max_tokens: int = 8000) -> str:
+    """Clean and truncate text for embedding generation."""
+
+    # Remove markdown formatting
+    text = re.sub(r'#{1,6}\s', '', text)  # Headers
+    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)  # Bold
+    text = re.sub(r'\*(.+?)\*', r'\1', text)  # Italic
+    text = re.sub(r'`(.+?)`', r'\1', text)  # Inline code
+    text = re.sub(r'```[\s\S]*?```', '', text)  # Code blocks
+    text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', text)  # Links
+
+    # Remove extra whitespace
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = text.strip()
+
+    # Truncate to approximate token limit (rough estimate: 4 chars = 1 token)
+    max_chars = max_tokens * 4
+    if len(text) > max_chars:
+        text = text[:max_chars] + "..."
+
+    return text
+
+
+def parse_frontmatter_file(file_path: Path) -> Optional[Dict]:
+    """Parse YAML frontmatter from markdown file."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            post = frontmatter.load(f)
+            metadata = post.metadata
+            content = post.content
+
+            return {
+                'metadata': metadata,
+                'content': content,
+                'full_text': f"{yaml.dump(metadata)}\n\n{content}"
+            }
+    except Exception as e:
+        print(f"Error parsing {file_path}: {e}")
+        return None
+
+
+def parse_component_file(
+    component_type: str,
+    file_path: Path,
+    chunk_tokens: Optional[int] = None,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP
+) -> Optional[Dict]:
+    """
+    Parse, clean and optionally chunk one component file (pipeline stage 1).
+
+    Module-level so it can run in a process pool; returns None for files
+    that fail to parse or have no id. Stage timings are returned under
+    'timings' for the parent process to record.
+    """
+    started = time.perf_counter()
+    data = parse_frontmatter_file(file_path)
+    parse_seconds = time.perf_counter() - started
+    if not data:
+        return None
+    if not data['metadata'].get('id'):
+        print(f"Warning: Skipping {file_path.name}: missing 'id' in frontmatter")
+        return None
+
+    started = time.perf_counter()
+    data['clean_text'] = clean_text_for_embedding(data['full_text'])
+    if chunk_tokens:
+        data['chunks'] = chunk_component(data, chunk_tokens, chunk_overlap)
+    clean_seconds = time.perf_counter() - started
+
+    return {
+        'type': component_type,
+        'path': file_path,
+        'data': data,
+        'timings': {'parse': parse_seconds, 'clean': clean_seconds}
+    }
+
+
+def chunk_component(data: Dict, chunk_tokens: int, chunk_overlap: int = DEFAULT_CHUNK_OVERLAP) -> List[Dict]:
+    """Split a parsed component's markdown into chunks with cleaned embedding inputs."""
+
+    title = data['metadata'].get('title') or ''
+    return [
+        {
+            'index': chunk.index,
+            'heading': chunk.heading,
+            'text': chunk.text,
+            'tokenCount': chunk.token_count,
+            'clean_text': clean_text_for_embedding(f"{title}\n\n{chunk.text}")
+        }
+        for chunk in chunk_markdown(data['content'], max_tokens=chunk_tokens, overlap_tokens=chunk_overlap)
+    ]
+
+
+def _queue_put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put with backpressure, giving up if the pipeline is stopping."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _queue_get(q: queue.Queue, stop: threading.Event):
+    """Blocking get that returns None once the pipeline is stopping."""
+    while True:
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return None
+
 
 class SOPGraphIngestion:
     """Ingests SOP documentation into Neo4j graph database with embeddings."""
@@ -44,127 +208,272 @@ class SOPGraphIngestion:
         neo4j_password: str = None,
         openai_api_key: str = None,
         embedding_model: str = "text-embedding-ada-002",
-        use_embeddings: bool = True
+        use_embeddings: bool = True,
+        batch_size: int = 500,
+        embedding_client=None,
+        embedding_batch_inputs: int = MAX_INPUTS_PER_REQUEST,
+        embedding_batch_tokens: int = MAX_TOKENS_PER_REQUEST,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        chunk_tokens: Optional[int] = None,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        embedding_dimension: Optional[int] = None,
+        driver=None,
+        metrics: Optional[IngestMetrics] = None,
+        profiler: Optional[CypherProfiler] = None,
+        store: Optional[GraphStore] = None
     ):
-        """Initialize graph ingestion pipeline."""
-
-        # Neo4j connection
-        self.neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
-        self.neo4j_user = neo4j_user or os.getenv("NEO4J_USER", "neo4j")
-        self.neo4j_password = neo4j_password or os.getenv("NEO4J_PASSWORD")
-
-        if not self.neo4j_password:
-            raise ValueError("Neo4j password must be provided via NEO4J_PASSWORD env var or constructor")
-
-        self.driver = GraphDatabase.driver(
-            self.neo4j_uri,
-            auth=(self.neo4j_user, self.neo4j_password)
-        )
-
-        # OpenAI client for embeddings
+        """
+        Initialize graph ingestion pipeline.
+
+        Embeddings come from `embedding_provider` if given; otherwise an
+        OpenAI provider is built from `embedding_client` (e.g.
+        embeddings.FakeEmbeddingClient) or the OpenAI API key. `driver` may
+        be an existing Neo4j driver (or a stand-in with the same interface).
+        `metrics` collects per-stage timings (a new IngestMetrics if omitted).
+        With a `profiler`, every statement runs with PROFILE and its plan is
+        aggregated there (see cypher_profile.py). A `store` (e.g.
+        graph_store.InMemoryGraphStore) replaces the Neo4j connection.
+        """
+
+        # Graph store: the given one, else Neo4j
+        self.profiler = profiler
+        if store is None:
+            if driver is None:
+                self.neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
+                self.neo4j_user = neo4j_user or os.getenv("NEO4J_USER", "neo4j")
+                self.neo4j_password = neo4j_password or os.getenv("NEO4J_PASSWORD")
+
+                if not self.neo4j_password:
+                    raise ValueError("Neo4j password must be provided via NEO4J_PASSWORD env var or constructor")
+
+                driver = GraphDatabase.driver(
+                    self.neo4j_uri,
+                    auth=(self.neo4j_user, self.neo4j_password)
+                )
+            store = Neo4jGraphStore(ProfilingDriver(driver, profiler) if profiler else driver)
+        self.store = store
+        self.driver = getattr(store, 'driver', None)
+        self._schema_deferred = False
+
+        # Components first created by the last incremental run
+        self.new_component_ids = set()
+
+        # Embedding provider
         self.use_embeddings = use_embeddings
         if not use_embeddings:
             print("INFO: Embeddings disabled via --no-embeddings flag")
-            self.openai_client = None
+            self.embedding_provider = None
+        elif embedding_provider is not None:
+            self.embedding_provider = embedding_provider
+        elif embedding_client is not None:
+            self.embedding_provider = OpenAIEmbeddingProvider(
+                embedding_model, client=embedding_client, dimension=embedding_dimension
+            )
         else:
-            self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-            if not self.openai_api_key:
+            try:
+                self.embedding_provider = OpenAIEmbeddingProvider(
+                    embedding_model, api_key=openai_api_key, dimension=embedding_dimension
+                )
+            except ValueError:
                 print("WARNING: No OpenAI API key provided. Embeddings will not be generated.")
-                print("         Set OPENAI_API_KEY environment variable to enable embeddings.")
-                self.openai_client = None
-            else:
-                self.openai_client = OpenAI(api_key=self.openai_api_key)
+                print("         Set OPENAI_API_KEY environment variable to enable embeddings,")
+                print("         or use --embedding-provider local.")
+                self.embedding_provider = None
+
+        # Model name identifies the vector space (and keys the embedding cache)
+        self.embedding_model = self.embedding_provider.model if self.embedding_provider else embedding_model
+
+        # Per-request limits for batched embedding generation
+        self.embedding_batch_inputs = embedding_batch_inputs
+        self.embedding_batch_tokens = embedding_batch_tokens
+
+        # Optional persistent cache keyed by model + cleaned text hash
+        self.embedding_cache = embedding_cache
 
-        self.embedding_model = embedding_model
+        # Chunk mode: embed token-counted sections as :Chunk nodes (bulk paths only)
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap = chunk_overlap
 
-        # Stats tracking
+        # Number of components written per transaction in bulk mode
+        self.batch_size = batch_size
+
+        # Stats tracking (embedding workers update it from several threads)
+        self._stats_lock = threading.Lock()
         self.stats = {
             'atoms_created': 0,
             'molecules_created': 0,
             'organisms_created': 0,
             'sops_created': 0,
             'relationships_created': 0,
-            'embeddings_generated': 0
+            'embeddings_generated': 0,
+            'embedding_requests': 0,
+            'embedding_fallbacks': 0,
+            'embedding_cache_hits': 0,
+            'embedding_cache_misses': 0,
+            'batches_written': 0,
+            'chunks_created': 0,
+            'files_unchanged': 0,
+            'nodes_deleted': 0
         }
 
+        # Per-stage timings (parse, clean, embed, write, relationships)
+        self.metrics = metrics or IngestMetrics()
+
+    def ensure_schema(self) -> Dict[str, List[str]]:
+        """Create missing constraints and vector indexes (sized for the embedding provider)."""
+
+        dimension = self.embedding_provider.dimension if self.embedding_provider else None
+        report = self.store.ensure_schema(dimension, vector_indexes=self.embedding_provider is not None)
+        created = report['constraints'] + report['vector_indexes']
+        if created:
+            print(f"Created schema: {', '.join(created)}")
+        return report
+
+    def defer_schema(self):
+        """Postpone ensure_schema() until just before the first write of this run."""
+        self._schema_deferred = True
+
+    def _ensure_deferred_schema(self):
+        """Run a schema bootstrap postponed by defer_schema(), at most once."""
+        if self._schema_deferred:
+            self._schema_deferred = False
+            self.ensure_schema()
+
+    def _count(self, key: str, amount: int = 1):
+        """Thread-safe stats increment."""
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    @contextmanager
+    def _timed_relationships(self, item: str):
+        """Time per-file relationship statements, counting those added to stats."""
+        started = time.perf_counter()
+        before = self.stats['relationships_created']
+        yield
+        self.metrics.observe(
+            'relationships', time.perf_counter() - started, self.stats['relationships_created'] - before, item, started
+        )
+
     def close(self):
-        """Close Neo4j connection."""
-        self.driver.close()
+        """Close the graph store and the embedding cache."""
+        self.store.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
 
     def generate_embedding(self, text: str) -> Optional[List[float]]:
-        """Generate vector embedding for text using OpenAI."""
-        if not self.openai_client:
+        """Generate vector embedding for text using the embedding provider."""
+        if self.embedding_provider is None:
             return None
 
-        try:
-            # Clean text: remove markdown, limit length
-            clean_text = self._clean_text_for_embedding(text)
+        # Clean text: remove markdown, limit length
+        clean_text = self._clean_text_for_embedding(text)
 
-            # Generate embedding
-            response = self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=clean_text
-            )
+        if self.embedding_cache is not None:
+            cached = self._cached_embeddings([clean_text])[0]
+            if cached is not None:
+                return cached
 
-            embedding = response.data[0].embedding
-            self.stats['embeddings_generated'] += 1
+        embedding = self._embed_clean_text(clean_text)
+        if embedding and self.embedding_cache is not None:
+            self.embedding_cache.put(self.embedding_model, clean_text, embedding)
 
-            return embedding
+        return embedding
 
-        except Exception as e:
-            print(f"Warning: Failed to generate embedding: {e}")
-            return None
+    def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Generate embeddings for many texts with as few API requests as possible.
 
-    def _clean_text_for_embedding(self, text: str, max_tokens: int = 8000) -> str:
-        """Clean and truncate text for embedding generation."""
+        Cleaned texts are packed into requests that stay under the per-request
+        input and token limits. Vectors are mapped back by response index, so
+        the result lines up with `texts`. If a whole request fails, its texts
+        are retried one at a time; only those inputs fall back. Texts found in
+        the embedding cache are not sent to the API at all.
+        """
+        if self.embedding_provider is None or not texts:
+            return [None] * len(texts)
 
-        # Remove markdown formatting
-        text = re.sub(r'#{1,6}\s', '', text)  # Headers
-        text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)  # Bold
-        text = re.sub(r'\*(.+?)\*', r'\1', text)  # Italic
-        text = re.sub(r'`(.+?)`', r'\1', text)  # Inline code
-        text = re.sub(r'```[\s\S]*?```', '', text)  # Code blocks
-        text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', text)  # Links
+        return self.embed_clean_texts([self._clean_text_for_embedding(text) for text in texts])
 
-        # Remove extra whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = text.strip()
+    def embed_clean_texts(self, clean_texts: List[str]) -> List[Optional[List[float]]]:
+        """Batched embedding of already-cleaned texts (see generate_embeddings)."""
+        if self.embedding_provider is None or not clean_texts:
+            return [None] * len(clean_texts)
 
-        # Truncate to approximate token limit (rough estimate: 4 chars = 1 token)
-        max_chars = max_tokens * 4
-        if len(text) > max_chars:
-            text = text[:max_chars] + "..."
+        embeddings = self._cached_embeddings(clean_texts)
+        pending = [i for i, embedding in enumerate(embeddings) if embedding is None]
 
-        return text
+        batches = pack_embedding_batches(
+            [clean_texts[i] for i in pending],
+            max_inputs=min(self.embedding_batch_inputs, self.embedding_provider.max_inputs),
+            max_tokens=min(self.embedding_batch_tokens, self.embedding_provider.max_tokens),
+            count_tokens=lambda text: count_tokens(text, self.embedding_model)
+        )
+        batches = [[pending[i] for i in batch] for batch in batches]
+
+        for batch in batches:
+            try:
+                with self.metrics.timed('embed', items=len(batch)):
+                    vectors = self.embedding_provider.embed([clean_texts[i] for i in batch])
+                self._count('embedding_requests')
+
+                for i, vector in zip(batch, vectors):
+                    embeddings[i] = vector
+                self._count('embeddings_generated', len(vectors))
+
+            except Exception as e:
+                print(f"Warning: Batch embedding request failed ({len(batch)} inputs), retrying individually: {e}")
+                self.metrics.retry('embed', len(batch))
+                for i in batch:
+                    self._count('embedding_fallbacks')
+                    embeddings[i] = self._embed_clean_text(clean_texts[i])
+
+        if self.embedding_cache is not None and pending:
+            self.embedding_cache.put_many(
+                self.embedding_model,
+                [clean_texts[i] for i in pending],
+                [embeddings[i] for i in pending]
+            )
 
-    def parse_frontmatter(self, file_path: Path) -> Dict:
-        """Parse YAML frontmatter from markdown file."""
+        return embeddings
+
+    def _cached_embeddings(self, clean_texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up cleaned texts in the embedding cache (all misses if disabled)."""
+        if self.embedding_cache is None:
+            return [None] * len(clean_texts)
+
+        cached = self.embedding_cache.get_many(self.embedding_model, clean_texts)
+        hits = sum(1 for embedding in cached if embedding is not None)
+        self._count('embedding_cache_hits', hits)
+        self._count('embedding_cache_misses', len(cached) - hits)
+        return cached
+
+    def _embed_clean_text(self, clean_text: str) -> Optional[List[float]]:
+        """Embed a single already-cleaned text (per-item fallback)."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
-                metadata = post.metadata
-                content = post.content
-
-                return {
-                    'metadata': metadata,
-                    'content': content,
-                    'full_text': f"{yaml.dump(metadata)}\n\n{content}"
-                }
+            with self.metrics.timed('embed'):
+                embedding = self.embedding_provider.embed_one(clean_text)
+            self._count('embedding_requests')
+            self._count('embeddings_generated')
+            return embedding
+
         except Exception as e:
-            print(f"Error parsing {file_path}: {e}")
+            print(f"Warning: Failed to generate embedding: {e}")
             return None
 
-    def create_atom_node(self, atom_data: Dict, file_path: Path) -> str:
-        """Create an Atom node in Neo4j."""
-
-        metadata = atom_data['metadata']
-        content = atom_data['content']
+    def _clean_text_for_embedding(self, text: str, max_tokens: int = 8000) -> str:
+        """Clean and truncate text for embedding generation."""
+        with self.metrics.timed('clean'):
+            return clean_text_for_embedding(text, max_tokens)
 
-        # Generate embedding
-        embedding = self.generate_embedding(atom_data['full_text'])
+    def parse_frontmatter(self, file_path: Path) -> Dict:
+        """Parse YAML frontmatter from markdown file."""
+        with self.metrics.timed('parse', item=str(file_path)):
+            return parse_frontmatter_file(file_path)
 
-        # Prepare node properties
-        properties = {
+    def _atom_properties(self, metadata: Dict, content: str, file_path: Path) -> Dict:
+        """Build Atom node properties from parsed frontmatter."""
+        return {
             'id': metadata.get('id'),
             'type': 'atom',
             'title': metadata.get('title'),
@@ -188,59 +497,9 @@ class SOPGraphIngestion:
             'createdAt': datetime.now().isoformat()
         }
 
-        if embedding:
-            properties['embedding'] = embedding
-
-        # Create node in Neo4j
-        with self.driver.session() as session:
-            result = session.run("""
-                MERGE (a:Atom {id: $id})
-                SET a += $properties
-                RETURN a.id as id
-            """, id=properties['id'], properties=properties)
-
-            atom_id = result.single()['id']
-            self.stats['atoms_created'] += 1
-
-            # Create relationships to departments
-            if properties.get('department'):
-                session.run("""
-                    MATCH (a:Atom {id: $atomId})
-                    MERGE (d:Department {name: $deptName})
-                    MERGE (a)-[:OWNED_BY]->(d)
-                """, atomId=atom_id, deptName=properties['department'])
-                self.stats['relationships_created'] += 1
-
-            # Create relationships to compliance frameworks
-            for framework in properties.get('complianceFrameworks', []):
-                session.run("""
-                    MATCH (a:Atom {id: $atomId})
-                    MERGE (cf:ComplianceFramework {name: $framework})
-                    MERGE (a)-[:COMPLIES_WITH]->(cf)
-                """, atomId=atom_id, framework=framework)
-                self.stats['relationships_created'] += 1
-
-            # Create relationships to concepts (extract from tags/keywords)
-            for keyword in properties.get('keywords', [])[:5]:  # Limit to top 5
-                session.run("""
-                    MATCH (a:Atom {id: $atomId})
-                    MERGE (c:Concept {name: $keyword})
-                    MERGE (a)-[:REFERENCES]->(c)
-                """, atomId=atom_id, keyword=keyword)
-                self.stats['relationships_created'] += 1
-
-        return atom_id
-
-    def create_molecule_node(self, molecule_data: Dict, file_path: Path) -> str:
-        """Create a Molecule node in Neo4j."""
-
-        metadata = molecule_data['metadata']
-        content = molecule_data['content']
-
-        # Generate embedding
-        embedding = self.generate_embedding(molecule_data['full_text'])
-
-        properties = {
+    def _molecule_properties(self, metadata: Dict, content: str, file_path: Path) -> Dict:
+        """Build Molecule node properties from parsed frontmatter."""
+        return {
             'id': metadata.get('id'),
             'type': 'molecule',
             'title': metadata.get('title'),
@@ -254,48 +513,9 @@ class SOPGraphIngestion:
             'createdAt': datetime.now().isoformat()
         }
 
-        if embedding:
-            properties['embedding'] = embedding
-
-        with self.driver.session() as session:
-            result = session.run("""
-                MERGE (m:Molecule {id: $id})
-                SET m += $properties
-                RETURN m.id as id
-            """, id=properties['id'], properties=properties)
-
-            molecule_id = result.single()['id']
-            self.stats['molecules_created'] += 1
-
-            # Create COMPOSED_OF relationships to atoms
-            for order, atom_id in enumerate(metadata.get('composedOf', [])):
-                session.run("""
-                    MATCH (m:Molecule {id: $moleculeId})
-                    MATCH (a:Atom {id: $atomId})
-                    MERGE (m)-[r:COMPOSED_OF {order: $order}]->(a)
-                """, moleculeId=molecule_id, atomId=atom_id, order=order)
-                self.stats['relationships_created'] += 1
-
-            # Create DEPENDS_ON relationships
-            for dep_id in metadata.get('dependencies', []):
-                session.run("""
-                    MATCH (m:Molecule {id: $moleculeId})
-                    MATCH (dep {id: $depId})
-                    MERGE (m)-[r:DEPENDS_ON {dependencyType: 'hard'}]->(dep)
-                """, moleculeId=molecule_id, depId=dep_id)
-                self.stats['relationships_created'] += 1
-
-        return molecule_id
-
-    def create_organism_node(self, organism_data: Dict, file_path: Path) -> str:
-        """Create an Organism node in Neo4j."""
-
-        metadata = organism_data['metadata']
-        content = organism_data['content']
-
-        embedding = self.generate_embedding(organism_data['full_text'])
-
-        properties = {
+    def _organism_properties(self, metadata: Dict, content: str, file_path: Path) -> Dict:
+        """Build Organism node properties from parsed frontmatter."""
+        return {
             'id': metadata.get('id'),
             'type': 'organism',
             'title': metadata.get('title'),
@@ -308,33 +528,47 @@ class SOPGraphIngestion:
             'createdAt': datetime.now().isoformat()
         }
 
-        if embedding:
-            properties['embedding'] = embedding
+    def _write_single_component(self, component_type: str, row: Dict, file_path: Path) -> str:
+        """Write one component row and its relationships (per-file path)."""
+
+        label = self._label_for(component_type)
+        with self.metrics.timed('write', item=str(file_path)):
+            self.store.upsert_nodes(label, [{'id': row['id'], 'properties': row['properties']}])
+        self.stats[f'{component_type}s_created'] += 1
+
+        with self._timed_relationships(str(file_path)):
+            for rel_type, rel_rows in row['relationships'].items():
+                if rel_rows:
+                    self.store.upsert_edges(rel_type, label, rel_rows)
+                    self.stats['relationships_created'] += len(rel_rows)
 
-        with self.driver.session() as session:
-            result = session.run("""
-                MERGE (o:Organism {id: $id})
-                SET o += $properties
-                RETURN o.id as id
-            """, id=properties['id'], properties=properties)
+        return row['id']
 
-            organism_id = result.single()['id']
-            self.stats['organisms_created'] += 1
+    def create_atom_node(self, atom_data: Dict, file_path: Path) -> str:
+        """Create an Atom node with its department, compliance and concept links."""
+
+        embedding = self.generate_embedding(atom_data['full_text'])
+        row = self.build_component_row('atom', atom_data, file_path, embedding)
+        return self._write_single_component('atom', row, file_path)
+
+    def create_molecule_node(self, molecule_data: Dict, file_path: Path) -> str:
+        """Create a Molecule node with its COMPOSED_OF and DEPENDS_ON links."""
 
-            # Create COMPOSED_OF relationships
-            for order, component_id in enumerate(metadata.get('composedOf', [])):
-                session.run("""
-                    MATCH (o:Organism {id: $organismId})
-                    MATCH (c {id: $componentId})
-                    MERGE (o)-[r:COMPOSED_OF {order: $order}]->(c)
-                """, organismId=organism_id, componentId=component_id, order=order)
-                self.stats['relationships_created'] += 1
+        embedding = self.generate_embedding(molecule_data['full_text'])
+        row = self.build_component_row('molecule', molecule_data, file_path, embedding)
+        return self._write_single_component('molecule', row, file_path)
 
-        return organism_id
+    def create_organism_node(self, organism_data: Dict, file_path: Path) -> str:
+        """Create an Organism node with its COMPOSED_OF links."""
+
+        embedding = self.generate_embedding(organism_data['full_text'])
+        row = self.build_component_row('organism', organism_data, file_path, embedding)
+        return self._write_single_component('organism', row, file_path)
 
     def ingest_graph_json(self, graph_json_path: Path):
         """Ingest existing graph.json to create SOP and component nodes."""
 
+        self._ensure_deferred_schema()
         with open(graph_json_path, 'r') as f:
             graph_data = json.load(f)
 
@@ -351,11 +585,12 @@ class SOPGraphIngestion:
             print(f"Warning: Unexpected nodes format: {type(nodes)}")
             return
 
+        sop_rows = []
+        composed_of = []
         for node_data in nodes_iter:
             node_type = node_data.get('type')
 
             if node_type == 'sop':
-                # Create SOP node
                 properties = {
                     'id': node_data['id'],
                     'type': 'sop',
@@ -367,23 +602,18 @@ class SOPGraphIngestion:
                     'lastReviewed': node_data.get('metadata', {}).get('lastReviewed'),
                     'createdAt': datetime.now().isoformat()
                 }
+                sop_rows.append({'id': properties['id'], 'properties': properties})
 
-                with self.driver.session() as session:
-                    session.run("""
-                        MERGE (s:SOP {id: $id})
-                        SET s += $properties
-                    """, id=properties['id'], properties=properties)
-
-                    self.stats['sops_created'] += 1
+                for order, component_id in enumerate(node_data.get('components', [])):
+                    composed_of.append({'source': properties['id'], 'target': component_id, 'order': order})
 
-                    # Create COMPOSED_OF relationships
-                    for order, component_id in enumerate(node_data.get('components', [])):
-                        session.run("""
-                            MATCH (s:SOP {id: $sopId})
-                            MATCH (c {id: $componentId})
-                            MERGE (s)-[r:COMPOSED_OF {order: $order}]->(c)
-                        """, sopId=properties['id'], componentId=component_id, order=order)
-                        self.stats['relationships_created'] += 1
+        # SOP nodes first so every COMPOSED_OF source exists
+        if sop_rows:
+            self.store.upsert_nodes('SOP', sop_rows)
+            self.stats['sops_created'] += len(sop_rows)
+        if composed_of:
+            self.store.upsert_edges('COMPOSED_OF', 'SOP', composed_of)
+            self.stats['relationships_created'] += len(composed_of)
 
     def ingest_directory(self, components_dir: Path):
         """Ingest all SOP components from a directory."""
@@ -418,6 +648,481 @@ class SOPGraphIngestion:
                 if data:
                     self.create_organism_node(data, md_file)
 
+    def build_component_row(
+        self,
+        component_type: str,
+        data: Dict,
+        file_path: Path,
+        embedding: Optional[List[float]] = None
+    ) -> Dict:
+        """Build a bulk-write row (node properties plus outgoing relationships)."""
+
+        metadata = data['metadata']
+        content = data['content']
+
+        if component_type == 'atom':
+            properties = self._atom_properties(metadata, content, file_path)
+        elif component_type == 'molecule':
+            properties = self._molecule_properties(metadata, content, file_path)
+        elif component_type == 'organism':
+            properties = self._organism_properties(metadata, content, file_path)
+        else:
+            raise ValueError(f"Unknown component type: {component_type}")
+
+        if embedding:
+            properties['embedding'] = embedding
+
+        node_id = properties['id']
+        relationships = {rel_type: [] for rel_type in RELATIONSHIP_TYPES}
+
+        if component_type == 'atom':
+            if properties.get('department'):
+                relationships['OWNED_BY'].append({'source': node_id, 'target': properties['department']})
+            for framework in properties.get('complianceFrameworks', []):
+                relationships['COMPLIES_WITH'].append({'source': node_id, 'target': framework})
+            for keyword in properties.get('keywords', [])[:5]:  # Limit to top 5
+                relationships['REFERENCES'].append({'source': node_id, 'target': keyword})
+        else:
+            for order, child_id in enumerate(metadata.get('composedOf', [])):
+                relationships['COMPOSED_OF'].append({'source': node_id, 'target': child_id, 'order': order})
+
+        if component_type == 'molecule':
+            for dep_id in metadata.get('dependencies', []):
+                relationships['DEPENDS_ON'].append({'source': node_id, 'target': dep_id})
+
+        return {
+            'id': node_id,
+            'properties': properties,
+            'relationships': relationships
+        }
+
+    def write_component_batch(
+        self,
+        component_type: str,
+        rows: List[Dict],
+        replace_relationships: bool = False,
+        rel_types: Optional[List[str]] = None
+    ):
+        """Write a batch of component rows (one transaction with the Neo4j store)."""
+
+        if not rows:
+            return
+
+        label = self._label_for(component_type)
+        timings = {}
+
+        started = time.perf_counter()
+        counts = self.store.write_component_batch(label, rows, replace_relationships, rel_types, timings)
+        seconds = time.perf_counter() - started
+
+        # Relationship statements are reported as their own stage
+        rel_seconds = timings.get('relationships', 0.0)
+        rel_count = sum(count for rel_type, count in counts.items() if rel_type != 'HAS_CHUNK')
+        batch_name = f"{label} batch of {len(rows)}"
+        self.metrics.observe('write', seconds - rel_seconds, len(rows), batch_name, started)
+        if rel_count:
+            self.metrics.observe('relationships', rel_seconds, rel_count, batch_name, started + seconds - rel_seconds)
+
+        self.stats[f'{component_type}s_created'] += len(rows)
+        self.stats['chunks_created'] += counts.get('HAS_CHUNK', 0)
+        self.stats['relationships_created'] += rel_count
+        self.stats['batches_written'] += 1
+
+    def write_relationship_batch(self, component_type: str, rel_type: str, rel_rows: List[Dict]):
+        """Write one relationship type for a batch of components in a single call."""
+
+        if not rel_rows:
+            return
+
+        with self.metrics.timed('relationships', items=len(rel_rows), item=f"{rel_type} batch of {len(rel_rows)}"):
+            self.store.upsert_edges(rel_type, self._label_for(component_type), rel_rows)
+
+        self.stats['relationships_created'] += len(rel_rows)
+        self.stats['batches_written'] += 1
+
+    def ingest_directory_bulk(self, components_dir: Path, batch_size: Optional[int] = None):
+        """Ingest all SOP components from a directory using batched UNWIND writes."""
+
+        batch_size = batch_size or self.batch_size
+
+        for component_type, subdir, _ in COMPONENT_TYPES:
+            type_dir = components_dir / subdir
+            if not type_dir.exists():
+                continue
+
+            print(f"\nProcessing {subdir} from {type_dir} (batch size {batch_size})...")
+            batch = []
+            for md_file in sorted(type_dir.glob('*.md')):
+                data = self.parse_frontmatter(md_file)
+                if not data:
+                    continue
+                if not data['metadata'].get('id'):
+                    print(f"Warning: Skipping {md_file.name}: missing 'id' in frontmatter")
+                    continue
+
+                batch.append((data, md_file))
+                if len(batch) >= batch_size:
+                    self._flush_component_batch(component_type, batch)
+                    print(f"  - wrote {len(batch)} {subdir}")
+                    batch = []
+
+            if batch:
+                self._flush_component_batch(component_type, batch)
+                print(f"  - wrote {len(batch)} {subdir}")
+
+    def _flush_component_batch(
+        self,
+        component_type: str,
+        parsed: List,
+        replace_relationships: bool = False
+    ) -> List[Dict]:
+        """Embed a batch of parsed components in bulk, then write it; returns the write rows."""
+
+        rows = self.embed_component_batch(component_type, parsed)
+        self.write_component_batch(component_type, rows, replace_relationships)
+        return rows
+
+    def embed_component_batch(self, component_type: str, parsed: List) -> List[Dict]:
+        """
+        Embed a batch of (data, file_path) pairs and build their write rows.
+
+        All component texts (and, in chunk mode, all chunk texts) of the batch
+        go through one batched embedding call.
+        """
+
+        clean_texts = [
+            data.get('clean_text') or self._clean_text_for_embedding(data['full_text'])
+            for data, _ in parsed
+        ]
+        embeddings = self.embed_clean_texts(clean_texts)
+        rows = [
+            self.build_component_row(component_type, data, md_file, embedding)
+            for (data, md_file), embedding in zip(parsed, embeddings)
+        ]
+
+        if self.chunk_tokens:
+            chunk_lists = [
+                data.get('chunks') or chunk_component(data, self.chunk_tokens, self.chunk_overlap)
+                for data, _ in parsed
+            ]
+            chunk_embeddings = iter(self.embed_clean_texts(
+                [chunk['clean_text'] for chunks in chunk_lists for chunk in chunks]
+            ))
+            for row, chunks in zip(rows, chunk_lists):
+                row['chunks'] = []
+                for chunk in chunks:
+                    properties = {
+                        'id': f"{row['id']}#chunk-{chunk['index']}",
+                        'parentId': row['id'],
+                        'chunkIndex': chunk['index'],
+                        'heading': chunk['heading'],
+                        'text': chunk['text'],
+                        'tokenCount': chunk['tokenCount']
+                    }
+                    embedding = next(chunk_embeddings)
+                    if embedding:
+                        properties['embedding'] = embedding
+                    row['chunks'].append({'id': properties['id'], 'parentId': row['id'], 'properties': properties})
+
+        return rows
+
+    def ingest_directory_pipelined(
+        self,
+        components_dir: Path,
+        parse_workers: Optional[int] = None,
+        embed_workers: int = 4,
+        queue_size: int = 8,
+        batch_size: Optional[int] = None
+    ):
+        """
+        Ingest all components through a staged producer-consumer pipeline.
+
+        Stage 1 parses and cleans files in a process pool, stage 2 embeds
+        batches on a thread pool, and stage 3 is a single writer (this thread)
+        issuing the bulk UNWIND writes. Bounded queues between the stages
+        provide backpressure, so throughput is limited by the slowest stage.
+        COMPOSED_OF/DEPENDS_ON links are written once all nodes exist.
+        """
+
+        batch_size = batch_size or self.batch_size
+        parse_workers = parse_workers or os.cpu_count() or 1
+
+        files = []
+        for component_type, subdir, _ in COMPONENT_TYPES:
+            type_dir = components_dir / subdir
+            if type_dir.exists():
+                files.extend((component_type, md_file) for md_file in sorted(type_dir.glob('*.md')))
+
+        print(f"\nPipelined ingestion of {len(files)} files "
+              f"({parse_workers} parse workers, {embed_workers} embed workers, batch size {batch_size})")
+
+        embed_queue = queue.Queue(maxsize=queue_size)
+        write_queue = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        errors = []
+
+        def produce():
+            try:
+                batches = defaultdict(list)
+                with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+                    pending = deque()
+                    for component_type, md_file in files:
+                        if stop.is_set():
+                            return
+                        pending.append(pool.submit(
+                            parse_component_file, component_type, md_file, self.chunk_tokens, self.chunk_overlap
+                        ))
+                        # Bound in-flight parses so results cannot pile up in memory
+                        while len(pending) > parse_workers * 4 or (pending and pending[0].done()):
+                            self._collect_parsed(pending.popleft().result(), batches, batch_size, embed_queue, stop)
+                    while pending:
+                        self._collect_parsed(pending.popleft().result(), batches, batch_size, embed_queue, stop)
+
+                for component_type, parsed in batches.items():
+                    if parsed:
+                        _queue_put(embed_queue, (component_type, parsed), stop)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                for _ in range(embed_workers):
+                    _queue_put(embed_queue, None, stop)
+
+        def embed():
+            try:
+                while True:
+                    item = _queue_get(embed_queue, stop)
+                    if item is None:
+                        break
+                    component_type, parsed = item
+                    rows = self.embed_component_batch(component_type, [(p['data'], p['path']) for p in parsed])
+                    if not _queue_put(write_queue, (component_type, rows), stop):
+                        break
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                _queue_put(write_queue, None, stop)
+
+        producer = threading.Thread(target=produce, name='ingest-parse', daemon=True)
+        embedders = [
+            threading.Thread(target=embed, name=f'ingest-embed-{i}', daemon=True)
+            for i in range(embed_workers)
+        ]
+        producer.start()
+        for thread in embedders:
+            thread.start()
+
+        # Stage 3: single writer
+        deferred = defaultdict(list)
+        local_rel_types = [t for t in RELATIONSHIP_TYPES if t not in COMPONENT_LINK_TYPES]
+        finished = 0
+        try:
+            while finished < embed_workers:
+                item = _queue_get(write_queue, stop)
+                if item is None:
+                    if stop.is_set():
+                        break
+                    finished += 1
+                    continue
+
+                component_type, rows = item
+                self.write_component_batch(component_type, rows, rel_types=local_rel_types)
+                for row in rows:
+                    for rel_type in COMPONENT_LINK_TYPES:
+                        deferred[(component_type, rel_type)].extend(row['relationships'][rel_type])
+                print(f"  - wrote {len(rows)} {component_type}s")
+        except Exception:
+            stop.set()
+            raise
+        finally:
+            producer.join()
+            for thread in embedders:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+
+        for component_type, _, _ in COMPONENT_TYPES:
+            for rel_type in COMPONENT_LINK_TYPES:
+                rel_rows = deferred.get((component_type, rel_type), [])
+                for start in range(0, len(rel_rows), batch_size):
+                    self.write_relationship_batch(component_type, rel_type, rel_rows[start:start + batch_size])
+
+    def _collect_parsed(self, parsed: Optional[Dict], batches: Dict, batch_size: int, embed_queue: queue.Queue, stop):
+        """Add a parsed file to its type's batch, handing full batches to the embed stage."""
+
+        if not parsed:
+            return
+        for stage, seconds in parsed.get('timings', {}).items():
+            self.metrics.observe(stage, seconds, item=str(parsed['path']))
+        batch = batches[parsed['type']]
+        batch.append(parsed)
+        if len(batch) >= batch_size:
+            _queue_put(embed_queue, (parsed['type'], list(batch)), stop)
+            batch.clear()
+
+    @staticmethod
+    def _label_for(component_type: str) -> str:
+        """Neo4j label for a component type ('atom' -> 'Atom')."""
+        return next(label for ctype, _, label in COMPONENT_TYPES if ctype == component_type)
+
+    def ingest_directory_incremental(
+        self,
+        components_dir: Path,
+        manifest: IngestManifest,
+        batch_size: Optional[int] = None
+    ):
+        """
+        Ingest only new or changed components and tombstone deleted ones.
+
+        Files whose mtime and size match the manifest are skipped without being
+        read, so a run with no changes never touches Neo4j or the embedding API
+        (with defer_schema(), the schema bootstrap also waits for the first write).
+
+        Components that (re)appear in this run are linked from unchanged parents
+        whose COMPOSED_OF/DEPENDS_ON entries name them, so the graph matches a
+        full ingest. Their ids are kept in `new_component_ids`.
+        """
+
+        batch_size = batch_size or self.batch_size
+        seen = set()
+        written_ids = set()
+        known_ids = {entry.get('node_id') for entry in manifest.files.values()}
+
+        for component_type, subdir, _ in COMPONENT_TYPES:
+            type_dir = components_dir / subdir
+            if not type_dir.exists():
+                continue
+
+            batch = []
+            with os.scandir(type_dir) as entries:
+                md_files = sorted(
+                    Path(entry.path) for entry in entries
+                    if entry.name.endswith('.md') and entry.is_file()
+                )
+
+            for md_file in md_files:
+                key = f"{subdir}/{md_file.name}"
+                seen.add(key)
+
+                previous = manifest.files.get(key)
+                if not manifest.is_changed(md_file, key):
+                    self.stats['files_unchanged'] += 1
+                    continue
+
+                print(f"  - {key} ({'changed' if previous else 'new'})")
+                data = self.parse_frontmatter(md_file)
+                if not data:
+                    continue
+                node_id = data['metadata'].get('id')
+                if not node_id:
+                    print(f"Warning: Skipping {md_file.name}: missing 'id' in frontmatter")
+                    continue
+
+                # A file whose id changed leaves its previous node behind
+                if previous and previous.get('node_id') not in (None, node_id):
+                    self._tombstone(previous['type'], [previous['node_id']], written_ids)
+
+                batch.append((data, md_file))
+                if len(batch) >= batch_size:
+                    self._flush_incremental_batch(component_type, subdir, batch, manifest, written_ids)
+                    batch = []
+
+            if batch:
+                self._flush_incremental_batch(component_type, subdir, batch, manifest, written_ids)
+
+        # Tombstone nodes whose source files were deleted
+        deleted = {}
+        for key in manifest.missing(seen):
+            entry = manifest.forget(key)
+            if entry.get('node_id') and entry.get('type'):
+                deleted.setdefault(entry['type'], []).append(entry['node_id'])
+        for component_type, node_ids in deleted.items():
+            self._tombstone(component_type, node_ids, written_ids)
+
+        # Tombstoning detached their incoming edges (or they never had any)
+        self.new_component_ids = written_ids - known_ids
+        if self.new_component_ids:
+            self._relink_parents(components_dir, manifest, self.new_component_ids)
+
+        manifest.save()
+
+    def _relink_parents(self, components_dir: Path, manifest: IngestManifest, target_ids: set):
+        """Write COMPOSED_OF/DEPENDS_ON edges from any ingested component to `target_ids`."""
+
+        pending = defaultdict(list)
+        for key, entry in sorted(manifest.files.items()):
+            component_type = entry.get('type')
+            links = entry.get('links')
+            if not component_type or (links is not None and target_ids.isdisjoint(links)):
+                continue
+
+            md_file = components_dir / key
+            data = self.parse_frontmatter(md_file)
+            if not data:
+                continue
+            row = self.build_component_row(component_type, data, md_file)
+            # Backfill manifests written before links were recorded
+            entry['links'] = self._component_links(row)
+            for rel_type in COMPONENT_LINK_TYPES:
+                pending[(component_type, rel_type)].extend(
+                    rel_row for rel_row in row['relationships'][rel_type] if rel_row['target'] in target_ids
+                )
+
+        for (component_type, rel_type), rel_rows in pending.items():
+            if rel_rows:
+                print(f"  - relinked {len(rel_rows)} {rel_type} edge(s) from unchanged {component_type}s")
+                self.write_relationship_batch(component_type, rel_type, rel_rows)
+
+    @staticmethod
+    def _component_links(row: Dict) -> List[str]:
+        """Ids of the components a write row points at."""
+        return sorted({
+            rel_row['target'] for rel_type in COMPONENT_LINK_TYPES for rel_row in row['relationships'][rel_type]
+        })
+
+    def _flush_incremental_batch(
+        self,
+        component_type: str,
+        subdir: str,
+        parsed: List,
+        manifest: IngestManifest,
+        written_ids: set
+    ):
+        """Write a batch of changed components and record them in the manifest."""
+
+        self._ensure_deferred_schema()
+        rows = self._flush_component_batch(component_type, parsed, replace_relationships=True)
+        for (_, md_file), row in zip(parsed, rows):
+            written_ids.add(row['id'])
+            manifest.record(
+                f"{subdir}/{md_file.name}", node_id=row['id'], node_type=component_type,
+                links=self._component_links(row)
+            )
+
+    def _tombstone(self, component_type: str, node_ids: List[str], keep_ids: set):
+        """Detach-delete nodes of removed files (unless re-created in this run)."""
+
+        node_ids = [node_id for node_id in node_ids if node_id not in keep_ids]
+        if not node_ids:
+            return
+
+        self._ensure_deferred_schema()
+        self.store.delete_nodes(self._label_for(component_type), node_ids)
+
+        self.stats['nodes_deleted'] += len(node_ids)
+        print(f"  - removed {len(node_ids)} deleted {component_type}(s): {', '.join(node_ids[:5])}")
+
+    def graph_modified(self) -> bool:
+        """True if this run created, updated or deleted anything in the graph."""
+        return any(self.stats[key] for key in GRAPH_CHANGE_STATS)
+
+    def bump_graph_version(self) -> int:
+        """Increment the :GraphMeta version stamp, returning the new version."""
+
+        return self.store.bump_graph_version()
+
     def print_stats(self):
         """Print ingestion statistics."""
         print("\n" + "="*60)
@@ -429,6 +1134,24 @@ class SOPGraphIngestion:
         print(f"SOPs created:          {self.stats['sops_created']}")
         print(f"Relationships created: {self.stats['relationships_created']}")
         print(f"Embeddings generated:  {self.stats['embeddings_generated']}")
+        if self.stats['embedding_requests']:
+            print(f"Embedding requests:    {self.stats['embedding_requests']}"
+                  f" ({self.stats['embedding_fallbacks']} per-item fallbacks)")
+        if self.embedding_cache is not None:
+            print(f"Cache hits:            {self.stats['embedding_cache_hits']}")
+            print(f"Cache misses:          {self.stats['embedding_cache_misses']}")
+        if self.stats['batches_written']:
+            print(f"Batches written:       {self.stats['batches_written']}")
+        if self.stats['chunks_created']:
+            print(f"Chunks created:        {self.stats['chunks_created']}")
+        if self.stats['files_unchanged'] or self.stats['nodes_deleted']:
+            print(f"Files unchanged:       {self.stats['files_unchanged']}")
+            print(f"Nodes deleted:         {self.stats['nodes_deleted']}")
+        stage_lines = self.metrics.format_table()
+        if stage_lines:
+            print("-"*60)
+            for line in stage_lines:
+                print(line)
         print("="*60)
 
 
@@ -438,8 +1161,65 @@ def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Ingest SOP documentation into Neo4j graph database')
     parser.add_argument('--no-embeddings', action='store_true',
-                        help='Skip generating OpenAI embeddings (no API key required)')
+                        help='Skip generating embeddings (no API key required)')
+    parser.add_argument('--embedding-provider', choices=EMBEDDING_PROVIDERS, default='openai',
+                        help='Embedding backend: openai (API), local (CPU feature hashing, no network) '
+                             'or fake (deterministic test vectors) (default: openai)')
+    parser.add_argument('--embedding-model', default=None,
+                        help='Embedding model for the openai provider (default: text-embedding-ada-002)')
+    parser.add_argument('--embedding-dimension', type=int, default=None,
+                        help='Embedding vector size (default: 1536 for openai, 384 for local); '
+                             'must match the vector index dimension')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Write components in batches with UNWIND statements instead of one file at a time')
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help='Number of components per write transaction in bulk mode (default: 500)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Full ingest through parallel parse/embed stages and a single bulk writer')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='Processes for parsing and cleaning in pipeline mode (default: CPU count)')
+    parser.add_argument('--embed-workers', type=int, default=4,
+                        help='Threads issuing embedding requests in pipeline mode (default: 4)')
+    parser.add_argument('--queue-size', type=int, default=8,
+                        help='Batches buffered between pipeline stages (default: 8)')
+    parser.add_argument('--chunk-tokens', type=int, default=None,
+                        help='Also embed token-counted section chunks of this size as :Chunk nodes (implies --bulk)')
+    parser.add_argument('--chunk-overlap', type=int, default=DEFAULT_CHUNK_OVERLAP,
+                        help=f'Tokens of overlap between consecutive chunks (default: {DEFAULT_CHUNK_OVERLAP})')
+    parser.add_argument('--embedding-cache', type=Path, default=None,
+                        help='Path of the on-disk embedding cache (default: .cache/embedding-cache.sqlite)')
+    parser.add_argument('--no-embedding-cache', action='store_true',
+                        help='Always call the embedding API, ignoring the on-disk cache')
+    parser.add_argument('--cache-max-entries', type=int, default=200000,
+                        help='Evict least recently used cache entries beyond this count (default: 200000)')
+    parser.add_argument('--cache-max-age-days', type=float, default=90,
+                        help='Evict cache entries not used for this many days (default: 90)')
+    parser.add_argument('--export-vector-index', type=Path, default=None,
+                        help='After ingesting, export all embeddings to a local vector index in this directory')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only ingest new or changed files and remove nodes of deleted files')
+    parser.add_argument('--manifest', type=Path, default=None,
+                        help='Path of the incremental ingestion manifest (default: .cache/ingest-manifest.json)')
+    parser.add_argument('--store', choices=('neo4j', 'memory'), default='neo4j',
+                        help='Graph backend: neo4j (server) or memory (embedded, saved to --store-path) '
+                             '(default: neo4j)')
+    parser.add_argument('--store-path', type=Path, default=None,
+                        help='File of the in-memory graph store (default: .cache/sop-graph-store.json)')
+    parser.add_argument('--skip-schema', action='store_true',
+                        help='Do not check for (and create) missing constraints and vector indexes before writing')
+    parser.add_argument('--profile', action='store_true',
+                        help='Run every Cypher statement with PROFILE and rank them by db hits (Neo4j only)')
+    parser.add_argument('--profile-json', type=Path, default=None,
+                        help='Write the Cypher profile report to this JSON file (implies --profile)')
+    parser.add_argument('--metrics-json', type=Path, default=None,
+                        help='Write per-stage timings and latency histograms to this JSON file')
+    parser.add_argument('--metrics-prom', type=Path, default=None,
+                        help='Write per-stage metrics in Prometheus text format to this file')
+    parser.add_argument('--outlier-threshold', type=float, default=5.0,
+                        help='Log single files or batches slower than this many seconds in any stage (default: 5)')
     args = parser.parse_args()
+    if args.store == 'memory' and (args.profile or args.profile_json):
+        parser.error('--profile/--profile-json profile Cypher and need --store neo4j')
 
     print("="*60)
     print("SOP Documentation Graph Ingestion Pipeline")
@@ -450,9 +1230,43 @@ def main():
     components_dir = base_dir / 'sop-components'
     graph_json_path = base_dir / 'graph' / 'sop-graph.json'
 
+    embedding_provider = None
+    if not args.no_embeddings and args.embedding_provider != 'openai':
+        embedding_provider = get_embedding_provider(
+            args.embedding_provider, model=args.embedding_model, dimension=args.embedding_dimension
+        )
+
+    manifest = None
+    if args.incremental:
+        manifest = IngestManifest(args.manifest or base_dir / '.cache' / 'ingest-manifest.json')
+
+    embedding_cache = None
+    if not args.no_embeddings and not args.no_embedding_cache:
+        embedding_cache = EmbeddingCache(
+            args.embedding_cache or base_dir / '.cache' / 'embedding-cache.sqlite',
+            max_entries=args.cache_max_entries,
+            max_age_days=args.cache_max_age_days
+        )
+
+    store = None
+    if args.store == 'memory':
+        store = InMemoryGraphStore(args.store_path or base_dir / '.cache' / 'sop-graph-store.json')
+
     # Initialize ingestion
     try:
-        ingestion = SOPGraphIngestion(use_embeddings=not args.no_embeddings)
+        ingestion = SOPGraphIngestion(
+            use_embeddings=not args.no_embeddings,
+            batch_size=args.batch_size,
+            embedding_cache=embedding_cache,
+            chunk_tokens=args.chunk_tokens,
+            chunk_overlap=args.chunk_overlap,
+            embedding_provider=embedding_provider,
+            embedding_model=args.embedding_model or "text-embedding-ada-002",
+            embedding_dimension=args.embedding_dimension,
+            metrics=IngestMetrics(outlier_threshold=args.outlier_threshold),
+            profiler=CypherProfiler() if args.profile or args.profile_json else None,
+            store=store
+        )
     except ValueError as e:
         print(f"\nERROR: {e}")
         print("\nPlease set environment variables:")
@@ -462,26 +1276,87 @@ def main():
         return 1
 
     try:
+        # Constraints first, so every MERGE and id lookup is an index seek.
+        # Incremental runs wait for the first write, so a no-op run stays offline.
+        if not args.skip_schema:
+            if manifest is not None:
+                ingestion.defer_schema()
+            else:
+                ingestion.ensure_schema()
+
         # Step 1: Ingest markdown files (atoms, molecules, organisms)
         if components_dir.exists():
             print(f"\nStep 1: Ingesting components from {components_dir}")
-            ingestion.ingest_directory(components_dir)
+            if manifest is not None:
+                ingestion.ingest_directory_incremental(components_dir, manifest)
+            elif args.pipeline:
+                ingestion.ingest_directory_pipelined(
+                    components_dir,
+                    parse_workers=args.parse_workers,
+                    embed_workers=args.embed_workers,
+                    queue_size=args.queue_size
+                )
+            elif args.bulk or args.chunk_tokens:
+                ingestion.ingest_directory_bulk(components_dir)
+            else:
+                ingestion.ingest_directory(components_dir)
         else:
             print(f"\nWarning: Components directory not found: {components_dir}")
 
         # Step 2: Ingest graph.json (SOPs and additional relationships)
         if graph_json_path.exists():
-            print(f"\nStep 2: Ingesting SOPs from {graph_json_path}")
-            ingestion.ingest_graph_json(graph_json_path)
+            graph_key = str(graph_json_path.relative_to(base_dir))
+            if manifest is not None and not manifest.is_changed(graph_json_path, graph_key):
+                if ingestion.new_component_ids:
+                    # Re-create SOP links to components that were re-added
+                    print(f"\nStep 2: Re-linking SOPs from unchanged {graph_json_path}")
+                    ingestion.ingest_graph_json(graph_json_path)
+                else:
+                    print(f"\nStep 2: Skipping unchanged {graph_json_path}")
+            else:
+                print(f"\nStep 2: Ingesting SOPs from {graph_json_path}")
+                ingestion.ingest_graph_json(graph_json_path)
+                if manifest is not None:
+                    manifest.record(graph_key)
+                    manifest.save()
         else:
             print(f"\nWarning: Graph JSON not found: {graph_json_path}")
 
+        # Invalidate query result caches (see GraphRAGQuery) if anything changed
+        if ingestion.graph_modified():
+            version = ingestion.bump_graph_version()
+            print(f"\nGraph version: {version}")
+
+        # Step 3: Export the local vector index (optional)
+        if args.export_vector_index:
+            index = LocalVectorIndex.build(ingestion.store.embedding_records())
+            index.save(args.export_vector_index)
+            print(f"\nStep 3: Exported {len(index)} embeddings to {args.export_vector_index}")
+
         # Print statistics
         ingestion.print_stats()
 
+        if args.metrics_json:
+            ingestion.metrics.to_json(args.metrics_json)
+            print(f"Stage metrics written to {args.metrics_json}")
+        if args.metrics_prom:
+            ingestion.metrics.write_prometheus(args.metrics_prom)
+            print(f"Prometheus metrics written to {args.metrics_prom}")
+
+        if ingestion.profiler is not None:
+            print("\nCypher profile (ranked by db hits):")
+            for line in ingestion.profiler.format_report():
+                print(line)
+            if args.profile_json:
+                ingestion.profiler.to_json(args.profile_json)
+                print(f"Cypher profile written to {args.profile_json}")
+
     finally:
         ingestion.close()
 
+    if args.store == 'memory':
+        print(f"Graph saved to {store.path}")
+
     return 0
 
 
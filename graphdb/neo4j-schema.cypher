@@ -11,6 +11,11 @@
 // STEP 1: Create Constraints (Uniqueness & Existence)
 // ----------------------------------------------------------------------------
 
+// Component constraints (shared label of Atom, Molecule, Organism and SOP
+// nodes; id lookups of unknown component type match on :Component)
+CREATE CONSTRAINT component_id_unique IF NOT EXISTS
+FOR (c:Component) REQUIRE c.id IS UNIQUE;
+
 // Atom constraints
 CREATE CONSTRAINT atom_id_unique IF NOT EXISTS
 FOR (a:Atom) REQUIRE a.id IS UNIQUE;
@@ -39,6 +44,14 @@ FOR (s:SOP) REQUIRE s.id IS UNIQUE;
 CREATE CONSTRAINT sop_id_exists IF NOT EXISTS
 FOR (s:SOP) REQUIRE s.id IS NOT NULL;
 
+// Chunk constraints (section chunks of long components)
+CREATE CONSTRAINT chunk_id_unique IF NOT EXISTS
+FOR (c:Chunk) REQUIRE c.id IS UNIQUE;
+
+// GraphMeta constraints (graph version stamp bumped by each ingestion run)
+CREATE CONSTRAINT graph_meta_id_unique IF NOT EXISTS
+FOR (g:GraphMeta) REQUIRE g.id IS UNIQUE;
+
 // Concept constraints
 CREATE CONSTRAINT concept_name_unique IF NOT EXISTS
 FOR (c:Concept) REQUIRE c.name IS UNIQUE;
@@ -144,6 +157,16 @@ CALL db.index.vector.createNodeIndex(
 ) YIELD name, type, labelsOrTypes, properties, options
 RETURN name, type, labelsOrTypes, properties, options;
 
+// Create vector index for Chunk embeddings (ingestion with --chunk-tokens)
+CALL db.index.vector.createNodeIndex(
+  'chunk_embedding_index',
+  'Chunk',
+  'embedding',
+  1536,
+  'cosine'
+) YIELD name, type, labelsOrTypes, properties, options
+RETURN name, type, labelsOrTypes, properties, options;
+
 // Create vector index for Concept embeddings
 CALL db.index.vector.createNodeIndex(
   'concept_embedding_index',
@@ -285,7 +308,7 @@ SET c4.definition = 'Creating and configuring user accounts and access rights',
 // RETURN c.id, c.title, c.type;
 
 // Example 4: Find component dependencies (2 hops)
-// MATCH path = (c:Atom {id: 'atom-password-reset'})-[:DEPENDS_ON*1..2]->(dep)
+// MATCH path = (c:Component {id: 'atom-password-reset'})-[:DEPENDS_ON*1..2]->(dep)
 // RETURN path;
 
 // Example 5: Find all SOPs using a specific atom
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+GraphRAG HTTP Query Service
+===========================
+asyncio HTTP service (standard library only) around AsyncGraphRAGQuery.
+
+Concurrent requests that arrive within a short window (`--batch-window-ms`)
+are coalesced into one `hybrid_search_many` call: one batched embedding
+request, one vector query per index and one graph expansion query for the
+whole batch. The results are then fanned back out to the waiting requests.
+
+Endpoints:
+    POST /query   {"query": "...", "top_k": 5, "expand_hops": 2, "node_type": null, "chunk_level": false}
+    GET  /stats   request latency p50/p99, batch sizes, cache hit rates
+    GET  /health
+
+Usage:
+    python graphdb/query_server.py --port 8080
+    python graphdb/query_server.py --embedding-provider local --embedding-dimension 384
+    python graphdb/query_server.py --embedding-provider local --store-path .cache/sop-graph-store.json
+
+The service takes any object with an async `hybrid_search_many` (see
+QueryService), so it can be run against local stand-ins for Neo4j and the
+embedding provider. With `--store-path` it serves an in-memory graph store
+saved by ingest_sops_to_graph.py and needs no Neo4j server.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from dataclasses import asdict
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .embeddings import EMBEDDING_PROVIDERS, get_embedding_provider
+    from .graph_store import InMemoryGraphStore
+    from .graphrag_query_async import AsyncGraphRAGQuery
+    from .vector_index import LocalVectorIndex
+except ImportError:
+    from embeddings import EMBEDDING_PROVIDERS, get_embedding_provider
+    from graph_store import InMemoryGraphStore
+    from graphrag_query_async import AsyncGraphRAGQuery
+    from vector_index import LocalVectorIndex
+
+# Coalescing window and batch cap
+BATCH_WINDOW_MS = 5.0
+MAX_BATCH_SIZE = 64
+
+# Recent samples kept for percentiles
+STATS_WINDOW = 10000
+
+MAX_BODY_BYTES = 1 << 20
+
+# Accepted ranges of the /query parameters (larger values are rejected with 400)
+MAX_TOP_K = 100
+MAX_EXPAND_HOPS = 5
+NODE_TYPES = ('atom', 'molecule', 'organism', 'sop')
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 if empty)."""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class ServerStats:
+    """Request latency and batch size statistics over a sliding window."""
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.started = time.time()
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+
+    def record_request(self, seconds: float, ok: bool = True):
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self._latencies.append(seconds)
+
+    def record_batch(self, size: int):
+        self.batches += 1
+        self._batch_sizes.append(size)
+
+    def snapshot(self) -> Dict:
+        latencies = sorted(self._latencies)
+        sizes = sorted(self._batch_sizes)
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'uptime_s': round(time.time() - self.started, 1),
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50) * 1000, 2),
+                'p99': round(percentile(latencies, 0.99) * 1000, 2),
+                'max': round(latencies[-1] * 1000, 2) if latencies else 0.0
+            },
+            'batches': {
+                'count': self.batches,
+                'mean_size': round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+                'p50_size': percentile(sizes, 0.50),
+                'p99_size': percentile(sizes, 0.99),
+                'max_size': sizes[-1] if sizes else 0
+            }
+        }
+
+
+class QueryBatcher:
+    """Coalesces concurrent searches with the same parameters into hybrid_search_many calls."""
+
+    def __init__(self, graphrag, window_ms: float = BATCH_WINDOW_MS, max_batch_size: int = MAX_BATCH_SIZE,
+                 stats: Optional[ServerStats] = None):
+        self.graphrag = graphrag
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.stats = stats or ServerStats()
+
+        self._pending: Dict[Tuple, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+        self._tasks = set()
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        expand_hops: int = 2,
+        node_type: Optional[str] = None,
+        chunk_level: bool = False
+    ):
+        """Queue a search and wait for its batch to complete."""
+
+        loop = asyncio.get_running_loop()
+        key = (top_k, expand_hops, node_type, chunk_level)
+        future = loop.create_future()
+
+        batch = self._pending.setdefault(key, [])
+        batch.append((query, future))
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Tuple):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, key: Tuple, batch: List[Tuple[str, asyncio.Future]]):
+        self.stats.record_batch(len(batch))
+        top_k, expand_hops, node_type, chunk_level = key
+
+        try:
+            results = await self.graphrag.hybrid_search_many(
+                [query for query, _ in batch],
+                top_k=top_k,
+                expand_hops=expand_hops,
+                node_type=node_type,
+                chunk_level=chunk_level
+            )
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # Retry one query per call so only the failing requests get the error
+            await asyncio.gather(*(self._run_batch(key, [item]) for item in batch))
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class QueryService:
+    """HTTP/1.1 front end: parses requests, routes them and writes JSON responses."""
+
+    def __init__(self, graphrag, window_ms: float = BATCH_WINDOW_MS, max_batch_size: int = MAX_BATCH_SIZE):
+        self.graphrag = graphrag
+        self.stats = ServerStats()
+        self.batcher = QueryBatcher(graphrag, window_ms, max_batch_size, self.stats)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it (keep-alive)."""
+
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+
+                started = time.perf_counter()
+                status, payload = await self.route(method, path, body)
+                if path == '/query':
+                    self.stats.record_request(time.perf_counter() - started, status == HTTPStatus.OK)
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Dict]:
+        """Dispatch a request, returning (status, JSON payload)."""
+
+        if path == '/health' and method == 'GET':
+            return HTTPStatus.OK, {'status': 'ok'}
+
+        if path == '/stats' and method == 'GET':
+            stats = self.stats.snapshot()
+            if hasattr(self.graphrag, 'cache_stats'):
+                stats['caches'] = self.graphrag.cache_stats()
+            return HTTPStatus.OK, stats
+
+        if path == '/query' and method == 'POST':
+            try:
+                request = json.loads(body or b'{}')
+                query = request['query']
+                if not isinstance(query, str) or not query.strip():
+                    raise ValueError("'query' must be a non-empty string")
+                params = {
+                    'top_k': int(request.get('top_k', 5)),
+                    'expand_hops': int(request.get('expand_hops', 2)),
+                    'node_type': request.get('node_type'),
+                    'chunk_level': bool(request.get('chunk_level', False))
+                }
+                if not 1 <= params['top_k'] <= MAX_TOP_K:
+                    raise ValueError(f"'top_k' must be between 1 and {MAX_TOP_K}")
+                if not 0 <= params['expand_hops'] <= MAX_EXPAND_HOPS:
+                    raise ValueError(f"'expand_hops' must be between 0 and {MAX_EXPAND_HOPS}")
+                if params['node_type'] is not None and params['node_type'] not in NODE_TYPES:
+                    raise ValueError(f"'node_type' must be one of {', '.join(NODE_TYPES)}")
+            except (ValueError, KeyError, TypeError) as e:
+                return HTTPStatus.BAD_REQUEST, {'error': f"Invalid request: {e}"}
+
+            try:
+                results = await self.batcher.search(query, **params)
+            except Exception as e:
+                print(f"Warning: Query failed: {e}")
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+
+            return HTTPStatus.OK, {'query': query, 'results': [asdict(r) for r in results]}
+
+        return HTTPStatus.NOT_FOUND, {'error': f"No route for {method} {path}"}
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Read one request; None at end of stream."""
+
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0))
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"Request body too large: {length} bytes")
+        body = await reader.readexactly(length) if length else b''
+
+        return method.upper(), target.split('?', 1)[0], headers, body
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload: Dict,
+                              keep_alive: bool):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(service: QueryService, host: str = '127.0.0.1', port: int = 8080):
+    """Run the HTTP service until cancelled."""
+
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"GraphRAG query service listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """Start the GraphRAG query service."""
+
+    parser = argparse.ArgumentParser(description='GraphRAG HTTP query service with request batching')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port (default: 8080)')
+    parser.add_argument('--batch-window-ms', type=float, default=BATCH_WINDOW_MS,
+                        help=f'Window for coalescing concurrent queries (default: {BATCH_WINDOW_MS})')
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE,
+                        help=f'Queries per batch before flushing early (default: {MAX_BATCH_SIZE})')
+    parser.add_argument('--embedding-provider', choices=EMBEDDING_PROVIDERS, default='openai',
+                        help='Embedding backend; must match the one used for ingestion (default: openai)')
+    parser.add_argument('--embedding-model', default=None,
+                        help='Embedding model for the openai provider (default: text-embedding-ada-002)')
+    parser.add_argument('--embedding-dimension', type=int, default=None,
+                        help='Embedding vector size (default: 1536 for openai, 384 for local)')
+    parser.add_argument('--vector-index', type=Path, default=None,
+                        help='Directory of a local vector index to use instead of Neo4j vector search')
+    parser.add_argument('--store-path', type=Path, default=None,
+                        help='Serve an in-memory graph store saved by ingest_sops_to_graph.py --store memory '
+                             'instead of Neo4j')
+    args = parser.parse_args()
+
+    try:
+        embedding_provider = get_embedding_provider(
+            args.embedding_provider, model=args.embedding_model, dimension=args.embedding_dimension
+        )
+        vector_index = LocalVectorIndex.load(args.vector_index) if args.vector_index else None
+        store = InMemoryGraphStore.load(args.store_path) if args.store_path else None
+        graphrag = AsyncGraphRAGQuery(embedding_provider=embedding_provider, vector_index=vector_index, store=store)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    service = QueryService(graphrag, args.batch_window_ms, args.max_batch_size)
+
+    async def run():
+        try:
+            await serve(service, args.host, args.port)
+        finally:
+            await graphrag.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
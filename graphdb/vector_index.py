@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Local Vector Index for GraphRAG
+===============================
+In-process alternative to Neo4j vector search. Embeddings are stored as one
+contiguous, L2-normalized float32 matrix (rows grouped by node type) with an
+id table, saved as `.npy` files and loaded with memory mapping. Top-k is
+exact: a matrix-vector product followed by `argpartition`.
+
+Scores use the same scale as Neo4j's cosine vector index, (1 + cos) / 2, so
+results are interchangeable with `db.index.vector.queryNodes`.
+
+Usage:
+    # Export embeddings from Neo4j after ingestion
+    python graphdb/vector_index.py build --output .cache/vector-index
+
+    # Use it from GraphRAGQuery
+    graphrag = GraphRAGQuery(vector_index=LocalVectorIndex.load('.cache/vector-index'))
+
+Requirements:
+    pip install numpy neo4j
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Metadata returned with each hit (mirrors GraphRAGQuery.vector_search)
+RECORD_FIELDS = ('id', 'type', 'title', 'content', 'department', 'tags')
+
+EXPORT_CYPHER = """
+    MATCH (n:Component)
+    WHERE n.embedding IS NOT NULL
+    RETURN
+        n.id as id,
+        n.type as type,
+        n.title as title,
+        n.content as content,
+        n.department as department,
+        n.tags as tags,
+        n.embedding as embedding
+"""
+
+
+class LocalVectorIndex:
+    """Exact top-k cosine search over an in-memory (or memory-mapped) matrix."""
+
+    def __init__(self, matrix, records: List[Dict], type_ranges: Dict[str, Tuple[int, int]]):
+        """Wrap a normalized float32 matrix whose rows line up with `records`."""
+
+        if np is None:
+            raise ImportError("LocalVectorIndex requires numpy: pip install numpy")
+
+        self.matrix = matrix
+        self.records = records
+        self.type_ranges = type_ranges
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1] if len(self.records) else 0
+
+    @classmethod
+    def build(cls, entries: Iterable[Dict]) -> 'LocalVectorIndex':
+        """Build an index from dicts with RECORD_FIELDS plus 'embedding'."""
+
+        if np is None:
+            raise ImportError("LocalVectorIndex requires numpy: pip install numpy")
+
+        entries = sorted(
+            (e for e in entries if e.get('embedding')),
+            key=lambda e: ((e.get('type') or '').lower(), e['id'])
+        )
+        if not entries:
+            return cls(np.zeros((0, 0), dtype=np.float32), [], {})
+
+        matrix = np.asarray([e['embedding'] for e in entries], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1.0, norms)
+
+        records = [{field: e.get(field) for field in RECORD_FIELDS} for e in entries]
+
+        type_ranges = {}
+        for row, record in enumerate(records):
+            node_type = (record['type'] or '').lower()
+            start, _ = type_ranges.get(node_type, (row, row))
+            type_ranges[node_type] = (start, row + 1)
+
+        return cls(matrix, records, type_ranges)
+
+    @classmethod
+    def from_neo4j(cls, driver) -> 'LocalVectorIndex':
+        """Export every embedded Atom/Molecule/Organism/SOP from Neo4j."""
+
+        with driver.session() as session:
+            return cls.build(record.data() for record in session.run(EXPORT_CYPHER))
+
+    def save(self, directory: Path):
+        """Write embeddings.npy plus the id table (index.json)."""
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        np.save(directory / 'embeddings.npy', np.ascontiguousarray(self.matrix, dtype=np.float32))
+
+        tmp_path = directory / 'index.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'records': self.records,
+                'typeRanges': {t: list(r) for t, r in self.type_ranges.items()}
+            }, f)
+        os.replace(tmp_path, directory / 'index.json')
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> 'LocalVectorIndex':
+        """Load a saved index; the matrix is memory-mapped unless `mmap` is False."""
+
+        if np is None:
+            raise ImportError("LocalVectorIndex requires numpy: pip install numpy")
+
+        directory = Path(directory)
+        matrix = np.load(directory / 'embeddings.npy', mmap_mode='r' if mmap else None)
+        with open(directory / 'index.json', 'r', encoding='utf-8') as f:
+            table = json.load(f)
+
+        return cls(matrix, table['records'], {t: tuple(r) for t, r in table['typeRanges'].items()})
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        node_type: Optional[str] = None
+    ) -> List[Dict]:
+        """Exact top-k search, optionally restricted to one node type's row range."""
+
+        if node_type:
+            start, end = self.type_ranges.get(node_type.lower(), (0, 0))
+        else:
+            start, end = 0, len(self.records)
+        if end <= start or top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self.matrix[start:end] @ query
+        k = min(top_k, end - start)
+        if k < end - start:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(end - start)
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        results = []
+        for i in top:
+            result = dict(self.records[start + i])
+            result['score'] = (1.0 + float(scores[i])) / 2.0
+            results.append(result)
+        return results
+
+
+def main():
+    """Build a local vector index from Neo4j."""
+
+    parser = argparse.ArgumentParser(description='Build the local NumPy vector index from Neo4j embeddings')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help='Export embeddings from Neo4j into a local index')
+    build.add_argument('--output', type=Path, default=Path('.cache/vector-index'),
+                       help='Directory for embeddings.npy and index.json (default: .cache/vector-index)')
+    args = parser.parse_args()
+
+    password = os.getenv("NEO4J_PASSWORD")
+    if not password:
+        print("ERROR: Neo4j password required via NEO4J_PASSWORD env var")
+        return 1
+
+    from neo4j import GraphDatabase
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+        auth=(os.getenv("NEO4J_USER", "neo4j"), password)
+    )
+    try:
+        index = LocalVectorIndex.from_neo4j(driver)
+        index.save(args.output)
+    finally:
+        driver.close()
+
+    print(f"✓ Indexed {len(index)} nodes ({index.dimension} dimensions) into {args.output}")
+    for node_type, (start, end) in sorted(index.type_ranges.items()):
+        print(f"  {node_type}: {end - start}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
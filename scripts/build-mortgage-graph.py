@@ -2,24 +2,147 @@
 """
 Build SOP Graph from Markdown Files
 Extracts metadata from frontmatter to create a queryable knowledge graph
+
+Frontmatter is parsed in a process pool and cached in
+.cache/mortgage-graph-cache.json keyed by path, mtime, size and content hash,
+so only new or changed SOPs are parsed on the next run. The graph is written
+with a streaming JSON encoder.
+
+Usage:
+    python scripts/build-mortgage-graph.py
+    python scripts/build-mortgage-graph.py --sop-dir sops --workers 8
+    python scripts/build-mortgage-graph.py --no-cache --workers 1
 """
 
+import argparse
+import hashlib
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import yaml
 
+CACHE_VERSION = 1
+
+# Below this many files to parse, a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+PARSE_CHUNKSIZE = 32
+
+# libyaml's C loader is much faster than the pure-Python one when available
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 def extract_frontmatter(md_content):
     """Extract YAML frontmatter from markdown file"""
     match = re.match(r'^---\s*\n(.*?)\n---\s*\n', md_content, re.DOTALL)
     if match:
         try:
-            return yaml.safe_load(match.group(1))
+            return yaml.load(match.group(1), Loader=YAML_LOADER)
         except yaml.YAMLError:
             return {}
     return {}
 
-def build_graph_from_sops(sop_dir):
+def parse_sop_file(task):
+    """
+    Hash and parse one SOP file (runs in a worker process).
+
+    `task` is (path, known_hash). If the content hash equals known_hash the
+    file is not parsed and metadata is None (the cached metadata is reused).
+    Metadata is normalized through JSON (dates become strings) so fresh and
+    cached results are identical. Returns None if the file cannot be read or
+    is not UTF-8, so the caller can skip it.
+    """
+    path, known_hash = task
+    try:
+        raw = Path(path).read_bytes()
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if content_hash == known_hash:
+            return content_hash, None
+        text = raw.decode('utf-8')
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Warning: Skipping unreadable SOP file {path}: {e}")
+        return None
+
+    metadata = extract_frontmatter(text)
+    if not isinstance(metadata, dict):
+        metadata = {}
+    return content_hash, json.loads(json.dumps(metadata, default=str))
+
+def load_cache(cache_path):
+    """Load the frontmatter cache (empty if missing, unreadable or outdated)"""
+    if not cache_path or not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read cache {cache_path}, rebuilding: {e}")
+        return {}
+    if data.get('version') != CACHE_VERSION:
+        return {}
+    return data.get('files', {})
+
+def save_cache(cache_path, files):
+    """Write the frontmatter cache atomically"""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f)
+    os.replace(tmp_path, cache_path)
+
+def parse_sop_files(sop_path, sop_files, cache_path=None, workers=None):
+    """
+    Return {relative path: metadata} for all SOP files, in file order.
+
+    Files whose mtime and size match the cache are not read at all; files
+    that were only touched are hashed but not re-parsed. Unreadable or
+    non-UTF-8 files are left out (and not cached).
+    """
+    cached = load_cache(cache_path)
+    files = {}
+    tasks = []
+
+    for sop_file in sop_files:
+        key = sop_file.relative_to(sop_path).as_posix()
+        stat = sop_file.stat()
+        entry = cached.get(key)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            files[key] = entry
+            continue
+        files[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        tasks.append((key, str(sop_file), entry))
+
+    workers = workers or os.cpu_count() or 1
+    jobs = [(path, entry['hash'] if entry else None) for _, path, entry in tasks]
+    if workers > 1 and len(jobs) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_sop_file, jobs, chunksize=PARSE_CHUNKSIZE))
+    else:
+        results = [parse_sop_file(job) for job in jobs]
+
+    reparsed = skipped = 0
+    for (key, _, entry), result in zip(tasks, results):
+        if result is None:
+            del files[key]
+            skipped += 1
+            continue
+        content_hash, metadata = result
+        if metadata is None:
+            metadata = entry['metadata']
+        else:
+            reparsed += 1
+        files[key].update(hash=content_hash, metadata=metadata)
+
+    print(f"Parsed {reparsed} new or changed SOP files ({len(sop_files) - reparsed - skipped} unchanged)")
+    if skipped:
+        print(f"Skipped {skipped} unreadable SOP files")
+
+    if cache_path and (tasks or len(files) != len(cached)):
+        save_cache(cache_path, files)
+
+    return {key: entry['metadata'] for key, entry in files.items()}
+
+def build_graph_from_sops(sop_dir, cache_path=None, workers=None):
     """Build graph structure from SOP markdown files"""
     nodes = {}
     edges = []
@@ -27,12 +150,13 @@ def build_graph_from_sops(sop_dir):
 
     # Parse all SOP files
     sop_path = Path(sop_dir).resolve()
-    sop_files = list(sop_path.glob('**/*.md'))
+    sop_files = sorted(sop_path.glob('**/*.md'))
     print(f"Found {len(sop_files)} SOP files")
 
+    parsed = parse_sop_files(sop_path, sop_files, cache_path, workers)
+
     for sop_file in sop_files:
-        content = sop_file.read_text()
-        metadata = extract_frontmatter(content)
+        metadata = parsed.get(sop_file.relative_to(sop_path).as_posix())
 
         if not metadata or 'id' not in metadata:
             continue
@@ -119,16 +243,38 @@ def build_graph_from_sops(sop_dir):
         'edges': edges
     }
 
-if __name__ == '__main__':
+def write_graph_json(graph, output_path):
+    """Stream the graph to disk chunk by chunk (same output as json.dumps(indent=2))"""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for chunk in json.JSONEncoder(indent=2).iterencode(graph):
+            f.write(chunk)
+    os.replace(tmp_path, output_path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the mortgage SOP graph from markdown frontmatter')
+    parser.add_argument('--sop-dir', type=Path, default=Path('sops/mortgage'),
+                        help='Directory of SOP markdown files (default: sops/mortgage)')
+    parser.add_argument('--output', type=Path, default=Path('graph/mortgage-sop-graph.json'),
+                        help='Graph JSON output path (default: graph/mortgage-sop-graph.json)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for parsing frontmatter (default: CPU count; 1 parses serially)')
+    parser.add_argument('--cache', type=Path, default=Path('.cache/mortgage-graph-cache.json'),
+                        help='Parsed frontmatter cache (default: .cache/mortgage-graph-cache.json)')
+    parser.add_argument('--no-cache', action='store_true', help='Parse every file, ignoring the cache')
+    args = parser.parse_args()
+
     # Build graph from mortgage SOPs
-    graph = build_graph_from_sops('sops/mortgage')
+    graph = build_graph_from_sops(args.sop_dir, None if args.no_cache else args.cache, args.workers)
 
     # Write to graph directory
-    output_path = Path('graph/mortgage-sop-graph.json')
-    output_path.parent.mkdir(exist_ok=True)
-    output_path.write_text(json.dumps(graph, indent=2))
+    write_graph_json(graph, args.output)
 
     print(f"\n✓ Graph built successfully!")
     print(f"  Nodes: {graph['metadata']['nodeCount']}")
     print(f"  Edges: {graph['metadata']['edgeCount']}")
-    print(f"  Output: {output_path}")
+    print(f"  Output: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Make the graphdb modules importable the way the scripts import them, plus shared fixtures."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for directory in (ROOT / 'graphdb', ROOT / 'benchmarks'):
+    if str(directory) not in sys.path:
+        sys.path.insert(0, str(directory))
+
+COMPONENTS_DIR = ROOT / 'sop-components'
+
+
+@pytest.fixture(scope='session')
+def components_dir():
+    return COMPONENTS_DIR
+
+
+@pytest.fixture(scope='session')
+def ingest():
+    """Bulk-ingest the sop-components into a store with the local embedding provider."""
+
+    from embeddings import get_embedding_provider
+    from ingest_sops_to_graph import SOPGraphIngestion
+
+    def ingest_components(store, components_dir=COMPONENTS_DIR, **kwargs):
+        ingestion = SOPGraphIngestion(store=store, embedding_provider=get_embedding_provider('local'), **kwargs)
+        ingestion.ingest_directory_bulk(components_dir)
+        return ingestion
+
+    return ingest_components
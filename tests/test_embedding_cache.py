@@ -0,0 +1,44 @@
+"""EmbeddingCache: round trips and eviction during long runs."""
+
+from embedding_cache import EmbeddingCache
+
+
+def put_texts(cache, start, count):
+    texts = [f"text {i}" for i in range(start, start + count)]
+    cache.put_many('model', texts, [[float(i), 1.0] for i in range(start, start + count)])
+    return texts
+
+
+def test_round_trip(tmp_path):
+    cache = EmbeddingCache(tmp_path / 'cache.sqlite')
+    put_texts(cache, 0, 3)
+
+    assert cache.get_many('model', ['text 1', 'missing', 'text 2']) == [[1.0, 1.0], None, [2.0, 1.0]]
+    assert cache.get('other-model', 'text 1') is None
+    cache.close()
+
+
+def test_put_many_evicts_periodically(tmp_path):
+    cache = EmbeddingCache(tmp_path / 'cache.sqlite', max_entries=5, evict_every=4)
+
+    put_texts(cache, 0, 3)
+    assert len(cache) == 3
+    put_texts(cache, 3, 3)
+    assert len(cache) == 5
+    put_texts(cache, 6, 3)
+    assert len(cache) == 8
+
+    # The most recently inserted entries survive
+    put_texts(cache, 9, 1)
+    assert len(cache) == 5
+    assert cache.get('model', 'text 9') is not None
+    assert cache.get('model', 'text 0') is None
+    cache.close()
+
+
+def test_no_eviction_without_limits(tmp_path):
+    cache = EmbeddingCache(tmp_path / 'cache.sqlite', evict_every=1)
+    put_texts(cache, 0, 10)
+
+    assert len(cache) == 10
+    cache.close()
@@ -0,0 +1,97 @@
+"""Embedding providers, batch packing and batched embedding with FakeEmbeddingClient."""
+
+import pytest
+
+from embeddings import (
+    EmbeddingProvider, FakeEmbeddingClient, OpenAIEmbeddingProvider, estimate_tokens, pack_embedding_batches
+)
+from graph_store import InMemoryGraphStore
+from ingest_sops_to_graph import SOPGraphIngestion
+
+
+def make_ingestion(client, **kwargs):
+    return SOPGraphIngestion(store=InMemoryGraphStore(), embedding_client=client, **kwargs)
+
+
+def test_pack_respects_input_limit_and_order():
+    texts = [f"text {i}" for i in range(10)]
+    batches = pack_embedding_batches(texts, max_inputs=3, max_tokens=10 ** 6)
+
+    assert all(len(batch) <= 3 for batch in batches)
+    assert [i for batch in batches for i in batch] == list(range(10))
+
+
+def test_pack_respects_token_limit():
+    texts = ["word " * 40, "word " * 40, "word " * 40, "short"]
+    limit = estimate_tokens(texts[0]) * 2
+    batches = pack_embedding_batches(texts, max_inputs=100, max_tokens=limit)
+
+    for batch in batches:
+        assert sum(estimate_tokens(texts[i]) for i in batch) <= limit
+    assert [i for batch in batches for i in batch] == list(range(4))
+
+
+def test_pack_puts_oversized_text_alone():
+    texts = ["a", "word " * 100, "b"]
+    batches = pack_embedding_batches(texts, max_inputs=100, max_tokens=10)
+
+    assert [1] in batches
+
+
+def test_provider_maps_shuffled_response_to_input_order():
+    client = FakeEmbeddingClient(dimension=8, shuffle_response=True)
+    provider = OpenAIEmbeddingProvider(client=client, dimension=8)
+    texts = [f"input {i}" for i in range(6)]
+
+    assert provider.embed(texts) == [client.embed_text(text) for text in texts]
+
+
+def test_ingestion_batches_requests_within_limits():
+    client = FakeEmbeddingClient(dimension=8, max_inputs=4)
+    ingestion = make_ingestion(client, embedding_batch_inputs=4)
+    texts = [f"component text {i}" for i in range(10)]
+
+    embeddings = ingestion.embed_clean_texts(texts)
+
+    assert [len(call) for call in client.calls] == [4, 4, 2]
+    assert embeddings == [client.embed_text(text) for text in texts]
+    assert ingestion.stats['embedding_requests'] == 3
+    assert ingestion.stats['embedding_fallbacks'] == 0
+
+
+def test_failed_batch_falls_back_to_per_item_requests():
+    client = FakeEmbeddingClient(dimension=8, fail_inputs={'bad text'})
+    ingestion = make_ingestion(client, embedding_batch_inputs=10)
+    texts = ['good one', 'bad text', 'good two']
+
+    embeddings = ingestion.embed_clean_texts(texts)
+
+    # One failed batch, then one request per input
+    assert client.calls == [texts, ['good one'], ['bad text'], ['good two']]
+    assert embeddings[0] == client.embed_text('good one')
+    assert embeddings[1] is None
+    assert embeddings[2] == client.embed_text('good two')
+    assert ingestion.stats['embedding_fallbacks'] == 3
+
+
+def test_provider_without_embed_fails_on_construction():
+    class PartialProvider(EmbeddingProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        PartialProvider('partial', 8)
+
+
+def test_ada_002_reports_its_fixed_dimension(capsys):
+    provider = OpenAIEmbeddingProvider('text-embedding-ada-002', client=FakeEmbeddingClient(), dimension=256)
+
+    assert provider.dimension == 1536
+    assert provider._request_dimension is None
+    assert 'ignoring dimension 256' in capsys.readouterr().out
+
+
+def test_shortened_dimension_is_requested_for_other_models():
+    provider = OpenAIEmbeddingProvider('text-embedding-3-small', client=FakeEmbeddingClient(), dimension=256)
+
+    assert provider.dimension == 256
+    assert provider._request_dimension == 256
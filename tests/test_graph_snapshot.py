@@ -0,0 +1,42 @@
+"""GraphSnapshot: lossless round trip of graph JSON documents."""
+
+import json
+from pathlib import Path
+
+from graph_snapshot import GraphSnapshot, compile_snapshot
+
+SOP_GRAPH = Path(__file__).resolve().parent.parent / 'graph' / 'sop-graph.json'
+
+
+def round_trip(document, tmp_path):
+    compile_snapshot(document, tmp_path / 'graph.snap')
+    snapshot = GraphSnapshot(tmp_path / 'graph.snap')
+    try:
+        return snapshot.to_dict(), snapshot.node('a')
+    finally:
+        snapshot.close()
+
+
+def test_non_string_type_and_title_survive(tmp_path):
+    document = {
+        'nodes': [
+            {'id': 'a', 'type': None, 'title': 5, 'x': 1},
+            {'id': 'b', 'type': 'atom', 'title': 'B'},
+            {'id': 'c', 'title': ['x', 'y']}
+        ],
+        'edges': [{'source': 'a', 'target': 'b', 'type': 'DEPENDS_ON'}]
+    }
+
+    restored, node = round_trip(document, tmp_path)
+
+    assert restored == document
+    assert node == {'id': 'a', 'type': None, 'title': 5, 'x': 1}
+    assert node['type'] is None and node['title'] == 5
+
+
+def test_repository_graph_round_trips(tmp_path):
+    with open(SOP_GRAPH) as f:
+        document = json.load(f)
+
+    restored, _ = round_trip(document, tmp_path)
+    assert restored == document
@@ -0,0 +1,249 @@
+"""InMemoryGraphStore: ingestion, expansion (checked against the Neo4j backend) and tombstoning."""
+
+import asyncio
+import shutil
+
+import pytest
+
+from embeddings import get_embedding_provider
+from fake_neo4j import InMemoryNeo4jDriver
+from graph_engine import CompiledGraph
+from graph_store import GraphStore, InMemoryGraphStore, Neo4jGraphStore
+from graphrag_query import GraphRAGQuery
+from graphrag_query_async import AsyncGraphRAGQuery
+from ingest_manifest import IngestManifest
+from ingest_sops_to_graph import SOPGraphIngestion
+
+
+@pytest.fixture(scope='module')
+def store(ingest):
+    store = InMemoryGraphStore()
+    ingest(store)
+    return store
+
+
+def test_incomplete_backend_fails_on_construction():
+    class PartialStore(GraphStore):
+        def upsert_nodes(self, label, rows):
+            pass
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def test_component_nodes(store, components_dir):
+    atom_count = len(list((components_dir / 'atoms').glob('*.md')))
+
+    assert len(store.find_nodes('Atom', limit=1000)) == atom_count
+    assert store.find_nodes(id='atom-password-reset')[0]['type'] == 'atom'
+    assert 'embedding' not in store.find_nodes(id='atom-password-reset')[0]
+    assert all(node['department'] == 'IT' for node in store.find_nodes('Atom', department='IT'))
+
+
+def test_edges(store):
+    assert store.has_compliance('atom-password-reset', 'SOX') == (
+        'SOX' in store.find_nodes(id='atom-password-reset')[0]['complianceFrameworks']
+    )
+    assert {'atom-step-create-ad-account', 'atom-password-reset'} <= {
+        neighbor['neighborId'] for neighbor in store.expand(['molecule-new-user-account-setup'], 1)[
+            'molecule-new-user-account-setup'
+        ]
+    }
+    usage = store.usage('atom-access-request-approval')
+    assert {'id': 'molecule-new-user-account-setup', 'type': 'molecule',
+            'title': 'New User Account Setup and Provisioning', 'depth': 1} in usage
+
+
+def test_expand_returns_components_nearest_first(store):
+    context = store.expand(['molecule-new-user-account-setup'], 2, limit=20)['molecule-new-user-account-setup']
+
+    distances = [neighbor['distance'] for neighbor in context]
+    assert distances == sorted(distances)
+    assert all(store.find_nodes(id=neighbor['neighborId']) for neighbor in context)
+    assert store.expand(['missing-id'], 2) == {'missing-id': []}
+
+
+class RecordingDriver(InMemoryNeo4jDriver):
+    """Fake Neo4j driver that keeps every statement and its parameters."""
+
+    def __init__(self, graph):
+        super().__init__(graph)
+        self.executed = []
+
+    def execute(self, cypher, params):
+        self.executed.append((cypher, params))
+        return super().execute(cypher, params)
+
+
+def neo4j_copy(store):
+    """A Neo4jGraphStore over the fake driver, holding the same graph as `store`."""
+
+    nodes = [
+        dict(node['properties'], id=key, labels=sorted(node['labels']))
+        for key, node in store.nodes.items()
+    ]
+    edges = [
+        {'source': source, 'target': target, 'type': rel_type}
+        for source, out in store.out_edges.items()
+        for rel_type, target, _ in out
+    ]
+    return Neo4jGraphStore(RecordingDriver(CompiledGraph.from_dict({'nodes': nodes, 'edges': edges})))
+
+
+def test_expand_contract_matches_neo4j_backend(store):
+    neo4j = neo4j_copy(store)
+    start_ids = ['molecule-new-user-account-setup', 'atom-password-reset', 'missing-id']
+
+    for hops in (1, 2, 3):
+        for limit in (None, 5):
+            for rel_types in (None, ['COMPOSED_OF', 'DEPENDS_ON']):
+                expected = store.expand(start_ids, hops, rel_types, limit)
+                actual = neo4j.expand(start_ids, hops, rel_types, limit)
+                assert {
+                    start: [(n['neighborId'], n['distance']) for n in neighbors]
+                    for start, neighbors in actual.items()
+                } == {
+                    start: [(n['neighborId'], n['distance']) for n in neighbors]
+                    for start, neighbors in expected.items()
+                }, (hops, limit, rel_types)
+
+    context = store.expand(['molecule-new-user-account-setup'], 3)['molecule-new-user-account-setup']
+    neighbor_ids = [neighbor['neighborId'] for neighbor in context]
+    assert len(neighbor_ids) == len(set(neighbor_ids))
+    assert 'molecule-new-user-account-setup' not in neighbor_ids
+    assert len(context) > 5
+
+
+def test_expand_binds_limit_only_when_given(store):
+    neo4j = neo4j_copy(store)
+
+    neo4j.expand(['atom-password-reset'], 2)
+    cypher, params = neo4j.driver.executed[-1]
+    assert 'LIMIT' not in cypher
+
+    neo4j.expand(['atom-password-reset'], 2, limit=3)
+    cypher, params = neo4j.driver.executed[-1]
+    assert 'LIMIT $limit' in cypher and params['limit'] == 3
+    assert 'HAS_CHUNK' not in cypher and ':Component' in cypher
+
+
+def test_expand_skips_chunks(ingest):
+    store = InMemoryGraphStore()
+    ingest(store, chunk_tokens=128)
+
+    context = store.expand(['molecule-new-user-account-setup'], 2)['molecule-new-user-account-setup']
+    assert context
+    assert not any('#chunk-' in neighbor['neighborId'] for neighbor in context)
+    assert store.find_nodes('Chunk', limit=1)
+
+
+def test_vector_search(store):
+    provider = get_embedding_provider('local')
+    hits = store.vector_search('atom_embedding_index', provider.embed_one('reset a forgotten password'), 3)
+
+    assert hits[0]['id'] == 'atom-password-reset'
+    assert [hit['score'] for hit in hits] == sorted((hit['score'] for hit in hits), reverse=True)
+
+
+def test_save_and_load_round_trip(store, tmp_path):
+    path = tmp_path / 'store.json'
+    store.save(path)
+    loaded = InMemoryGraphStore.load(path)
+
+    # Frontmatter dates come back as ISO strings; compare the rest
+    assert [node['id'] for node in loaded.find_nodes('Atom', limit=1000)] == [
+        node['id'] for node in store.find_nodes('Atom', limit=1000)
+    ]
+    assert loaded.find_nodes(id='atom-password-reset')[0]['title'] == 'Password Reset Procedure'
+    assert loaded.usage('atom-access-request-approval') == store.usage('atom-access-request-approval')
+
+
+def test_incremental_run_tombstones_deleted_files(tmp_path, components_dir):
+    corpus = tmp_path / 'sop-components'
+    shutil.copytree(components_dir, corpus)
+    store = InMemoryGraphStore()
+    manifest = IngestManifest(tmp_path / 'manifest.json')
+
+    ingestion = SOPGraphIngestion(store=store, embedding_provider=get_embedding_provider('local'), chunk_tokens=128)
+    ingestion.ingest_directory_incremental(corpus, manifest)
+    assert store.find_nodes(id='atom-password-reset')
+    chunks_before = len(store.find_nodes('Chunk', limit=10000))
+
+    (corpus / 'atoms' / 'atom-password-reset.md').unlink()
+    ingestion = SOPGraphIngestion(store=store, embedding_provider=get_embedding_provider('local'), chunk_tokens=128)
+    ingestion.ingest_directory_incremental(corpus, manifest)
+
+    assert ingestion.stats['nodes_deleted'] == 1
+    assert store.find_nodes(id='atom-password-reset') == []
+    assert not any(
+        neighbor['neighborId'] == 'atom-password-reset'
+        for neighbors in store.expand(['molecule-new-user-account-setup'], 1).values()
+        for neighbor in neighbors
+    )
+    chunks = store.find_nodes('Chunk', limit=10000)
+    assert len(chunks) < chunks_before
+    assert not any(chunk['id'].startswith('atom-password-reset#') for chunk in chunks)
+
+
+def edge_set(store):
+    return {(source, edge_key[:2]) for source, edges in store.out_edges.items() for edge_key in edges}
+
+
+def test_incremental_run_matches_full_ingest_after_delete_and_restore(tmp_path, components_dir, ingest):
+    corpus = tmp_path / 'sop-components'
+    shutil.copytree(components_dir, corpus)
+    atom = corpus / 'atoms' / 'atom-password-reset.md'
+    saved = atom.read_bytes()
+    store = InMemoryGraphStore()
+    manifest = IngestManifest(tmp_path / 'manifest.json')
+
+    def run():
+        ingestion = SOPGraphIngestion(store=store, use_embeddings=False)
+        ingestion.ingest_directory_incremental(corpus, manifest)
+        return ingestion
+
+    # Starts missing, so its parents are ingested before it exists
+    atom.unlink()
+    run()
+    atom.write_bytes(saved)
+    assert run().new_component_ids == {'atom-password-reset'}
+    atom.unlink()
+    run()
+    atom.write_bytes(saved)
+    run()
+
+    full = InMemoryGraphStore()
+    ingest(full, corpus)
+    assert edge_set(store) == edge_set(full)
+    assert 'molecule-new-user-account-setup' in {parent['id'] for parent in store.usage('atom-password-reset')}
+
+
+def test_unchanged_incremental_run_skips_schema_bootstrap(tmp_path, components_dir):
+    corpus = tmp_path / 'sop-components'
+    shutil.copytree(components_dir, corpus)
+    manifest = IngestManifest(tmp_path / 'manifest.json')
+    SOPGraphIngestion(store=InMemoryGraphStore(), use_embeddings=False).ingest_directory_incremental(
+        corpus, manifest
+    )
+
+    class UntouchedStore(InMemoryGraphStore):
+        def ensure_schema(self, *args, **kwargs):
+            raise AssertionError('schema bootstrapped on an unchanged run')
+
+    ingestion = SOPGraphIngestion(store=UntouchedStore(), use_embeddings=False)
+    ingestion.defer_schema()
+    ingestion.ingest_directory_incremental(corpus, IngestManifest(tmp_path / 'manifest.json'))
+
+    assert ingestion.stats['files_unchanged'] > 0
+    assert not ingestion.graph_modified()
+
+
+def test_async_query_matches_sync_query(store):
+    provider = get_embedding_provider('local')
+    sync_results = GraphRAGQuery(store=store, embedding_provider=provider).hybrid_search('password reset', top_k=3)
+
+    async def search():
+        graphrag = AsyncGraphRAGQuery(store=store, embedding_provider=provider)
+        return await graphrag.hybrid_search('password reset', top_k=3)
+
+    assert asyncio.run(search()) == sync_results
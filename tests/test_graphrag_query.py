@@ -0,0 +1,88 @@
+"""GraphRAGQuery result cache: graph version reads and isolation of cached results."""
+
+import asyncio
+
+import pytest
+
+from embeddings import get_embedding_provider
+from graph_store import InMemoryGraphStore
+from graphrag_query import GraphRAGQuery
+from graphrag_query_async import AsyncGraphRAGQuery
+
+
+class CountingStore(InMemoryGraphStore):
+    """Counts graph version reads."""
+
+    version_reads = 0
+
+    def graph_version(self):
+        self.version_reads += 1
+        return super().graph_version()
+
+
+@pytest.fixture
+def store(ingest):
+    store = CountingStore()
+    ingest(store)
+    return store
+
+
+def test_ingest_is_visible_to_the_next_search(store):
+    graphrag = GraphRAGQuery(store=store, embedding_provider=get_embedding_provider('local'))
+    reads = store.version_reads
+
+    graphrag.hybrid_search('password reset', top_k=2)
+    graphrag.hybrid_search('password reset', top_k=2)
+    assert graphrag.cache_stats()['results']['hits'] == 1
+
+    store.bump_graph_version()
+    graphrag.hybrid_search('password reset', top_k=2)
+    graphrag.hybrid_search_many(['password reset'], top_k=2)
+
+    # Every search checks the version, and the bump drops the cached result
+    assert store.version_reads == reads + 4
+    assert graphrag.cache_stats()['results']['hits'] == 2
+    assert graphrag.cache_stats()['results']['misses'] == 2
+
+
+def test_version_ttl_is_opt_in(store):
+    graphrag = GraphRAGQuery(store=store, embedding_provider=get_embedding_provider('local'), graph_version_ttl=60)
+    reads = store.version_reads
+
+    for _ in range(3):
+        graphrag.hybrid_search('password reset', top_k=2)
+    assert store.version_reads == reads + 1
+
+    store.bump_graph_version()
+    graphrag.graph_version(refresh=True)
+    graphrag.hybrid_search('password reset', top_k=2)
+    assert graphrag.cache_stats()['results']['misses'] == 2
+
+
+def test_cached_results_cannot_be_mutated_by_callers(store):
+    graphrag = GraphRAGQuery(store=store, embedding_provider=get_embedding_provider('local'))
+    first = graphrag.hybrid_search('password reset', top_k=2)
+    title, context = first[0].title, list(first[0].graph_context)
+
+    first[0].title = 'changed'
+    first[0].graph_context.clear()
+
+    again = graphrag.hybrid_search('password reset', top_k=2)
+    assert graphrag.cache_stats()['results']['hits'] == 1
+    assert again[0].title == title
+    assert again[0].graph_context == context
+
+
+def test_async_ingest_is_visible_to_the_next_search(store):
+    async def run():
+        graphrag = AsyncGraphRAGQuery(store=store, embedding_provider=get_embedding_provider('local'))
+        first = await graphrag.hybrid_search('password reset', top_k=2)
+        first[0].graph_context.clear()
+        second = await graphrag.hybrid_search('password reset', top_k=2)
+        store.bump_graph_version()
+        await graphrag.hybrid_search('password reset', top_k=2)
+        return graphrag.cache_stats()['results'], second
+
+    stats, second = asyncio.run(run())
+    assert (stats['hits'], stats['misses']) == (1, 2)
+    assert second[0].graph_context
@@ -0,0 +1,107 @@
+"""QueryService and QueryBatcher against a stand-in for AsyncGraphRAGQuery."""
+
+import asyncio
+import json
+from http import HTTPStatus
+
+from graphrag_query import GraphRAGResult
+from query_server import MAX_EXPAND_HOPS, MAX_TOP_K, QueryBatcher, QueryService
+
+
+class FakeGraphRAG:
+    """Records hybrid_search_many calls; queries containing 'boom' make a call fail."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def hybrid_search_many(self, queries, top_k=5, expand_hops=2, node_type=None, chunk_level=False):
+        self.calls.append(list(queries))
+        await asyncio.sleep(0)
+        if any('boom' in query for query in queries):
+            raise RuntimeError('search failed')
+        return [
+            [GraphRAGResult(f"{query}-{i}", 'atom', query, '', 1.0 - i / 10, [], '', {}) for i in range(top_k)]
+            for query in queries
+        ]
+
+
+def post_query(service, **request):
+    return asyncio.run(service.route('POST', '/query', json.dumps(request).encode()))
+
+
+def test_concurrent_searches_are_batched_and_fanned_out():
+    graphrag = FakeGraphRAG()
+
+    async def run():
+        batcher = QueryBatcher(graphrag, window_ms=20, max_batch_size=10)
+        return await asyncio.gather(*(batcher.search(f"query {i}", top_k=2) for i in range(5)))
+
+    results = asyncio.run(run())
+
+    assert graphrag.calls == [[f"query {i}" for i in range(5)]]
+    assert [[r.node_id for r in result] for result in results] == [
+        [f"query {i}-0", f"query {i}-1"] for i in range(5)
+    ]
+
+
+def test_max_batch_size_flushes_early():
+    graphrag = FakeGraphRAG()
+
+    async def run():
+        batcher = QueryBatcher(graphrag, window_ms=1000, max_batch_size=2)
+        return await asyncio.wait_for(asyncio.gather(*(batcher.search(f"q{i}") for i in range(4))), timeout=0.5)
+
+    asyncio.run(run())
+    assert [len(call) for call in graphrag.calls] == [2, 2]
+
+
+def test_failing_query_does_not_fail_its_batch():
+    graphrag = FakeGraphRAG()
+
+    async def run():
+        batcher = QueryBatcher(graphrag, window_ms=20, max_batch_size=10)
+        return await asyncio.gather(
+            batcher.search('good one', top_k=1), batcher.search('boom', top_k=1), batcher.search('good two', top_k=1),
+            return_exceptions=True
+        )
+
+    good_one, boom, good_two = asyncio.run(run())
+
+    assert good_one[0].node_id == 'good one-0'
+    assert isinstance(boom, RuntimeError)
+    assert good_two[0].node_id == 'good two-0'
+
+
+def test_query_route_returns_results():
+    status, payload = post_query(QueryService(FakeGraphRAG(), window_ms=1), query='password', top_k=3)
+
+    assert status == HTTPStatus.OK
+    assert [r['node_id'] for r in payload['results']] == ['password-0', 'password-1', 'password-2']
+
+
+def test_out_of_range_parameters_are_rejected():
+    graphrag = FakeGraphRAG()
+    service = QueryService(graphrag, window_ms=1)
+
+    for request in (
+        {'query': 'q', 'top_k': 0},
+        {'query': 'q', 'top_k': -5},
+        {'query': 'q', 'top_k': MAX_TOP_K + 1},
+        {'query': 'q', 'expand_hops': -1},
+        {'query': 'q', 'expand_hops': MAX_EXPAND_HOPS + 1},
+        {'query': 'q', 'node_type': 'chunk'},
+        {'query': 'q', 'top_k': 'many'},
+        {'query': ''},
+    ):
+        status, payload = post_query(service, **request)
+        assert status == HTTPStatus.BAD_REQUEST, request
+        assert 'error' in payload
+
+    assert graphrag.calls == []
+
+
+def test_search_failure_is_a_server_error():
+    status, payload = post_query(QueryService(FakeGraphRAG(), window_ms=1), query='boom')
+
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert payload == {'error': 'search failed'}